@@ -114,6 +114,97 @@ TUILAN_SECRET_KEY = "MaYoaMQ3zpWJFWtN9mqJqKpHrkdFwLd9DDlFWk2NnVR1mChVRI6THVe6KsC
 TUILAN_COOKIE = "_wsi1=b71125f3741e4eca8746f6c6761f3da931c210a9; __wsi1=b71125f3741e4eca8746f6c6761f3da931c210a9; _wsi2=4ff0e5984f8e972e07ec7b417c122691a47b8044; __wsi2=4ff0e5984f8e972e07ec7b417c122691a47b8044; _wsi3=8cc04958f51e41c511d345eddbb3e7909fce07db; __wsi3=8cc04958f51e41c511d345eddbb3e7909fce07db"
 TUILAN_DEVICE_ID = "lWrrIG5QpALPiSZ7txB//A=="
 TUILAN_USER_AGENT = "okhttp/3.12.2"
+# 推栏全局限速（令牌桶）：每秒请求数与突发上限，QPS <= 0 表示不限速
+TUILAN_RATE_LIMIT_QPS = 2.0
+TUILAN_RATE_LIMIT_BURST = 4
+# 竞技排名统计：心法查询缓存未命中时的并发 worker 数
+JJC_KUNGFU_RESOLVE_CONCURRENCY = 4
+# 心法查询失败时回退到 jx3api 竞技查询的限速（不经过推栏令牌桶）；0.25 约等于原先逐人等待 3~5 秒，QPS <= 0 表示不限速
+JX3API_FALLBACK_RATE_LIMIT_QPS = 0.25
+JX3API_FALLBACK_RATE_LIMIT_BURST = 1
+# 竞技排行榜缓存（2 小时）过期后，仍先返回旧数据并后台刷新的时长（秒）；跨周不复用，0 表示关闭
+JJC_RANKING_CACHE_STALE_SECONDS = 6 * 60 * 60
+# 竞技排名增量统计：上次统计中解析时间不超过该时长（秒）的角色直接沿用，0 表示每次全量解析
+JJC_RANKING_INCREMENTAL_MAX_AGE = 24 * 60 * 60
+# 竞技排名心法分布统计的排名范围（top_N）；200/100/50 为图片模板必需，可追加如 10、500
+JJC_RANKING_STAT_CUTOFFS = (1000, 200, 100, 50)
+
+# 共享 HTTP 连接池（src/infra/http_pool.py）：按 host 复用长连接，安装 h2 后自动启用 HTTP/2
+HTTP_POOL_MAX_CONNECTIONS = 100
+HTTP_POOL_MAX_KEEPALIVE = 20
+HTTP_POOL_KEEPALIVE_EXPIRY = 30.0
+HTTP_POOL_HTTP2 = True
+
+# 共享 Chromium（src/infra/browser_pool.py）：截图复用同一浏览器进程，避免每次冷启动
+# 同时渲染的页面上限；启动时预热的页面数；累计渲染多少次后换新浏览器（0 表示不轮换）
+BROWSER_POOL_MAX_PAGES = 4
+BROWSER_POOL_PREWARM_PAGES = 1
+BROWSER_POOL_RECYCLE_AFTER = 200
+BROWSER_POOL_LAUNCH_ARGS = []
+
+# 渲染调度（src/renderers/jx3/image.py）：同时进行的截图数，以及各优先级的排队上限（排满直接回复繁忙）
+RENDER_SCHEDULER_CONCURRENCY = 4
+RENDER_QUEUE_LIMITS = {"interactive": 32, "scheduled": 16, "prewarm": 8}
+
+# Jinja 模板字节码缓存目录（启动时预编译全部模板）；模板渲染是否放到线程中执行
+TEMPLATE_BYTECODE_CACHE_DIR = "data/cache/jinja"
+TEMPLATE_RENDER_IN_THREAD = True
+
+# 截图输出编码：format 可选 png / jpeg / webp / png8（webp、png8 需安装 Pillow），quality 仅对 jpeg / webp 生效，
+# scale 为截图倍率（原先固定 2）。按模板覆盖默认值，偏长的图用 jpeg 明显减小体积、加快发送
+RENDER_ENCODING_DEFAULT = {"format": "png", "scale": 2}
+RENDER_ENCODING_BY_TEMPLATE = {
+    "竞技场心法排名统计.html": {"format": "jpeg", "quality": 88, "scale": 2},
+    "资历查询.html": {"format": "jpeg", "quality": 88, "scale": 2},
+    "烟花查询.html": {"format": "jpeg", "quality": 88, "scale": 2},
+    "奇遇查询.html": {"format": "jpeg", "quality": 88, "scale": 2},
+}
+
+# 模板截图缓存（src/infra/render_cache.py）：按 模板 + 模板修改时间 + 上下文 + 尺寸 的哈希复用 PNG
+RENDER_CACHE_ENABLED = True
+RENDER_CACHE_TTL_SECONDS = 60 * 60
+RENDER_CACHE_MEMORY_MAX_ENTRIES = 128
+RENDER_CACHE_MEMORY_MAX_MB = 64
+RENDER_CACHE_DISK_DIR = "data/cache/render"
+RENDER_CACHE_DISK_MAX_MB = 512
+# 模板静态资源本地镜像（src/infra/asset_cache.py）：截图时拦截以下域名的请求，从内存 / 磁盘返回
+ASSET_CACHE_ENABLED = True
+ASSET_CACHE_DIR = "data/cache/assets"
+ASSET_CACHE_HOSTS = ("icon.jx3box.com", "jx3wbl.xoyocdn.com", "dl.pvp.xoyo.com")
+ASSET_CACHE_MEMORY_MAX_MB = 32
+# 本地镜像超过该时长（秒）后先返回旧副本并后台重新回源；objects/ 超过容量（MB）时按回源时间从旧到新淘汰（0 表示不限）
+ASSET_CACHE_MAX_AGE_SECONDS = 7 * 24 * 60 * 60
+ASSET_CACHE_DISK_MAX_MB = 256
+# 启动时预取的资源（完整 URL / icon.jx3box.com 图标 ID），留空则只在首次使用时拉取
+ASSET_CACHE_PREFETCH_URLS = [
+    "https://jx3wbl.xoyocdn.com/img/icon-rmb.c3ce8bfb.png",
+    "https://jx3wbl.xoyocdn.com/img/icon-heart-outline.76bd341d.png",
+]
+ASSET_CACHE_PREFETCH_ICON_IDS = []
+# 万宝楼价格提醒巡检：按物品去重后并发查询最低价；上游按 host 令牌桶限速（QPS <= 0 关闭限速）
+WANBAOLOU_SWEEP_CONCURRENCY = 4
+WANBAOLOU_RATE_LIMIT_QPS = 4.0
+WANBAOLOU_RATE_LIMIT_BURST = 4
+# 万宝楼价格历史（物价走势 / 历史最低）：原始观测保留小时数，之后降为小时线；小时线保留天数，之后降为日线；日线保留天数（0 为永久）
+WANBAOLOU_PRICE_HISTORY_DB = "data/wanbaolou_price_history.db"
+WANBAOLOU_PRICE_HISTORY_RAW_HOURS = 48
+WANBAOLOU_PRICE_HISTORY_HOURLY_DAYS = 30
+WANBAOLOU_PRICE_HISTORY_DAILY_DAYS = 730
+# 价格历史降采样 + 写回 SQLite 的间隔（分钟），与价格巡检无关
+WANBAOLOU_PRICE_HISTORY_FLUSH_MINUTES = 5
+# jx3web 外部网页截图缓存：TTL 内直接复用；过期后发条件请求，页面未变则续期；距上次截图超过 MAX_AGE 一律重截
+CAPTURE_CACHE_ENABLED = True
+CAPTURE_CACHE_TTL_SECONDS = 5 * 60
+CAPTURE_CACHE_MAX_AGE_SECONDS = 60 * 60
+CAPTURE_CACHE_MAX_ENTRIES = 32
+# Pillow 快速渲染（纯文本列表 / 表格，不经过浏览器）；按命令开启，未开启的命令保持发送文本
+# 可选: jjc_missing_kungfu（未查询到心法的角色）、reminder_list（提醒列表）、codes（兑换码）、my_subscriptions（我的订阅）、price_trend（物价走势）
+FAST_RENDER_COMMANDS = []
+# 中文字体路径，按顺序取第一个存在的文件；为空时在常见系统字体目录中查找
+FAST_RENDER_FONT_PATHS = []
+FAST_RENDER_ENCODING = {"format": "png", "scale": 2}
+# 图片底部随机文案的轮换周期（秒），窗口内文案固定以便命中截图缓存；0 表示每次随机
+RANDOM_TEXT_ROTATE_SECONDS = 10 * 60
 
 # 赛季时间定义
 CURRENT_SEASON = "暗影千机"
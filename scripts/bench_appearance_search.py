@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+万宝楼外观搜索基准：在 waiguan.json 上对比原先的全量线性扫描与倒排索引候选打分，
+输出索引构建耗时、每次查询的 p50 / p95 / 平均耗时，并校验两者排序结果完全一致；
+同时对比 AppearanceSearcher 子串索引旧的逐后缀字典树与后缀数组的构建耗时、内存占用（tracemalloc）与查询耗时。
+
+不经过别名模块（别名命中只影响 850 分加分，两种实现的处理相同）。
+
+用法: python scripts/bench_appearance_search.py [--file waiguan.json] [--queries 300] [--repeat 3]
+"""
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# 直接按文件加载索引模块：导入 src.plugins.wanbaolou 包会执行插件初始化（需要 nonebot 运行环境）
+_spec = importlib.util.spec_from_file_location(
+    "wanbaolou_search_index", ROOT / "src" / "plugins" / "wanbaolou" / "search_index.py"
+)
+search_index = importlib.util.module_from_spec(_spec)
+sys.modules[_spec.name] = search_index
+_spec.loader.exec_module(search_index)  # type: ignore[union-attr]
+
+
+def legacy_rank(data, clean_keyword, alias_canonical_set):
+    """
+    原 search_appearance 的全量扫描实现（每次查询重新规范化、逐个打分，别名加分再扫一遍）。
+    """
+    item_score_map = {}
+    item_obj_map = {}
+    for item in data:
+        clean_name = item['name'].lower().replace('·', '').replace(' ', '')
+        clean_category = item['category'].lower().replace('·', '').replace(' ', '')
+        score = search_index.score_item(clean_keyword, clean_name, clean_category)
+        if score > 0:
+            key = f"{item['name']}|{item['category']}"
+            if score > item_score_map.get(key, 0):
+                item_score_map[key] = score
+                item_obj_map[key] = item
+    if alias_canonical_set:
+        for item in data:
+            if item.get('name') in alias_canonical_set:
+                key = f"{item['name']}|{item['category']}"
+                item_score_map[key] = max(item_score_map.get(key, 0), 850)
+                item_obj_map[key] = item
+    scored_results = [(item_obj_map[k], v) for k, v in item_score_map.items()]
+    scored_results.sort(key=lambda x: x[1], reverse=True)
+    return scored_results
+
+
+class LegacyTrieNode:
+    def __init__(self):
+        self.children = {}
+        self.is_end = False
+        self.items = []
+
+
+def legacy_trie_build(data):
+    """
+    原 AppearanceSearcher._build_index：名称与分类的每个后缀逐字插入字典树，每个节点记录途经的物品。
+    """
+    root = LegacyTrieNode()
+    for item in data:
+        for text in (item['name'], item['category']):
+            for i in range(len(text)):
+                node = root
+                for char in text[i:].lower():
+                    if char not in node.children:
+                        node.children[char] = LegacyTrieNode()
+                    node = node.children[char]
+                    node.items.append(item)
+                node.is_end = True
+    return root
+
+
+def legacy_trie_search(root, keyword, limit):
+    node = root
+    for char in keyword.lower():
+        if char not in node.children:
+            return []
+        node = node.children[char]
+    results = []
+    seen = set()
+    for item in node.items:
+        item_key = f"{item['name']}_{item['category']}"
+        if item_key not in seen:
+            results.append(item)
+            seen.add(item_key)
+            if len(results) >= limit:
+                break
+    return results
+
+
+def measure_build(build):
+    # 耗时与内存分开测：tracemalloc 会显著拖慢分配密集的构建过程
+    started_at = time.perf_counter()
+    build()
+    elapsed_ms = (time.perf_counter() - started_at) * 1000
+    tracemalloc.start()
+    result = build()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed_ms, current / 1024 / 1024, peak / 1024 / 1024
+
+
+def make_queries(data, count: int, seed: int = 7) -> list[str]:
+    rng = random.Random(seed)
+    names = [item['name'] for item in data]
+    queries = ["", "金", "礼盒", "发型", "天选之人", "龙隐金", "狐"]
+    while len(queries) < count:
+        name = rng.choice(names)
+        kind = rng.random()
+        if kind < 0.3:
+            queries.append(name)
+        elif kind < 0.6:
+            start = rng.randrange(len(name))
+            queries.append(name[start:start + rng.randint(1, 4)])
+        elif kind < 0.8:
+            # 打乱顺序、抽取部分字符，覆盖子序列 / 分离字符匹配
+            chars = list(name)
+            rng.shuffle(chars)
+            queries.append("".join(chars[: rng.randint(2, 4)]))
+        else:
+            other = rng.choice(names)
+            queries.append(name[:2] + other[:2])
+    return queries
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--file", default=str(ROOT / "waiguan.json"))
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with open(args.file, "r", encoding="utf-8") as f:
+        raw = json.load(f)["data"]
+    data = [
+        {'name': item['name'], 'category': item['category']}
+        for item in raw
+        if isinstance(item, dict) and 'name' in item and 'category' in item
+    ]
+
+    started_at = time.perf_counter()
+    index = search_index.AppearanceIndex.build(data)
+    build_ms = (time.perf_counter() - started_at) * 1000
+    print(f"items={len(data)} chars={len(index.char_postings)} build={build_ms:.1f}ms")
+
+    queries = make_queries(data, args.queries)
+    alias_sets = [set(), {data[0]['name'], data[len(data) // 2]['name']}]
+
+    mismatches = 0
+    for query in queries:
+        clean_keyword = search_index.clean_text(query)
+        for alias_set in alias_sets:
+            if legacy_rank(data, clean_keyword, alias_set) != index.rank(clean_keyword, alias_set):
+                mismatches += 1
+                print(f"结果不一致: query={query!r} aliases={sorted(alias_set)}")
+    print(f"一致性校验: queries={len(queries) * len(alias_sets)} mismatches={mismatches}")
+
+    for label, fn in (
+        ("legacy", lambda kw: legacy_rank(data, kw, set())),
+        ("indexed", lambda kw: index.rank(kw, set())),
+    ):
+        samples = []
+        for _ in range(args.repeat):
+            for query in queries:
+                clean_keyword = search_index.clean_text(query)
+                started_at = time.perf_counter()
+                fn(clean_keyword)
+                samples.append((time.perf_counter() - started_at) * 1000)
+        print(
+            f"{label:8s} p50={percentile(samples, 0.5):.3f}ms p95={percentile(samples, 0.95):.3f}ms "
+            f"avg={statistics.mean(samples):.3f}ms"
+        )
+
+    trie, trie_ms, trie_mb, trie_peak = measure_build(lambda: legacy_trie_build(data))
+    suffix, suffix_ms, suffix_mb, suffix_peak = measure_build(lambda: search_index.SuffixIndex.build(data))
+    print(
+        f"子串索引构建: trie={trie_ms:.1f}ms 常驻{trie_mb:.1f}MB 峰值{trie_peak:.1f}MB  "
+        f"suffix_array={suffix_ms:.1f}ms 常驻{suffix_mb:.1f}MB 峰值{suffix_peak:.1f}MB"
+    )
+
+    substring_mismatches = 0
+    substring_samples = {"trie": [], "suffix_array": []}
+    for query in queries:
+        if not query:
+            continue
+        started_at = time.perf_counter()
+        expected = legacy_trie_search(trie, query, 10)
+        substring_samples["trie"].append((time.perf_counter() - started_at) * 1000)
+        started_at = time.perf_counter()
+        got = [data[idx] for idx in suffix.top_items(query.lower(), 10)]
+        substring_samples["suffix_array"].append((time.perf_counter() - started_at) * 1000)
+        if expected != got:
+            substring_mismatches += 1
+            print(f"子串结果不一致: query={query!r}")
+    for label, samples in substring_samples.items():
+        print(
+            f"{label:12s} p50={percentile(samples, 0.5):.3f}ms p95={percentile(samples, 0.95):.3f}ms "
+            f"avg={statistics.mean(samples):.3f}ms"
+        )
+    print(f"子串一致性校验: mismatches={substring_mismatches}")
+
+    sys.exit(1 if mismatches or substring_mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+截图输出编码基准：用共享浏览器池把同一段偏长的 HTML 按不同编码（格式 / 质量 / 倍率）各渲染 N 次，
+输出平均体积、截图耗时与 base64 后的消息体积。需要本机 playwright + chromium；webp / png8 需要 Pillow。
+
+用法: python scripts/bench_encoding.py [--renders 5] [--rows 300]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.infra.browser_pool import browser_pool  # noqa: E402
+from src.infra.image_encoding import ImageEncoding  # noqa: E402
+from src.infra.screenshot import jietu  # noqa: E402
+
+ENCODINGS = [
+    ImageEncoding("png", scale=2),
+    ImageEncoding("png8", scale=2),
+    ImageEncoding("jpeg", quality=88, scale=2),
+    ImageEncoding("jpeg", quality=80, scale=1.5),
+    ImageEncoding("webp", quality=85, scale=2),
+]
+
+
+def make_html(rows: int) -> str:
+    body = "".join(
+        f"<tr><td>{i + 1}</td><td>梦江南</td><td>角色{i}</td><td>{'云裳心经' if i % 3 else '冰心诀'}</td>"
+        f"<td style='background:hsl({i * 7 % 360},60%,85%)'>{3000 - i}</td></tr>"
+        for i in range(rows)
+    )
+    return (
+        "<html><head><meta charset='utf-8'><style>"
+        "body{font-family:sans-serif;margin:0;padding:16px;background:linear-gradient(#fdfbfb,#ebedee)}"
+        "table{border-collapse:collapse;width:100%}td{border:1px solid #ddd;padding:6px}"
+        "</style></head><body><h2>竞技场心法排名统计</h2>"
+        f"<table>{body}</table></body></html>"
+    )
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    html = make_html(args.rows)
+    await browser_pool.start()
+    print(f"rows={args.rows} renders={args.renders}")
+    print(f"{'encoding':<16}{'avg KB':>10}{'base64 KB':>12}{'avg ms':>10}")
+    for encoding in ENCODINGS:
+        sizes: list[int] = []
+        latencies: list[float] = []
+        for _ in range(args.renders):
+            started = time.perf_counter()
+            image = await jietu(html, 1120, "ck", encoding=encoding)
+            latencies.append(time.perf_counter() - started)
+            sizes.append(len(image))
+        avg_size = statistics.mean(sizes)
+        print(
+            f"{encoding.signature:<16}{avg_size / 1024:>10.1f}"
+            f"{avg_size * 4 / 3 / 1024:>12.1f}"
+            f"{statistics.mean(latencies) * 1000:>10.1f}"
+        )
+    await browser_pool.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="截图输出编码基准")
+    parser.add_argument("--renders", type=int, default=5)
+    parser.add_argument("--rows", type=int, default=300)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
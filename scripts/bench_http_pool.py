@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+HTTP 连接复用微基准：本地起一个 keep-alive 桩服务，对比
+“每次请求新建 httpx client”（旧 HttpClient 行为）与共享 HttpPool 的吞吐。
+
+用法: python scripts/bench_http_pool.py [--requests 500] [--concurrency 20]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.infra.http_pool import HttpPool  # noqa: E402
+
+PAYLOAD = b'{"code":0,"msg":"success","data":{}}'
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:  # noqa: N802
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(PAYLOAD)))
+        self.end_headers()
+        self.wfile.write(PAYLOAD)
+
+    def log_message(self, format, *args) -> None:  # noqa: A002
+        return
+
+
+def start_stub_server() -> tuple[ThreadingHTTPServer, str]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/data"
+
+
+def bench_sync(url: str, total: int) -> tuple[float, float]:
+    started = time.perf_counter()
+    for _ in range(total):
+        with httpx.Client(timeout=10.0) as client:
+            client.get(url)
+    before = total / (time.perf_counter() - started)
+
+    pool = HttpPool(http2=False)
+    started = time.perf_counter()
+    for _ in range(total):
+        pool.request("GET", url, timeout=10.0)
+    after = total / (time.perf_counter() - started)
+    pool.close()
+    return before, after
+
+
+async def bench_async(url: str, total: int, concurrency: int) -> tuple[float, float]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fresh_client_call() -> None:
+        async with semaphore:
+            async with httpx.AsyncClient(timeout=10.0) as client:
+                await client.get(url)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(fresh_client_call() for _ in range(total)))
+    before = total / (time.perf_counter() - started)
+
+    pool = HttpPool(http2=False)
+
+    async def pooled_call() -> None:
+        async with semaphore:
+            await pool.arequest("GET", url, timeout=10.0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(pooled_call() for _ in range(total)))
+    after = total / (time.perf_counter() - started)
+    await pool.aclose()
+    return before, after
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="HttpPool 连接复用微基准")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    server, url = start_stub_server()
+    try:
+        sync_before, sync_after = bench_sync(url, args.requests)
+        async_before, async_after = asyncio.run(bench_async(url, args.requests, args.concurrency))
+    finally:
+        server.shutdown()
+
+    print(f"requests={args.requests} concurrency={args.concurrency} url={url}")
+    print(f"sync  : per-request client {sync_before:8.1f} req/s | pooled {sync_after:8.1f} req/s | x{sync_after / sync_before:.2f}")
+    print(f"async : per-request client {async_before:8.1f} req/s | pooled {async_after:8.1f} req/s | x{async_after / async_before:.2f}")
+
+
+if __name__ == "__main__":
+    main()
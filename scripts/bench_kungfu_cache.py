@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+心法缓存存储基准：在临时目录里对比旧版“每角色一个 JSON 文件”与 SQLite(WAL) 存储
+写入 / 读取 N 个角色的耗时，并验证旧文件迁移。
+
+用法: python scripts/bench_kungfu_cache.py [--roles 1000]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.storage.kungfu_cache_store import KungfuCacheStore  # noqa: E402
+
+
+def make_payload(index: int) -> dict:
+    return {
+        "server": "梦江南",
+        "name": f"角色{index}",
+        "kungfu": "云裳心经",
+        "found": True,
+        "cache_time": time.time(),
+        "role_id": str(100000 + index),
+        "global_role_id": f"g{index}",
+        "weapon_checked": True,
+        "teammates_checked": True,
+        "teammates": [{"role_name": f"队友{index}-{k}", "kungfu_id": 10000 + k} for k in range(2)],
+        "match_history_win_samples": ["yunshang"] * 10,
+    }
+
+
+def bench_legacy(root: str, roles: int) -> tuple[float, float]:
+    cache_dir = os.path.join(root, "kungfu")
+
+    def path(server: str, name: str) -> str:
+        os.makedirs(cache_dir, exist_ok=True)
+        return os.path.join(cache_dir, f"{server}_{name}.json")
+
+    started = time.perf_counter()
+    for i in range(roles):
+        payload = make_payload(i)
+        with open(path(payload["server"], payload["name"]), "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
+    save_elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for i in range(roles):
+        file_path = path("梦江南", f"角色{i}")
+        if os.path.exists(file_path):
+            with open(file_path, "r", encoding="utf-8") as f:
+                json.load(f)
+    load_elapsed = time.perf_counter() - started
+    return save_elapsed, load_elapsed
+
+
+def bench_store(root: str, roles: int) -> dict[str, float]:
+    store = KungfuCacheStore(os.path.join(root, "kungfu_cache.sqlite3"))
+    keys = [("梦江南", f"角色{i}") for i in range(roles)]
+    result: dict[str, float] = {}
+
+    started = time.perf_counter()
+    for i in range(roles):
+        payload = make_payload(i)
+        store.put(payload["server"], payload["name"], payload)
+    result["put"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    store.put_many((p["server"], p["name"], p) for p in (make_payload(i) for i in range(roles)))
+    result["put_many"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for server, name in keys:
+        store.get(server, name)
+    result["get"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    loaded = store.get_many(keys)
+    result["get_many"] = time.perf_counter() - started
+    assert len(loaded) == roles
+
+    started = time.perf_counter()
+    store.get_since(time.time() - 3600)
+    result["get_since"] = time.perf_counter() - started
+    store.close()
+    return result
+
+
+def bench_migration(root: str) -> tuple[int, float]:
+    started = time.perf_counter()
+    store = KungfuCacheStore(os.path.join(root, "migrated.sqlite3"), legacy_dir=os.path.join(root, "kungfu"))
+    elapsed = time.perf_counter() - started
+    count = store.count()
+    store.close()
+    return count, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="心法缓存存储基准")
+    parser.add_argument("--roles", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        legacy_save, legacy_load = bench_legacy(root, args.roles)
+        store = bench_store(root, args.roles)
+        migrated, migrate_elapsed = bench_migration(root)
+
+    ms = 1000.0
+    print(f"roles={args.roles}")
+    print(f"legacy json files : save {legacy_save * ms:8.1f} ms | load {legacy_load * ms:8.1f} ms")
+    print(f"sqlite per-role   : save {store['put'] * ms:8.1f} ms | load {store['get'] * ms:8.1f} ms")
+    print(f"sqlite batch      : save {store['put_many'] * ms:8.1f} ms | load {store['get_many'] * ms:8.1f} ms")
+    print(f"sqlite ttl query  : {store['get_since'] * ms:8.1f} ms")
+    print(f"migration         : {migrated} roles in {migrate_elapsed * ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
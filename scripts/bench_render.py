@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+截图渲染延迟基准：对比旧版“每次渲染都启动 Chromium”与共享浏览器池（src/infra/browser_pool.py）
+渲染同一段 HTML 的 p50 / p95 延迟。需要本机已安装 playwright 与 chromium，不访问外网。
+
+用法: python scripts/bench_render.py [--renders 30] [--concurrency 1] [--rows 50] [--mode both]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.infra.browser_pool import BrowserPool  # noqa: E402
+from src.infra import screenshot  # noqa: E402
+
+
+def make_html(rows: int) -> str:
+    body = "".join(
+        f"<tr><td>{i + 1}</td><td>梦江南</td><td>角色{i}</td><td>{3000 - i}</td></tr>" for i in range(rows)
+    )
+    return (
+        "<html><head><meta charset='utf-8'><style>"
+        "body{font-family:sans-serif;margin:0;padding:16px;background:#f5f5f5}"
+        "table{border-collapse:collapse;width:100%}td{border:1px solid #ddd;padding:6px}"
+        "</style></head><body><h2>竞技排名</h2>"
+        f"<table>{body}</table></body></html>"
+    )
+
+
+async def cold_jietu(html_content: str, width: int, height) -> bytes:
+    """旧实现：每次渲染都启动并关闭一个 Chromium。"""
+    from playwright.async_api import async_playwright  # type: ignore
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        page = await browser.new_page(viewport={"width": 1920, "height": 1080}, device_scale_factor=2)
+        await page.set_content(html_content)
+        page_height = await page.evaluate("() => document.body.scrollHeight")
+        if height == "ck":
+            height = page_height
+        await page.set_viewport_size({"width": width, "height": height})
+        image = await page.screenshot(full_page=True)
+        await browser.close()
+        return image
+
+
+async def run_mode(render, html: str, renders: int, concurrency: int) -> list[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def one() -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            await render(html, 800, "ck")
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(one() for _ in range(renders)))
+    return latencies
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def report(label: str, latencies: list[float], wall: float) -> None:
+    ms = 1000.0
+    print(
+        f"{label:<6} n={len(latencies):<4} p50 {percentile(latencies, 50) * ms:8.1f} ms | "
+        f"p95 {percentile(latencies, 95) * ms:8.1f} ms | mean {statistics.mean(latencies) * ms:8.1f} ms | "
+        f"wall {wall:6.2f} s"
+    )
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    html = make_html(args.rows)
+    print(f"renders={args.renders} concurrency={args.concurrency} rows={args.rows}")
+
+    if args.mode in ("cold", "both"):
+        started = time.perf_counter()
+        latencies = await run_mode(cold_jietu, html, args.renders, args.concurrency)
+        report("cold", latencies, time.perf_counter() - started)
+
+    if args.mode in ("pool", "both"):
+        pool = BrowserPool(max_pages=args.concurrency, prewarm_pages=args.concurrency, recycle_after=args.recycle_after)
+        screenshot.browser_pool = pool
+        if args.prewarm:
+            await pool.start()
+        started = time.perf_counter()
+        latencies = await run_mode(screenshot.jietu, html, args.renders, args.concurrency)
+        report("pool", latencies, time.perf_counter() - started)
+        print(f"pool stats: {pool.stats()}")
+        await pool.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="截图渲染延迟基准")
+    parser.add_argument("--renders", type=int, default=30)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--rows", type=int, default=50)
+    parser.add_argument("--recycle-after", type=int, default=200)
+    parser.add_argument("--mode", choices=("cold", "pool", "both"), default="both")
+    parser.add_argument("--no-prewarm", dest="prewarm", action="store_false", help="不预热，首个渲染计入启动耗时")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,434 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Iterable, Optional
+from urllib.parse import urlsplit
+
+try:
+    from nonebot import logger  # type: ignore
+except Exception:  # pragma: no cover
+    import logging
+
+    logger = logging.getLogger(__name__)
+
+try:
+    import config as cfg
+except Exception:  # pragma: no cover
+    cfg = None  # type: ignore
+
+from src.infra.http_pool import http_pool
+from src.infra.single_flight import SingleFlight
+
+
+ICON_URL_TEMPLATE = "https://icon.jx3box.com/icon/{icon_id}.png"
+DEFAULT_ASSET_HOSTS = ("icon.jx3box.com", "jx3wbl.xoyocdn.com", "dl.pvp.xoyo.com")
+REQUEST_HEADERS = {"User-Agent": "jx3bot/asset-cache"}
+
+
+def _guess_content_type(url: str, header_value: Optional[str]) -> str:
+    if header_value:
+        return header_value.split(";")[0].strip()
+    path = urlsplit(url).path.lower()
+    for suffix, content_type in (
+        (".png", "image/png"),
+        (".jpg", "image/jpeg"),
+        (".jpeg", "image/jpeg"),
+        (".gif", "image/gif"),
+        (".webp", "image/webp"),
+        (".svg", "image/svg+xml"),
+        (".woff2", "font/woff2"),
+        (".woff", "font/woff"),
+        (".ttf", "font/ttf"),
+        (".css", "text/css"),
+    ):
+        if path.endswith(suffix):
+            return content_type
+    return "application/octet-stream"
+
+
+class AssetCache:
+    """
+    模板静态资源（图标、字体等）的本地镜像，供 Playwright 路由拦截直接返回。
+
+    - 内容寻址：文件按 sha256(内容) 存放在 objects/ 下，manifest.jsonl 记录 URL -> (sha256, content-type)；
+      不同 URL 指向同一内容时只存一份
+    - 懒加载：首次命中时经共享 HTTP 连接池回源并落盘，之后从内存 / 磁盘返回；同一 URL 并发回源只发一次
+    - 回源失败（404 / 超时）短期负缓存，直接返回 404，不让页面等待外网
+    - 只拦截 hosts 中列出的域名，其余请求照常放行
+    - 距上次回源超过 max_age 的资源先返回本地副本，同时后台重新回源，上游更换图标后会跟着更新
+    - objects/ 总大小超过 disk_max_bytes 时按回源时间从旧到新淘汰；不再被引用的对象随即删除，
+      manifest.jsonl 中失效的行累积过多时整体重写（临时文件 + os.replace）
+    """
+
+    def __init__(
+        self,
+        *,
+        cache_dir: str,
+        hosts: Iterable[str] = DEFAULT_ASSET_HOSTS,
+        memory_max_bytes: int = 32 * 1024 * 1024,
+        fetch_timeout: float = 10.0,
+        negative_ttl: float = 300.0,
+        max_age_seconds: float = 7 * 24 * 3600,
+        disk_max_bytes: int = 256 * 1024 * 1024,
+        enabled: bool = True,
+    ) -> None:
+        self.cache_dir = cache_dir
+        self.hosts = {str(host).lower() for host in hosts}
+        self.memory_max_bytes = max(0, int(memory_max_bytes))
+        self.fetch_timeout = float(fetch_timeout)
+        self.negative_ttl = float(negative_ttl)
+        self.max_age_seconds = max(0.0, float(max_age_seconds))
+        self.disk_max_bytes = max(0, int(disk_max_bytes))
+        self.enabled = bool(enabled)
+        # URL -> (sha256, content-type, 回源时间)
+        self._manifest: Optional[dict[str, tuple[str, str, float]]] = None
+        self._manifest_lines = 0
+        self._object_sizes: dict[str, int] = {}
+        self._revalidating: set[asyncio.Task] = set()
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_bytes = 0
+        self._failures: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._flight = SingleFlight("asset_cache")
+        self._counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "fetched": 0,
+            "failed": 0,
+            "passthrough": 0,
+            "revalidated": 0,
+            "evicted": 0,
+        }
+
+    # ---- manifest / 存储 -------------------------------------------------
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.cache_dir, "manifest.jsonl")
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, "objects", digest[:2], digest)
+
+    def _load_manifest(self) -> dict[str, tuple[str, str, float]]:
+        with self._lock:
+            if self._manifest is not None:
+                return self._manifest
+        manifest: dict[str, tuple[str, str, float]] = {}
+        lines = 0
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as file_handle:
+                for line in file_handle:
+                    lines += 1
+                    try:
+                        record = json.loads(line)
+                        manifest[str(record["url"])] = (
+                            str(record["sha256"]),
+                            str(record["content_type"]),
+                            float(record.get("fetched_at") or 0),
+                        )
+                    except Exception:
+                        continue
+        except FileNotFoundError:
+            pass
+        except OSError as exc:
+            logger.warning(f"asset_cache 读取 manifest 失败: {exc}")
+        sizes: dict[str, int] = {}
+        for url, (digest, _content_type, _fetched_at) in list(manifest.items()):
+            if digest in sizes:
+                continue
+            try:
+                sizes[digest] = os.path.getsize(self._object_path(digest))
+            except OSError:
+                # 对象文件已丢失：丢弃该记录，下次访问重新回源
+                del manifest[url]
+        with self._lock:
+            if self._manifest is None:
+                self._manifest = manifest
+                self._manifest_lines = lines
+                self._object_sizes = sizes
+                self._maintain_locked(keep=None)
+            return self._manifest
+
+    def _read_object(self, digest: str) -> Optional[bytes]:
+        try:
+            with open(self._object_path(digest), "rb") as file_handle:
+                return file_handle.read()
+        except OSError:
+            return None
+
+    def _store(self, url: str, body: bytes, content_type: str) -> str:
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as file_handle:
+                file_handle.write(body)
+            os.replace(tmp_path, path)
+        fetched_at = time.time()
+        record = {"url": url, "sha256": digest, "content_type": content_type, "fetched_at": fetched_at}
+        with self._lock:
+            with open(self.manifest_path, "a", encoding="utf-8") as file_handle:
+                file_handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._manifest_lines += 1
+            if self._manifest is not None:
+                self._manifest[url] = (digest, content_type, fetched_at)
+                self._object_sizes[digest] = len(body)
+                self._maintain_locked(keep=digest)
+        return digest
+
+    def _maintain_locked(self, *, keep: Optional[str]) -> None:
+        """
+        在锁内执行：删除不再被引用的对象、超出容量时按回源时间淘汰、必要时重写 manifest。
+        keep 为刚写入的对象，不参与淘汰。
+        """
+        manifest = self._manifest
+        if manifest is None:
+            return
+        newest: dict[str, float] = {}
+        for digest, _content_type, fetched_at in manifest.values():
+            newest[digest] = max(fetched_at, newest.get(digest, 0.0))
+
+        removed = [digest for digest in self._object_sizes if digest not in newest]
+        total = sum(self._object_sizes.get(digest, 0) for digest in newest)
+        if self.disk_max_bytes and total > self.disk_max_bytes:
+            # 淘汰到容量的 90%，避免每次写入都触发淘汰
+            target = self.disk_max_bytes * 0.9
+            for digest, _fetched_at in sorted(newest.items(), key=lambda pair: pair[1]):
+                if total <= target:
+                    break
+                if digest == keep:
+                    continue
+                total -= self._object_sizes.get(digest, 0)
+                removed.append(digest)
+                self._counters["evicted"] += 1
+            evicted = set(removed)
+            for url in [url for url, entry in manifest.items() if entry[0] in evicted]:
+                del manifest[url]
+
+        for digest in removed:
+            self._object_sizes.pop(digest, None)
+            body = self._memory.pop(digest, None)
+            if body is not None:
+                self._memory_bytes -= len(body)
+            try:
+                os.remove(self._object_path(digest))
+            except OSError:
+                pass
+
+        if removed or self._manifest_lines > max(64, 2 * len(manifest)):
+            self._rewrite_manifest_locked()
+
+    def _rewrite_manifest_locked(self) -> None:
+        manifest = self._manifest or {}
+        tmp_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as file_handle:
+                for url, (digest, content_type, fetched_at) in manifest.items():
+                    record = {"url": url, "sha256": digest, "content_type": content_type, "fetched_at": fetched_at}
+                    file_handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+            os.replace(tmp_path, self.manifest_path)
+            self._manifest_lines = len(manifest)
+        except OSError as exc:
+            logger.warning(f"asset_cache 重写 manifest 失败: {exc}")
+
+    def _memory_get(self, digest: str) -> Optional[bytes]:
+        with self._lock:
+            body = self._memory.get(digest)
+            if body is not None:
+                self._memory.move_to_end(digest)
+            return body
+
+    def _memory_put(self, digest: str, body: bytes) -> None:
+        if len(body) > self.memory_max_bytes:
+            return
+        with self._lock:
+            if digest in self._memory:
+                return
+            self._memory[digest] = body
+            self._memory_bytes += len(body)
+            while self._memory and self._memory_bytes > self.memory_max_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    # ---- 查询 / 回源 -----------------------------------------------------
+
+    def should_intercept(self, url: str) -> bool:
+        if not self.enabled:
+            return False
+        parts = urlsplit(str(url))
+        return parts.scheme in ("http", "https") and (parts.hostname or "").lower() in self.hosts
+
+    @staticmethod
+    def _normalize_url(url: str) -> str:
+        # http/https 视为同一资源（交易行图标用的是 http://icon.jx3box.com）
+        parts = urlsplit(str(url))
+        return parts._replace(scheme="https", fragment="").geturl()
+
+    async def get(self, url: str) -> Optional[tuple[bytes, str]]:
+        """
+        返回 (内容, content-type)；本地没有时回源并落盘。回源失败返回 None。
+        """
+        key = self._normalize_url(url)
+        manifest = self._manifest if self._manifest is not None else await asyncio.to_thread(self._load_manifest)
+        entry = manifest.get(key)
+        if entry is not None:
+            digest, content_type, fetched_at = entry
+            body = self._memory_get(digest)
+            if body is not None:
+                self._count("memory_hits")
+                self._maybe_revalidate(key, fetched_at)
+                return body, content_type
+            body = await asyncio.to_thread(self._read_object, digest)
+            if body is not None:
+                self._count("disk_hits")
+                self._memory_put(digest, body)
+                self._maybe_revalidate(key, fetched_at)
+                return body, content_type
+
+        if self._recently_failed(key):
+            return None
+        return await self._flight.do(key, lambda: self._fetch(key))
+
+    def _recently_failed(self, key: str) -> bool:
+        failed_at = self._failures.get(key)
+        return failed_at is not None and time.monotonic() - failed_at < self.negative_ttl
+
+    def _maybe_revalidate(self, key: str, fetched_at: float) -> None:
+        """
+        本地副本超过 max_age：照常返回旧副本，后台重新回源；回源失败时继续使用旧副本。
+        """
+        if not self.max_age_seconds or time.time() - fetched_at < self.max_age_seconds:
+            return
+        if self._recently_failed(key):
+            return
+        task = asyncio.get_running_loop().create_task(self._flight.do(key, lambda: self._fetch(key)))
+        self._revalidating.add(task)
+        task.add_done_callback(self._revalidating.discard)
+        self._count("revalidated")
+
+    async def _fetch(self, url: str) -> Optional[tuple[bytes, str]]:
+        try:
+            response = await http_pool.arequest(
+                "GET",
+                url,
+                headers=REQUEST_HEADERS,
+                timeout=self.fetch_timeout,
+                follow_redirects=True,
+            )
+        except Exception as exc:
+            self._failures[url] = time.monotonic()
+            self._count("failed")
+            logger.warning(f"asset_cache 回源失败: url={url} error={exc}")
+            return None
+        if response.status_code != 200 or not response.content:
+            self._failures[url] = time.monotonic()
+            self._count("failed")
+            logger.warning(f"asset_cache 回源失败: url={url} status={response.status_code}")
+            return None
+
+        body = response.content
+        content_type = _guess_content_type(url, response.headers.get("content-type"))
+        try:
+            digest = await asyncio.to_thread(self._store, url, body, content_type)
+            self._memory_put(digest, body)
+        except OSError as exc:
+            logger.warning(f"asset_cache 写入本地镜像失败: url={url} error={exc}")
+        self._failures.pop(url, None)
+        self._count("fetched")
+        return body, content_type
+
+    async def handle_route(self, route: Any) -> None:
+        """
+        Playwright 路由处理：命中镜像直接 fulfill，回源失败返回 404，不在拦截范围内的请求放行。
+        """
+        url = route.request.url
+        if not self.should_intercept(url):
+            self._count("passthrough")
+            await route.continue_()
+            return
+        asset = await self.get(url)
+        if asset is None:
+            await route.fulfill(status=404, body=b"")
+            return
+        body, content_type = asset
+        await route.fulfill(
+            status=200,
+            body=body,
+            headers={
+                "content-type": content_type,
+                "cache-control": "public, max-age=31536000",
+                "access-control-allow-origin": "*",
+            },
+        )
+
+    async def install(self, context: Any) -> None:
+        """
+        在 BrowserContext 上注册拦截；只匹配 hosts 中的域名，其余请求不经过 Python。
+        """
+        if self.enabled:
+            await context.route(self.should_intercept, self.handle_route)
+
+    async def prefetch(self, urls: Iterable[str], *, concurrency: int = 8) -> dict[str, int]:
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        targets = list(dict.fromkeys(url for url in urls if url and self.should_intercept(url)))
+        ok = 0
+
+        async def one(url: str) -> None:
+            nonlocal ok
+            async with semaphore:
+                if await self.get(url) is not None:
+                    ok += 1
+
+        await asyncio.gather(*(one(url) for url in targets))
+        return {"requested": len(targets), "available": ok, "failed": len(targets) - ok}
+
+    async def prefetch_icon_ids(self, icon_ids: Iterable[Any], *, concurrency: int = 8) -> dict[str, int]:
+        urls = [ICON_URL_TEMPLATE.format(icon_id=int(icon_id)) for icon_id in icon_ids if str(icon_id).isdigit()]
+        return await self.prefetch(urls, concurrency=concurrency)
+
+    async def prefetch_configured(self) -> None:
+        """
+        driver 启动时预取 config.ASSET_CACHE_PREFETCH_URLS / ASSET_CACHE_PREFETCH_ICON_IDS。
+        """
+        urls = list(getattr(cfg, "ASSET_CACHE_PREFETCH_URLS", []) if cfg else [])
+        icon_ids = list(getattr(cfg, "ASSET_CACHE_PREFETCH_ICON_IDS", []) if cfg else [])
+        if not self.enabled or not (urls or icon_ids):
+            return
+        result = await self.prefetch(
+            urls + [ICON_URL_TEMPLATE.format(icon_id=int(i)) for i in icon_ids if str(i).isdigit()]
+        )
+        logger.info(f"asset_cache 预取完成: {result}")
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                **self._counters,
+                "urls": len(self._manifest or {}),
+                "disk_bytes": sum(self._object_sizes.values()),
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "negative": len(self._failures),
+                "coalesced": self._flight.stats()["coalesced"],
+            }
+
+
+asset_cache = AssetCache(
+    cache_dir=str(getattr(cfg, "ASSET_CACHE_DIR", "data/cache/assets") if cfg else "data/cache/assets"),
+    hosts=tuple(getattr(cfg, "ASSET_CACHE_HOSTS", DEFAULT_ASSET_HOSTS) if cfg else DEFAULT_ASSET_HOSTS),
+    memory_max_bytes=int(getattr(cfg, "ASSET_CACHE_MEMORY_MAX_MB", 32) if cfg else 32) * 1024 * 1024,
+    max_age_seconds=float(getattr(cfg, "ASSET_CACHE_MAX_AGE_SECONDS", 7 * 24 * 3600) if cfg else 7 * 24 * 3600),
+    disk_max_bytes=int(getattr(cfg, "ASSET_CACHE_DISK_MAX_MB", 256) if cfg else 256) * 1024 * 1024,
+    enabled=bool(getattr(cfg, "ASSET_CACHE_ENABLED", True) if cfg else True),
+)
@@ -0,0 +1,369 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional, TypeVar
+
+try:
+    from nonebot import logger  # type: ignore
+except Exception:  # pragma: no cover
+    import logging
+
+    logger = logging.getLogger(__name__)
+
+try:
+    import config as cfg
+except Exception:  # pragma: no cover
+    cfg = None  # type: ignore
+
+
+from src.infra.asset_cache import asset_cache
+
+T = TypeVar("T")
+
+DEFAULT_VIEWPORT = {"width": 1920, "height": 1080}
+
+
+def _import_async_playwright() -> Any:
+    try:
+        from playwright.async_api import async_playwright  # type: ignore
+    except Exception as exc:  # pragma: no cover
+        raise RuntimeError("缺少依赖 playwright：请安装 playwright 并执行 playwright install") from exc
+    return async_playwright
+
+
+class _PooledPage:
+    __slots__ = ("generation", "profile", "context", "page", "uses")
+
+    def __init__(self, generation: int, profile: tuple[Any, ...], context: Any, page: Any) -> None:
+        self.generation = generation
+        self.profile = profile
+        self.context = context
+        self.page = page
+        self.uses = 0
+
+
+class BrowserPool:
+    """
+    进程级 Chromium 复用池：替代每次截图都 async_playwright() + launch() 的冷启动。
+
+    - 浏览器懒启动（或由 driver on_startup 预热），同一时刻最多 max_pages 个页面在渲染
+    - 页面按 (device_scale_factor, viewport) 分组复用，每个页面独占一个 context；
+      isolated=True 时每次新建 context，用完即关（访问外部站点时避免 cookie/缓存串用）
+    - 新建 context 时依次执行 context_hooks（如注册静态资源拦截）
+    - 浏览器断开（崩溃 / 被杀）后下一次取页自动重启；run() 在渲染中途断开时重试一次
+    - 累计渲染 recycle_after 次后换新浏览器，旧浏览器等在途页面归还后再关闭，限制内存增长
+    - 绑定启动时的事件循环，换循环（如基准脚本多次 asyncio.run）会丢弃旧实例重新启动
+    """
+
+    def __init__(
+        self,
+        *,
+        max_pages: int = 4,
+        prewarm_pages: int = 1,
+        recycle_after: int = 200,
+        launch_timeout: float = 30.0,
+        launch_args: Optional[list[str]] = None,
+        context_hooks: Optional[list[Callable[[Any], Awaitable[None]]]] = None,
+    ) -> None:
+        self.max_pages = max(1, int(max_pages))
+        self.prewarm_pages = max(0, min(int(prewarm_pages), self.max_pages))
+        self.recycle_after = max(0, int(recycle_after))
+        self.launch_timeout = float(launch_timeout)
+        self.launch_args = list(launch_args or [])
+        self.context_hooks = list(context_hooks or [])
+
+        self._loop_id: Optional[int] = None
+        self._launch_lock: Optional[asyncio.Lock] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._playwright: Any = None
+        self._browser: Any = None
+        self._generation = 0
+        self._generation_renders = 0
+        self._lost_generations: set[int] = set()
+        self._retiring: dict[int, Any] = {}
+        self._leases: dict[int, int] = {}
+        self._idle: list[_PooledPage] = []
+        self._inflight = 0
+        self._counters = {
+            "launches": 0,
+            "crashes": 0,
+            "recycles": 0,
+            "renders": 0,
+            "retries": 0,
+            "pages_created": 0,
+            "pages_reused": 0,
+            "launch_seconds": 0.0,
+        }
+
+    # ---- 生命周期 -------------------------------------------------------
+
+    def _bind_loop(self) -> None:
+        loop_id = id(asyncio.get_running_loop())
+        if self._loop_id == loop_id:
+            return
+        if self._loop_id is not None:
+            logger.warning("browser_pool 检测到事件循环变化，丢弃旧浏览器实例")
+        self._loop_id = loop_id
+        self._launch_lock = asyncio.Lock()
+        self._semaphore = asyncio.Semaphore(self.max_pages)
+        self._playwright = None
+        self._browser = None
+        self._retiring.clear()
+        self._leases.clear()
+        self._idle.clear()
+        self._inflight = 0
+
+    def _browser_alive(self) -> bool:
+        if self._browser is None or self._generation in self._lost_generations:
+            return False
+        try:
+            return bool(self._browser.is_connected())
+        except Exception:
+            return False
+
+    async def _ensure_browser(self) -> Any:
+        self._bind_loop()
+        if self._browser_alive():
+            return self._browser
+        assert self._launch_lock is not None
+        async with self._launch_lock:
+            if self._browser_alive():
+                return self._browser
+            if self._browser is not None:
+                self._counters["crashes"] += 1
+                logger.warning(f"browser_pool 浏览器已断开，准备重启: generation={self._generation}")
+                self._drop_generation(self._generation)
+                await self._close_quietly(self._browser)
+                self._browser = None
+
+            started_at = time.perf_counter()
+            if self._playwright is None:
+                async_playwright = _import_async_playwright()
+                self._playwright = await async_playwright().start()
+            browser = await self._playwright.chromium.launch(
+                headless=True,
+                args=self.launch_args or None,
+                timeout=self.launch_timeout * 1000,
+            )
+            self._generation += 1
+            self._generation_renders = 0
+            generation = self._generation
+            browser.on("disconnected", lambda _browser: self._lost_generations.add(generation))
+            self._browser = browser
+            elapsed = time.perf_counter() - started_at
+            self._counters["launches"] += 1
+            self._counters["launch_seconds"] += elapsed
+            logger.info(f"browser_pool 已启动 Chromium: generation={generation} elapsed={elapsed:.2f}s")
+            return browser
+
+    async def start(self) -> None:
+        """
+        driver 启动时预热：拉起浏览器并创建 prewarm_pages 个默认规格（2x 截图）的页面。
+        缺少 playwright 或启动失败只记日志，首次渲染时会再尝试。
+        """
+        try:
+            await self._ensure_browser()
+            pages = [await self._new_page(self._profile(2, None)) for _ in range(self.prewarm_pages)]
+            self._idle.extend(pages)
+            logger.info(f"browser_pool 预热完成: pages={len(pages)} max_pages={self.max_pages}")
+        except Exception as exc:
+            logger.warning(f"browser_pool 预热失败，将在首次渲染时启动: {exc}")
+
+    async def aclose(self) -> None:
+        try:
+            current_loop_id: Optional[int] = id(asyncio.get_running_loop())
+        except RuntimeError:
+            current_loop_id = None
+        if self._loop_id is None or self._loop_id != current_loop_id:
+            return
+        idle, self._idle = self._idle, []
+        for pooled in idle:
+            await self._close_quietly(pooled.context)
+        browsers = list(self._retiring.values())
+        if self._browser is not None:
+            browsers.append(self._browser)
+        self._retiring.clear()
+        self._browser = None
+        for browser in browsers:
+            await self._close_quietly(browser)
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception as exc:
+                logger.warning(f"browser_pool 关闭 playwright 失败: {exc}")
+        self._playwright = None
+        logger.info(f"browser_pool 已关闭: {self.stats()}")
+
+    # ---- 页面租借 -------------------------------------------------------
+
+    @staticmethod
+    def _profile(device_scale_factor: float, viewport: Optional[dict[str, int]]) -> tuple[Any, ...]:
+        viewport = viewport or DEFAULT_VIEWPORT
+        return (float(device_scale_factor), int(viewport["width"]), int(viewport["height"]))
+
+    @staticmethod
+    async def _close_quietly(target: Any) -> None:
+        try:
+            await target.close()
+        except Exception:
+            pass
+
+    async def _new_page(self, profile: tuple[Any, ...]) -> _PooledPage:
+        browser = await self._ensure_browser()
+        scale, width, height = profile
+        context = await browser.new_context(
+            viewport={"width": width, "height": height},
+            device_scale_factor=scale,
+        )
+        for hook in self.context_hooks:
+            await hook(context)
+        page = await context.new_page()
+        self._counters["pages_created"] += 1
+        return _PooledPage(self._generation, profile, context, page)
+
+    def _drop_generation(self, generation: int) -> None:
+        self._idle = [pooled for pooled in self._idle if pooled.generation != generation]
+
+    async def _take_page(self, profile: tuple[Any, ...]) -> _PooledPage:
+        await self._ensure_browser()
+        while self._idle:
+            for i, pooled in enumerate(self._idle):
+                if pooled.profile == profile:
+                    break
+            else:
+                break
+            self._idle.pop(i)
+            if pooled.generation == self._generation and not pooled.page.is_closed():
+                self._counters["pages_reused"] += 1
+                return pooled
+            await self._close_quietly(pooled.context)
+        return await self._new_page(profile)
+
+    async def _return_page(self, pooled: _PooledPage, *, healthy: bool) -> None:
+        reusable = (
+            healthy
+            and pooled.generation == self._generation
+            and pooled.generation not in self._lost_generations
+            and not pooled.page.is_closed()
+            and len(self._idle) < self.max_pages
+        )
+        if reusable:
+            self._idle.append(pooled)
+        else:
+            await self._close_quietly(pooled.context)
+
+    async def _release_generation(self, generation: int) -> None:
+        remaining = self._leases.get(generation, 0) - 1
+        if remaining > 0:
+            self._leases[generation] = remaining
+            return
+        self._leases.pop(generation, None)
+        browser = self._retiring.pop(generation, None)
+        if browser is not None:
+            await self._close_quietly(browser)
+            logger.info(f"browser_pool 旧浏览器已回收: generation={generation}")
+
+    async def _maybe_recycle(self) -> None:
+        if not self.recycle_after or self._generation_renders < self.recycle_after or self._browser is None:
+            return
+        generation = self._generation
+        browser = self._browser
+        self._browser = None
+        self._drop_generation(generation)
+        self._counters["recycles"] += 1
+        logger.info(f"browser_pool 渲染 {self._generation_renders} 次后轮换浏览器: generation={generation}")
+        if self._leases.get(generation):
+            self._retiring[generation] = browser
+        else:
+            await self._close_quietly(browser)
+
+    @asynccontextmanager
+    async def page(
+        self,
+        *,
+        device_scale_factor: float = 2,
+        viewport: Optional[dict[str, int]] = None,
+        isolated: bool = False,
+    ) -> AsyncIterator[Any]:
+        """
+        租用一个页面。正常退出时页面归还池中复用；抛异常或 isolated=True 时关闭其 context。
+        """
+        self._bind_loop()
+        assert self._semaphore is not None
+        profile = self._profile(device_scale_factor, viewport)
+        async with self._semaphore:
+            self._inflight += 1
+            try:
+                pooled = await (self._new_page(profile) if isolated else self._take_page(profile))
+            except BaseException:
+                self._inflight -= 1
+                raise
+            generation = pooled.generation
+            self._leases[generation] = self._leases.get(generation, 0) + 1
+            healthy = False
+            try:
+                yield pooled.page
+                healthy = not isolated
+            finally:
+                self._inflight -= 1
+                pooled.uses += 1
+                self._counters["renders"] += 1
+                if generation == self._generation:
+                    self._generation_renders += 1
+                await self._return_page(pooled, healthy=healthy)
+                await self._release_generation(generation)
+                await self._maybe_recycle()
+
+    async def run(
+        self,
+        fn: Callable[[Any], Awaitable[T]],
+        *,
+        device_scale_factor: float = 2,
+        viewport: Optional[dict[str, int]] = None,
+        isolated: bool = False,
+    ) -> T:
+        """
+        在租用的页面上执行 fn(page)；若执行期间浏览器断开（崩溃），换新浏览器重试一次。
+        """
+        for attempt in range(2):
+            generation_before = self._generation
+            try:
+                async with self.page(
+                    device_scale_factor=device_scale_factor,
+                    viewport=viewport,
+                    isolated=isolated,
+                ) as page:
+                    generation_before = self._generation
+                    return await fn(page)
+            except Exception:
+                browser_lost = generation_before in self._lost_generations
+                if attempt == 0 and browser_lost:
+                    self._counters["retries"] += 1
+                    logger.warning(f"browser_pool 渲染中浏览器断开，重试一次: generation={generation_before}")
+                    continue
+                raise
+        raise RuntimeError("browser_pool 渲染失败")  # pragma: no cover
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            **self._counters,
+            "launch_seconds": round(self._counters["launch_seconds"], 3),
+            "generation": self._generation,
+            "generation_renders": self._generation_renders,
+            "connected": self._browser_alive(),
+            "idle_pages": len(self._idle),
+            "inflight": self._inflight,
+            "retiring": len(self._retiring),
+            "max_pages": self.max_pages,
+        }
+
+
+browser_pool = BrowserPool(
+    max_pages=int(getattr(cfg, "BROWSER_POOL_MAX_PAGES", 4) if cfg else 4),
+    prewarm_pages=int(getattr(cfg, "BROWSER_POOL_PREWARM_PAGES", 1) if cfg else 1),
+    recycle_after=int(getattr(cfg, "BROWSER_POOL_RECYCLE_AFTER", 200) if cfg else 200),
+    launch_args=list(getattr(cfg, "BROWSER_POOL_LAUNCH_ARGS", []) if cfg else []),
+    context_hooks=[asset_cache.install],
+)
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+try:
+    from nonebot import logger  # type: ignore
+except Exception:  # pragma: no cover
+    import logging
+
+    logger = logging.getLogger(__name__)
+
+try:
+    import config as cfg
+except Exception:  # pragma: no cover
+    cfg = None  # type: ignore
+
+from src.infra.http_pool import http_pool
+from src.infra.single_flight import SingleFlight
+
+
+@dataclass(frozen=True)
+class PageValidators:
+    """
+    页面主文档的校验信息：ETag / Last-Modified 用于条件请求，body_sha256 在站点不返回二者时兜底比对。
+    """
+
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    body_sha256: Optional[str] = None
+
+    @classmethod
+    def from_response(cls, headers: dict[str, str], body: Optional[bytes]) -> "PageValidators":
+        lowered = {str(k).lower(): v for k, v in (headers or {}).items()}
+        return cls(
+            etag=lowered.get("etag"),
+            last_modified=lowered.get("last-modified"),
+            body_sha256=hashlib.sha256(body).hexdigest() if body else None,
+        )
+
+    @property
+    def empty(self) -> bool:
+        return not (self.etag or self.last_modified or self.body_sha256)
+
+
+@dataclass(frozen=True)
+class CaptureResult:
+    image: bytes
+    validators: PageValidators = PageValidators()
+
+
+@dataclass(frozen=True)
+class _Entry:
+    image: bytes
+    validators: PageValidators
+    captured_at: float
+    validated_at: float
+
+
+class PageCaptureCache:
+    """
+    外部网页截图缓存，键为 (url, selector, adjust_top)。
+
+    - TTL 内直接返回
+    - 过期后先对 url 发条件请求（If-None-Match / If-Modified-Since，无校验头时比对主文档哈希），
+      页面未变则续期，变了才重新截图
+    - 单页应用的主文档可能长期不变而内容在变，因此距上次真正截图超过 max_age 后一律重新截图
+    - 同一键的并发截图经 single flight 合并为一次
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float = 300.0,
+        max_age_seconds: float = 3600.0,
+        max_entries: int = 32,
+        revalidate_timeout: float = 5.0,
+        enabled: bool = True,
+    ) -> None:
+        self.ttl_seconds = float(ttl_seconds)
+        self.max_age_seconds = max(float(max_age_seconds), self.ttl_seconds)
+        self.max_entries = max(0, int(max_entries))
+        self.revalidate_timeout = float(revalidate_timeout)
+        self.enabled = bool(enabled) and self.max_entries > 0 and self.ttl_seconds > 0
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._flight = SingleFlight("capture_cache")
+        self._counters = {"hits": 0, "revalidated": 0, "changed": 0, "captures": 0, "evictions": 0}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def _get(self, key: Hashable) -> Optional[_Entry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _put(self, key: Hashable, entry: _Entry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    async def _unchanged(self, url: str, validators: PageValidators) -> bool:
+        if validators.empty:
+            return False
+        headers = {}
+        if validators.etag:
+            headers["If-None-Match"] = validators.etag
+        if validators.last_modified:
+            headers["If-Modified-Since"] = validators.last_modified
+        try:
+            response = await http_pool.arequest(
+                "GET", url, headers=headers, timeout=self.revalidate_timeout, follow_redirects=True
+            )
+        except Exception as exc:
+            logger.warning(f"capture_cache 条件请求失败，重新截图: url={url} error={exc}")
+            return False
+        if response.status_code == 304:
+            return True
+        if response.status_code != 200:
+            return False
+        current = PageValidators.from_response(dict(response.headers), response.content)
+        if validators.etag and current.etag:
+            return validators.etag == current.etag
+        if validators.last_modified and current.last_modified:
+            return validators.last_modified == current.last_modified
+        return bool(validators.body_sha256) and validators.body_sha256 == current.body_sha256
+
+    async def get_or_capture(
+        self,
+        key: Hashable,
+        url: str,
+        capture: Callable[[], Awaitable[CaptureResult]],
+    ) -> bytes:
+        if not self.enabled:
+            return (await capture()).image
+
+        entry = self._get(key)
+        now = time.monotonic()
+        if entry is not None and now - entry.validated_at < self.ttl_seconds:
+            self._count("hits")
+            return entry.image
+
+        async def refresh() -> bytes:
+            current = self._get(key)
+            now_inner = time.monotonic()
+            if current is not None:
+                if now_inner - current.validated_at < self.ttl_seconds:
+                    self._count("hits")
+                    return current.image
+                if now_inner - current.captured_at < self.max_age_seconds and await self._unchanged(
+                    url, current.validators
+                ):
+                    self._count("revalidated")
+                    self._put(key, replace(current, validated_at=time.monotonic()))
+                    return current.image
+                self._count("changed")
+
+            result = await capture()
+            self._count("captures")
+            captured_at = time.monotonic()
+            self._put(key, _Entry(result.image, result.validators, captured_at, captured_at))
+            return result.image
+
+        return await self._flight.do(key, refresh)
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                **self._counters,
+                "entries": len(self._entries),
+                "bytes": sum(len(entry.image) for entry in self._entries.values()),
+                "coalesced": self._flight.stats()["coalesced"],
+            }
+
+
+capture_cache = PageCaptureCache(
+    ttl_seconds=float(getattr(cfg, "CAPTURE_CACHE_TTL_SECONDS", 300) if cfg else 300),
+    max_age_seconds=float(getattr(cfg, "CAPTURE_CACHE_MAX_AGE_SECONDS", 3600) if cfg else 3600),
+    max_entries=int(getattr(cfg, "CAPTURE_CACHE_MAX_ENTRIES", 32) if cfg else 32),
+    enabled=bool(getattr(cfg, "CAPTURE_CACHE_ENABLED", True) if cfg else True),
+)
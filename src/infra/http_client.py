@@ -7,6 +7,8 @@ from typing import Any, Mapping
 import httpx
 from nonebot import logger
 
+from src.infra.http_pool import HttpPool, http_pool
+
 
 class HttpClient:
     def __init__(
@@ -17,12 +19,14 @@ class HttpClient:
         backoff_seconds: float = 0.5,
         verify: bool = True,
         default_headers: Mapping[str, str] | None = None,
+        pool: HttpPool | None = None,
     ) -> None:
         self.timeout = timeout
         self.retries = retries
         self.backoff_seconds = backoff_seconds
         self.verify = verify
         self.default_headers = dict(default_headers or {})
+        self.pool = pool or http_pool
 
     def request_json(
         self,
@@ -43,18 +47,16 @@ class HttpClient:
         last_error: str | None = None
         for attempt in range(self.retries + 1):
             try:
-                with httpx.Client(
-                    timeout=timeout or self.timeout,
+                response = self.pool.request(
+                    method,
+                    url,
                     verify=self.verify if verify is None else verify,
+                    params=params,
                     headers=merged_headers,
-                ) as client:
-                    response = client.request(
-                        method.upper(),
-                        url,
-                        params=params,
-                        json=json_body,
-                        content=content,
-                    )
+                    json=json_body,
+                    content=content,
+                    timeout=timeout or self.timeout,
+                )
                 if response.status_code >= 400:
                     return {
                         "error": f"http_status_{response.status_code}",
@@ -98,18 +100,16 @@ class HttpClient:
         last_error: str | None = None
         for attempt in range(self.retries + 1):
             try:
-                async with httpx.AsyncClient(
-                    timeout=timeout or self.timeout,
+                response = await self.pool.arequest(
+                    method,
+                    url,
                     verify=self.verify if verify is None else verify,
+                    params=params,
                     headers=merged_headers,
-                ) as client:
-                    response = await client.request(
-                        method.upper(),
-                        url,
-                        params=params,
-                        json=json_body,
-                        content=content,
-                    )
+                    json=json_body,
+                    content=content,
+                    timeout=timeout or self.timeout,
+                )
                 if response.status_code >= 400:
                     return {
                         "error": f"http_status_{response.status_code}",
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+try:
+    from nonebot import logger  # type: ignore
+except Exception:  # pragma: no cover
+    import logging
+
+    logger = logging.getLogger(__name__)
+
+try:
+    import config as cfg
+except Exception:  # pragma: no cover
+    cfg = None  # type: ignore
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # type: ignore  # noqa: F401
+    except Exception:
+        return False
+    return True
+
+
+def _reject_all_cookies() -> CookieJar:
+    """
+    不接受任何 Set-Cookie 的 cookie jar：共享 client 不能把某个调用方响应里的 cookie
+    带到同一 origin 的其他请求上；需要 cookie 的调用方在请求头或 cookies 参数中显式传入。
+    """
+    return CookieJar(policy=DefaultCookiePolicy(allowed_domains=[]))
+
+
+class HttpPool:
+    """
+    进程级 HTTP 连接池：按 (scheme://host, verify) 复用长连接。
+
+    - 同步 client 线程间共享（httpx.Client 本身线程安全）
+    - 异步 client 绑定创建时的事件循环，跨循环调用会另建一份
+    - client 不保存响应中的 cookie，与原先每次新建 client 的行为一致
+    - 由 NoneBot driver 的 on_shutdown 统一关闭
+    """
+
+    def __init__(
+        self,
+        *,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        http2: bool = True,
+        timeout: float = 30.0,
+    ) -> None:
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.http2 = bool(http2) and _http2_available()
+        self.timeout = timeout
+        self._sync_clients: dict[tuple[str, bool], httpx.Client] = {}
+        self._async_clients: dict[tuple[str, bool, int], httpx.AsyncClient] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _origin(url: str) -> str:
+        parts = urlsplit(str(url))
+        return f"{parts.scheme}://{parts.netloc}".lower()
+
+    def get_sync_client(self, url: str, *, verify: bool = True) -> httpx.Client:
+        key = (self._origin(url), bool(verify))
+        with self._lock:
+            client = self._sync_clients.get(key)
+            if client is None or client.is_closed:
+                client = httpx.Client(
+                    limits=self.limits,
+                    http2=self.http2,
+                    verify=verify,
+                    timeout=self.timeout,
+                    cookies=_reject_all_cookies(),
+                )
+                self._sync_clients[key] = client
+                logger.debug(f"http_pool 新建同步连接池: origin={key[0]} verify={key[1]} http2={self.http2}")
+        return client
+
+    def get_async_client(self, url: str, *, verify: bool = True) -> httpx.AsyncClient:
+        loop_id = id(asyncio.get_running_loop())
+        key = (self._origin(url), bool(verify), loop_id)
+        with self._lock:
+            client = self._async_clients.get(key)
+            if client is None or client.is_closed:
+                client = httpx.AsyncClient(
+                    limits=self.limits,
+                    http2=self.http2,
+                    verify=verify,
+                    timeout=self.timeout,
+                    cookies=_reject_all_cookies(),
+                )
+                self._async_clients[key] = client
+                logger.debug(f"http_pool 新建异步连接池: origin={key[0]} verify={key[1]} http2={self.http2}")
+        return client
+
+    def request(self, method: str, url: str, *, verify: bool = True, **kwargs: Any) -> httpx.Response:
+        return self.get_sync_client(url, verify=verify).request(method.upper(), url, **kwargs)
+
+    async def arequest(self, method: str, url: str, *, verify: bool = True, **kwargs: Any) -> httpx.Response:
+        return await self.get_async_client(url, verify=verify).request(method.upper(), url, **kwargs)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "http2": self.http2,
+                "sync_origins": sorted({key[0] for key in self._sync_clients}),
+                "async_origins": sorted({key[0] for key in self._async_clients}),
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            clients = list(self._sync_clients.values())
+            self._sync_clients.clear()
+        for client in clients:
+            try:
+                client.close()
+            except Exception as exc:
+                logger.warning(f"http_pool 关闭同步连接池失败: {exc}")
+
+    async def aclose(self) -> None:
+        try:
+            current_loop_id: Optional[int] = id(asyncio.get_running_loop())
+        except RuntimeError:
+            current_loop_id = None
+        with self._lock:
+            clients = list(self._async_clients.items())
+            self._async_clients.clear()
+        for (origin, _verify, loop_id), client in clients:
+            if loop_id != current_loop_id:
+                # 其他事件循环创建的 client 无法在当前循环里 await 关闭，直接丢弃
+                continue
+            try:
+                await client.aclose()
+            except Exception as exc:
+                logger.warning(f"http_pool 关闭异步连接池失败: origin={origin} error={exc}")
+        self.close()
+        logger.info("http_pool 已关闭全部连接池")
+
+
+http_pool = HttpPool(
+    max_connections=int(getattr(cfg, "HTTP_POOL_MAX_CONNECTIONS", 100) if cfg else 100),
+    max_keepalive_connections=int(getattr(cfg, "HTTP_POOL_MAX_KEEPALIVE", 20) if cfg else 20),
+    keepalive_expiry=float(getattr(cfg, "HTTP_POOL_KEEPALIVE_EXPIRY", 30.0) if cfg else 30.0),
+    http2=bool(getattr(cfg, "HTTP_POOL_HTTP2", True) if cfg else True),
+)
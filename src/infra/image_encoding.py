@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import io
+import threading
+from dataclasses import dataclass
+from typing import Any, Mapping, Optional
+
+try:
+    from nonebot import logger  # type: ignore
+except Exception:  # pragma: no cover
+    import logging
+
+    logger = logging.getLogger(__name__)
+
+try:
+    import config as cfg
+except Exception:  # pragma: no cover
+    cfg = None  # type: ignore
+
+
+# png / jpeg 由 Chromium 直接输出；webp / png8（256 色量化 PNG）需要 Pillow 做后处理
+IMAGE_FORMATS = ("png", "jpeg", "webp", "png8")
+
+
+@dataclass(frozen=True)
+class ImageEncoding:
+    """
+    截图输出编码：格式、质量（jpeg / webp，1-100）与设备缩放倍数（device_scale_factor）。
+    """
+
+    format: str = "png"
+    quality: Optional[int] = None
+    scale: float = 2.0
+
+    def __post_init__(self) -> None:
+        if self.format not in IMAGE_FORMATS:
+            raise ValueError(f"不支持的图片格式: {self.format}，可选 {IMAGE_FORMATS}")
+        if self.quality is not None and not 1 <= int(self.quality) <= 100:
+            raise ValueError(f"图片质量需在 1-100 之间: {self.quality}")
+        if not 0.5 <= float(self.scale) <= 4:
+            raise ValueError(f"缩放倍数需在 0.5-4 之间: {self.scale}")
+
+    @classmethod
+    def from_config(cls, value: Any) -> "ImageEncoding":
+        if isinstance(value, ImageEncoding):
+            return value
+        if isinstance(value, Mapping):
+            return cls(
+                format=str(value.get("format", "png")),
+                quality=value.get("quality"),
+                scale=float(value.get("scale", 2.0)),
+            )
+        if isinstance(value, str):
+            return cls(format=value)
+        return cls()
+
+    @property
+    def signature(self) -> str:
+        return f"{self.format}:{self.quality or ''}:{self.scale:g}"
+
+
+DEFAULT_ENCODING = ImageEncoding()
+
+
+def _configured_template_encodings() -> dict[str, ImageEncoding]:
+    raw = dict(getattr(cfg, "RENDER_ENCODING_BY_TEMPLATE", {}) or {}) if cfg else {}
+    result: dict[str, ImageEncoding] = {}
+    for template_name, value in raw.items():
+        try:
+            result[str(template_name)] = ImageEncoding.from_config(value)
+        except ValueError as exc:
+            logger.warning(f"忽略无效的模板图片编码配置: template={template_name} error={exc}")
+    return result
+
+
+_default_encoding = ImageEncoding.from_config(getattr(cfg, "RENDER_ENCODING_DEFAULT", None) if cfg else None)
+_template_encodings = _configured_template_encodings()
+
+
+def resolve_encoding(template_name: Optional[str], encoding: Optional[ImageEncoding] = None) -> ImageEncoding:
+    """
+    优先级：调用方显式传入 > config.RENDER_ENCODING_BY_TEMPLATE[模板] > config.RENDER_ENCODING_DEFAULT。
+    """
+    if encoding is not None:
+        return encoding
+    if template_name and template_name in _template_encodings:
+        return _template_encodings[template_name]
+    return _default_encoding
+
+
+_pillow_warned = False
+
+
+def _load_pillow() -> Any:
+    global _pillow_warned
+    try:
+        from PIL import Image  # type: ignore
+    except Exception:
+        if not _pillow_warned:
+            _pillow_warned = True
+            logger.warning("未安装 Pillow，webp / png8 输出将退回为 PNG（pip install Pillow）")
+        return None
+    return Image
+
+
+def transcode(png_bytes: bytes, encoding: ImageEncoding) -> bytes:
+    """
+    把 Chromium 输出的 PNG 转为 webp / png8；其余格式原样返回。缺少 Pillow 时返回原 PNG。
+    """
+    if encoding.format not in ("webp", "png8"):
+        return png_bytes
+    Image = _load_pillow()
+    if Image is None:
+        return png_bytes
+    with Image.open(io.BytesIO(png_bytes)) as image:
+        output = io.BytesIO()
+        if encoding.format == "webp":
+            image.save(output, format="WEBP", quality=int(encoding.quality or 85), method=4)
+        else:
+            quantized = image.convert("RGB").quantize(colors=256, method=Image.Quantize.FASTOCTREE)
+            quantized.save(output, format="PNG", optimize=True)
+        return output.getvalue()
+
+
+class EncodingReport:
+    """
+    按 (模板, 格式) 汇总输出图片的张数、体积与截图耗时，用于评估编码配置的效果。
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._rows: dict[tuple[str, str], dict[str, float]] = {}
+
+    def record(self, template_name: str, encoding: ImageEncoding, size: int, elapsed: float) -> None:
+        with self._lock:
+            row = self._rows.setdefault(
+                (template_name, encoding.signature),
+                {"count": 0, "bytes": 0, "max_bytes": 0, "seconds": 0.0},
+            )
+            row["count"] += 1
+            row["bytes"] += size
+            row["max_bytes"] = max(row["max_bytes"], size)
+            row["seconds"] += elapsed
+
+    def stats(self) -> list[dict[str, Any]]:
+        with self._lock:
+            rows = list(self._rows.items())
+        result = []
+        for (template_name, signature), row in sorted(rows):
+            count = int(row["count"]) or 1
+            result.append(
+                {
+                    "template": template_name,
+                    "encoding": signature,
+                    "count": int(row["count"]),
+                    "avg_kb": round(row["bytes"] / count / 1024, 1),
+                    "max_kb": round(row["max_bytes"] / 1024, 1),
+                    "avg_ms": round(row["seconds"] / count * 1000, 1),
+                }
+            )
+        return result
+
+
+encoding_report = EncodingReport()
@@ -4,9 +4,9 @@ import os
 from typing import Optional
 
 import aiofiles
-import httpx
 
 from config import IMAGE_CACHE_DIR
+from src.infra.http_pool import http_pool
 
 
 async def mp_image(url: str, name: str) -> Optional[bytes]:
@@ -31,12 +31,11 @@ async def mp_image(url: str, name: str) -> Optional[bytes]:
         print("未找到图片URL")
         return None
 
-    async with httpx.AsyncClient(headers=headers, verify=False, timeout=30.0) as client:
-        image_response = await client.get(url)
-        if image_response.status_code != 200:
-            print(f"无法下载图片，状态码：{image_response.status_code}")
-            return None
-        image_content = image_response.content
+    image_response = await http_pool.arequest("GET", url, verify=False, headers=headers, timeout=30.0)
+    if image_response.status_code != 200:
+        print(f"无法下载图片，状态码：{image_response.status_code}")
+        return None
+    image_content = image_response.content
 
     os.makedirs(IMAGE_CACHE_DIR, exist_ok=True)
     async with aiofiles.open(file_path, "wb") as f:
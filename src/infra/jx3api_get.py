@@ -8,6 +8,7 @@ from typing import Any, Optional
 from cacheout import Cache
 
 from src.infra.http_client import HttpClient
+from src.infra.single_flight import SingleFlight, make_flight_key
 
 try:
     from nonebot import logger  # type: ignore
@@ -27,6 +28,9 @@ _server_data_file = "server_data.json"
 
 _cache_ttl_seconds = int(getattr(cfg, "SESSION_data", 720) if cfg else 720)
 _cache = Cache(maxsize=256, ttl=_cache_ttl_seconds, timer=time.time, default=None)
+_http_client = HttpClient(timeout=30.0, retries=2, backoff_seconds=0.5, verify=False)
+# 同一 (url, params) 的并发请求只发一次；cacheout 负责响应落地后的复用
+jx3api_single_flight = SingleFlight("jx3api_get")
 
 
 def _extract_server_items(payload: Any) -> list[dict]:
@@ -100,13 +104,16 @@ async def get(
     cache_data = _cache.get(cache_key)
     if cache_data:
         logger.debug("jx3api_get cache hit: {}", cache_key)
+        jx3api_single_flight.record_cache_hit()
         return cache_data
 
-    http_client = HttpClient(timeout=30.0, retries=2, backoff_seconds=0.5, verify=False)
-    data = await http_client.arequest_json("GET", url, params=params, verify=False)
-    if isinstance(data, dict) and not data.get("error"):
-        _cache.set(cache_key, data)
-    return data
+    async def fetch() -> dict:
+        data = await _http_client.arequest_json("GET", url, params=params, verify=False)
+        if isinstance(data, dict) and not data.get("error"):
+            _cache.set(cache_key, data)
+        return data
+
+    return await jx3api_single_flight.do(make_flight_key(url, params), fetch)
 
 
 async def idget(server_name: str) -> bool:
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    线程安全的令牌桶限速器。
+
+    采用“预约”方式发放令牌：调用方先在锁内预约一个令牌并拿到需要等待的秒数，
+    再在锁外等待。因此既可以在线程池里同步阻塞等待，也可以在事件循环里异步等待，
+    两类调用方共享同一份预算。
+    """
+
+    def __init__(self, *, rate: float, burst: int = 1) -> None:
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def _reserve(self) -> float:
+        if not self.enabled:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._updated_at
+            self._updated_at = now
+            self._tokens = min(float(self.burst), self._tokens + elapsed * self.rate)
+            self._tokens -= 1.0
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire_sync(self) -> float:
+        wait_seconds = self._reserve()
+        if wait_seconds > 0:
+            time.sleep(wait_seconds)
+        return wait_seconds
+
+    async def acquire(self) -> float:
+        wait_seconds = self._reserve()
+        if wait_seconds > 0:
+            await asyncio.sleep(wait_seconds)
+        return wait_seconds
@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+import asyncio
+import datetime as _dt
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional
+
+try:
+    from nonebot import logger  # type: ignore
+except Exception:  # pragma: no cover
+    import logging
+
+    logger = logging.getLogger(__name__)
+
+try:
+    import config as cfg
+except Exception:  # pragma: no cover
+    cfg = None  # type: ignore
+
+from src.infra.single_flight import SingleFlight
+
+
+def _stable_default(value: Any) -> Any:
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=repr)
+    if isinstance(value, (bytes, bytearray)):
+        return {"__bytes__": hashlib.sha256(bytes(value)).hexdigest()}
+    if isinstance(value, (_dt.datetime, _dt.date, _dt.time)):
+        return value.isoformat()
+    # 其余对象退化为 repr；repr 含内存地址时只会导致未命中，不会错误命中
+    return repr(value)
+
+
+def make_render_key(
+    template_name: str,
+    template_mtime: Optional[float],
+    context: dict[str, Any],
+    width: int,
+    height: int | str,
+    *,
+    variant: str = "",
+) -> str:
+    """
+    渲染结果的内容寻址键：sha256(模板名, 模板 mtime, 上下文规范化 JSON, 宽, 高)；
+    variant 用于区分同一模板的其他渲染差异（如绑定的过滤器）。
+    """
+    payload = json.dumps(
+        [template_name, template_mtime, context, width, height, variant],
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(",", ":"),
+        default=_stable_default,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RenderCache:
+    """
+    模板截图缓存：内存 LRU + 磁盘两级，键为 make_render_key() 的内容哈希。
+
+    - 内存层按条数与总字节数淘汰（LRU）；磁盘层按 mtime 判断 TTL，超出容量时删除最旧的文件
+    - 磁盘读写在线程中执行；同一键的并发渲染经 single flight 合并为一次
+    - 命中/未命中等计数见 stats()
+    """
+
+    def __init__(
+        self,
+        *,
+        disk_dir: Optional[str],
+        ttl_seconds: float = 3600.0,
+        memory_max_entries: int = 128,
+        memory_max_bytes: int = 64 * 1024 * 1024,
+        disk_max_bytes: int = 512 * 1024 * 1024,
+        enabled: bool = True,
+    ) -> None:
+        self.disk_dir = disk_dir
+        self.ttl_seconds = float(ttl_seconds)
+        self.memory_max_entries = max(0, int(memory_max_entries))
+        self.memory_max_bytes = max(0, int(memory_max_bytes))
+        self.disk_max_bytes = max(0, int(disk_max_bytes))
+        self.enabled = bool(enabled)
+        self._memory: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes: Optional[int] = None
+        self._lock = threading.Lock()
+        self._flight = SingleFlight("render_cache")
+        self._counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+            "expired": 0,
+        }
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += amount
+
+    def _fresh(self, created_at: float, now: Optional[float] = None) -> bool:
+        return self.ttl_seconds <= 0 or (now or time.time()) - created_at < self.ttl_seconds
+
+    # ---- 内存层 ---------------------------------------------------------
+
+    def _memory_get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            created_at, data = entry
+            if not self._fresh(created_at):
+                self._memory.pop(key, None)
+                self._memory_bytes -= len(data)
+                self._counters["expired"] += 1
+                return None
+            self._memory.move_to_end(key)
+            return data
+
+    def _memory_put(self, key: str, data: bytes, created_at: float) -> None:
+        if not self.memory_max_entries or len(data) > self.memory_max_bytes:
+            return
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memory_bytes -= len(old[1])
+            self._memory[key] = (created_at, data)
+            self._memory_bytes += len(data)
+            while self._memory and (
+                len(self._memory) > self.memory_max_entries or self._memory_bytes > self.memory_max_bytes
+            ):
+                _, (_, evicted) = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+                self._counters["memory_evictions"] += 1
+
+    # ---- 磁盘层 ---------------------------------------------------------
+
+    def _disk_path(self, key: str) -> str:
+        assert self.disk_dir
+        return os.path.join(self.disk_dir, key[:2], f"{key}.img")
+
+    def _disk_get(self, key: str) -> Optional[tuple[float, bytes]]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            created_at = os.path.getmtime(path)
+            if not self._fresh(created_at):
+                size = os.path.getsize(path)
+                os.remove(path)
+                self._adjust_disk_bytes(-size)
+                self._count("expired")
+                return None
+            with open(path, "rb") as file_handle:
+                return created_at, file_handle.read()
+        except FileNotFoundError:
+            return None
+        except OSError as exc:
+            logger.warning(f"render_cache 读取磁盘缓存失败: path={path} error={exc}")
+            return None
+
+    def _adjust_disk_bytes(self, delta: int) -> None:
+        with self._lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes = max(0, self._disk_bytes + delta)
+
+    def _scan_disk(self) -> list[tuple[float, int, str]]:
+        files: list[tuple[float, int, str]] = []
+        if not self.disk_dir or not os.path.isdir(self.disk_dir):
+            return files
+        for root, _dirs, names in os.walk(self.disk_dir):
+            for name in names:
+                if not name.endswith(".img"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+        return files
+
+    def _disk_put(self, key: str, data: bytes) -> None:
+        if not self.disk_dir or not self.disk_max_bytes or len(data) > self.disk_max_bytes:
+            return
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as file_handle:
+                file_handle.write(data)
+            os.replace(tmp_path, path)
+        except OSError as exc:
+            logger.warning(f"render_cache 写入磁盘缓存失败: path={path} error={exc}")
+            return
+
+        with self._lock:
+            if self._disk_bytes is None:
+                need_scan = True
+            else:
+                self._disk_bytes += len(data)
+                need_scan = self._disk_bytes > self.disk_max_bytes
+        if need_scan:
+            self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        files = self._scan_disk()
+        total = sum(size for _, size, _ in files)
+        now = time.time()
+        evicted = 0
+        # 先删过期文件；超出容量时再按 mtime 从旧到新删到容量的 90%
+        over_budget = total > self.disk_max_bytes
+        target = int(self.disk_max_bytes * 0.9)
+        for mtime, size, path in sorted(files):
+            if self._fresh(mtime, now) and not (over_budget and total > target):
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+        with self._lock:
+            self._disk_bytes = total
+            self._counters["disk_evictions"] += evicted
+        if evicted:
+            logger.info(f"render_cache 磁盘淘汰: files={evicted} remaining_bytes={total}")
+
+    # ---- 对外接口 -------------------------------------------------------
+
+    async def get(self, key: str) -> Optional[bytes]:
+        data = self._memory_get(key)
+        if data is not None:
+            self._count("memory_hits")
+            return data
+        entry = await asyncio.to_thread(self._disk_get, key)
+        if entry is None:
+            return None
+        created_at, data = entry
+        self._count("disk_hits")
+        self._memory_put(key, data, created_at)
+        return data
+
+    async def put(self, key: str, data: bytes) -> None:
+        self._count("stores")
+        self._memory_put(key, data, time.time())
+        await asyncio.to_thread(self._disk_put, key, data)
+
+    async def get_or_render(self, key: str, render: Callable[[], Awaitable[bytes]]) -> bytes:
+        """
+        命中直接返回；未命中时同一键的并发调用只渲染一次，结果写入两级缓存。
+        """
+        if not self.enabled:
+            return await render()
+        cached = await self.get(key)
+        if cached is not None:
+            return cached
+
+        async def render_and_store() -> bytes:
+            cached_inner = await self.get(key)
+            if cached_inner is not None:
+                return cached_inner
+            self._count("misses")
+            data = await render()
+            if isinstance(data, (bytes, bytearray)) and data:
+                await self.put(key, bytes(data))
+            return data
+
+        return await self._flight.do(key, render_and_store)
+
+    def clear_memory(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            memory_entries = len(self._memory)
+            memory_bytes = self._memory_bytes
+            disk_bytes = self._disk_bytes
+        hits = counters["memory_hits"] + counters["disk_hits"]
+        lookups = hits + counters["misses"]
+        return {
+            **counters,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": memory_entries,
+            "memory_bytes": memory_bytes,
+            "disk_bytes": disk_bytes,
+            "coalesced": self._flight.stats()["coalesced"],
+        }
+
+
+render_cache = RenderCache(
+    disk_dir=str(getattr(cfg, "RENDER_CACHE_DISK_DIR", "data/cache/render") if cfg else "data/cache/render") or None,
+    ttl_seconds=float(getattr(cfg, "RENDER_CACHE_TTL_SECONDS", 3600) if cfg else 3600),
+    memory_max_entries=int(getattr(cfg, "RENDER_CACHE_MEMORY_MAX_ENTRIES", 128) if cfg else 128),
+    memory_max_bytes=int(getattr(cfg, "RENDER_CACHE_MEMORY_MAX_MB", 64) if cfg else 64) * 1024 * 1024,
+    disk_max_bytes=int(getattr(cfg, "RENDER_CACHE_DISK_MAX_MB", 512) if cfg else 512) * 1024 * 1024,
+    enabled=bool(getattr(cfg, "RENDER_CACHE_ENABLED", True) if cfg else True),
+)
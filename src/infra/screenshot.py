@@ -1,65 +1,60 @@
 from __future__ import annotations
 
+import asyncio
 import os
 
-async def jietu(html_content, width, height):
-    try:
-        from playwright.async_api import async_playwright  # type: ignore
-    except Exception as exc:  # pragma: no cover
-        raise RuntimeError("缺少依赖 playwright：请安装 playwright 并执行 playwright install") from exc
-
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page(
-            viewport={"width": 1920, "height": 1080},
-            device_scale_factor=2,
-        )
+from src.infra.browser_pool import DEFAULT_VIEWPORT, browser_pool
+from src.infra.capture_cache import CaptureResult, PageValidators, capture_cache
+from src.infra.image_encoding import DEFAULT_ENCODING, transcode
 
-        await page.evaluate(
-            """() => {
-                 return new Promise((resolve) => {
-                     const images = document.querySelectorAll('img');
-                     if (images.length === 0) return resolve(true);
-
-                     let loaded = 0;
-                     const checkLoaded = () => {
-                         loaded++;
-                         if (loaded === images.length) resolve(true);
-                     };
-
-                     images.forEach(img => {
-                         if (img.complete) checkLoaded();
-                         else {
-                             img.addEventListener('load', checkLoaded);
-                             img.addEventListener('error', checkLoaded);
-                         }
-                     });
-                 });
-             }"""
-        )
+# browser.new_page() 未指定视口时 Playwright 的默认值
+JX3WEB_VIEWPORT = {"width": 1280, "height": 720}
 
-        await page.set_content(html_content)
-        page_height = await page.evaluate("() => document.body.scrollHeight")
-        if height == "ck":
-            height = page_height
-        await page.set_viewport_size({"width": width, "height": height})
-        screenshot_path = await page.screenshot(full_page=True)
-        await browser.close()
-        return screenshot_path
+# 图片（含 load 之后才插入的）与 Web 字体就绪的最长等待；静态资源由 asset_cache 本地返回，正常远小于该值
+ASSET_WAIT_TIMEOUT_MS = 5000
+
+WAIT_FOR_ASSETS_JS = """(timeoutMs) => {
+    const images = Array.from(document.images).filter((img) => !img.complete);
+    const pending = images.map((img) => new Promise((resolve) => {
+        img.addEventListener('load', resolve, { once: true });
+        img.addEventListener('error', resolve, { once: true });
+    }));
+    if (document.fonts && document.fonts.ready) pending.push(document.fonts.ready);
+    const timeout = new Promise((resolve) => setTimeout(resolve, timeoutMs));
+    return Promise.race([Promise.all(pending), timeout]).then(() => true);
+}"""
 
+# 等两帧：样式修改 / DOM 插入已完成布局与绘制，替代固定的 wait_for_timeout
+WAIT_FOR_PAINT_JS = """() => new Promise((resolve) => requestAnimationFrame(() => requestAnimationFrame(resolve)))"""
+
+
+async def jietu(html_content, width, height, encoding=None):
+    encoding = encoding or DEFAULT_ENCODING
+
+    async def render(page):
+        await page.set_viewport_size(DEFAULT_VIEWPORT)
+        # 先写入内容再等待图片与字体：等待脚本必须在 set_content 之后执行，否则拿到的是旧文档的 img
+        await page.set_content(html_content, wait_until="load")
+        await page.evaluate(WAIT_FOR_ASSETS_JS, ASSET_WAIT_TIMEOUT_MS)
+        page_height = await page.evaluate("() => document.body.scrollHeight")
+        target_height = page_height if height == "ck" else height
+        await page.set_viewport_size({"width": width, "height": target_height})
+        if encoding.format == "jpeg":
+            return await page.screenshot(full_page=True, type="jpeg", quality=int(encoding.quality or 85))
+        return await page.screenshot(full_page=True)
 
-async def jx3web(url, selector, adjust_top=None, save_path=None):
-    try:
-        from playwright.async_api import async_playwright  # type: ignore
-    except Exception as exc:  # pragma: no cover
-        raise RuntimeError("缺少依赖 playwright：请安装 playwright 并执行 playwright install") from exc
+    image = await browser_pool.run(render, device_scale_factor=encoding.scale)
+    if encoding.format in ("webp", "png8"):
+        image = await asyncio.to_thread(transcode, image, encoding)
+    return image
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
 
-        await page.goto(url, wait_until="networkidle")
-        await page.wait_for_selector(selector)
+async def jx3web(url, selector, adjust_top=None, save_path=None, cache=True):
+    async def capture(page):
+        # 不等 networkidle（至少多等 500ms 无请求）：文档就绪后等目标元素出现，再等其中图片与字体
+        response = await page.goto(url, wait_until="domcontentloaded")
+        await page.wait_for_selector(selector, state="visible")
+        await page.evaluate(WAIT_FOR_ASSETS_JS, ASSET_WAIT_TIMEOUT_MS)
 
         if adjust_top is not None:
             await page.evaluate(
@@ -75,7 +70,7 @@ async def jx3web(url, selector, adjust_top=None, save_path=None):
             }""",
                 {"selector": selector, "topValue": adjust_top},
             )
-            await page.wait_for_timeout(300)
+            await page.evaluate(WAIT_FOR_PAINT_JS)
 
         await page.evaluate(
             """(arg) => {
@@ -116,14 +111,30 @@ async def jx3web(url, selector, adjust_top=None, save_path=None):
             {"selector": selector},
         )
 
-        await page.wait_for_timeout(200)
+        await page.evaluate(WAIT_FOR_PAINT_JS)
         wrapper = await page.wait_for_selector("#capture-wrapper")
-        screenshot = await wrapper.screenshot()
-        await browser.close()
-
-        if save_path:
-            os.makedirs(os.path.dirname(os.path.abspath(save_path)), exist_ok=True)
-            with open(save_path, "wb") as f:
-                f.write(screenshot)
-            return save_path
-        return screenshot
+        image = await wrapper.screenshot()
+
+        validators = PageValidators()
+        if response is not None:
+            try:
+                validators = PageValidators.from_response(response.headers, await response.body())
+            except Exception:
+                validators = PageValidators.from_response(response.headers, None)
+        return CaptureResult(image=image, validators=validators)
+
+    async def run_capture():
+        # 访问外部站点，使用独立 context（用完即关），但共享同一个浏览器进程
+        return await browser_pool.run(capture, device_scale_factor=1, viewport=JX3WEB_VIEWPORT, isolated=True)
+
+    if cache:
+        screenshot = await capture_cache.get_or_capture((url, selector, adjust_top), url, run_capture)
+    else:
+        screenshot = (await run_capture()).image
+
+    if save_path:
+        os.makedirs(os.path.dirname(os.path.abspath(save_path)), exist_ok=True)
+        with open(save_path, "wb") as f:
+            f.write(screenshot)
+        return save_path
+    return screenshot
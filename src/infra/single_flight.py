@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from typing import Any, Awaitable, Callable, Hashable, Mapping, Optional
+
+try:
+    from nonebot import logger  # type: ignore
+except Exception:  # pragma: no cover
+    import logging
+
+    logger = logging.getLogger(__name__)
+
+
+def make_flight_key(url: str, params: Optional[Mapping[str, Any]] = None) -> str:
+    """
+    以 (url, 规范化参数) 生成合并键：参数按 key 排序序列化，None 值视为未传。
+    """
+    normalized = {str(k): v for k, v in (params or {}).items() if v is not None}
+    return f"{url}?{json.dumps(normalized, ensure_ascii=False, sort_keys=True, default=str)}"
+
+
+class SingleFlight:
+    """
+    进程内 single-flight：同一 key 的并发调用只触发一次上游请求，其余调用方等待同一结果。
+
+    - 上游请求在独立 Task 中执行，单个调用方被取消不会影响其他等待者
+    - 结果（含异常）对所有等待者共享，返回的对象应视为只读
+    - 请求结束即从表中移除，不承担缓存职责；需要缓存请在外层处理
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._inflight: dict[tuple[int, Hashable], asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self._counters = {"calls": 0, "upstream": 0, "coalesced": 0, "cache_hits": 0, "errors": 0}
+
+    def record_cache_hit(self) -> None:
+        with self._lock:
+            self._counters["cache_hits"] += 1
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), key)
+        with self._lock:
+            self._counters["calls"] += 1
+            future = self._inflight.get(flight_key)
+            if future is not None:
+                self._counters["coalesced"] += 1
+                leader = False
+            else:
+                self._counters["upstream"] += 1
+                future = loop.create_task(self._run(flight_key, factory))
+                self._inflight[flight_key] = future
+                leader = True
+
+        if not leader:
+            logger.debug(f"single_flight 合并请求: name={self.name} key={key}")
+        return await asyncio.shield(future)
+
+    async def _run(self, flight_key: tuple[int, Hashable], factory: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            return await factory()
+        except BaseException:
+            with self._lock:
+                self._counters["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(flight_key, None)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {"name": self.name, "inflight": len(self._inflight), **self._counters}
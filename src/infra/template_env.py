@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+try:
+    from nonebot import logger  # type: ignore
+except Exception:  # pragma: no cover
+    import logging
+
+    logger = logging.getLogger(__name__)
+
+try:
+    import config as cfg
+except Exception:  # pragma: no cover
+    cfg = None  # type: ignore
+
+
+def create_template_env(
+    search_path: str = "templates",
+    *,
+    bytecode_cache_dir: Optional[str] = None,
+    cache_size: int = 400,
+) -> Environment:
+    """
+    模板环境：FileSystemLoader + 磁盘字节码缓存（进程重启后免重新编译），
+    auto_reload 保持开启，模板文件修改后按 mtime 自动失效。
+    """
+    if bytecode_cache_dir is None:
+        bytecode_cache_dir = str(
+            getattr(cfg, "TEMPLATE_BYTECODE_CACHE_DIR", "data/cache/jinja") if cfg else "data/cache/jinja"
+        )
+    bytecode_cache = None
+    if bytecode_cache_dir:
+        os.makedirs(bytecode_cache_dir, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(bytecode_cache_dir)
+    return Environment(
+        loader=FileSystemLoader(search_path),
+        bytecode_cache=bytecode_cache,
+        cache_size=cache_size,
+        auto_reload=True,
+    )
+
+
+def precompile_templates(env: Environment, extensions: tuple[str, ...] = ("html",)) -> int:
+    """
+    预先编译（或从字节码缓存加载）全部模板，首个请求不再承担编译耗时。
+    """
+    started_at = time.perf_counter()
+    compiled = 0
+    for name in env.list_templates(extensions=list(extensions)):
+        try:
+            env.get_template(name)
+            compiled += 1
+        except Exception as exc:
+            logger.warning(f"模板预编译失败: template={name} error={exc}")
+    logger.info(f"模板预编译完成: count={compiled} elapsed={time.perf_counter() - started_at:.2f}s")
+    return compiled
+
+
+async def warm_templates(env: Environment) -> None:
+    await asyncio.to_thread(precompile_templates, env)
+
+
+_overlays: dict[tuple[int, tuple[tuple[str, int], ...]], tuple[Environment, tuple[Callable[..., Any], ...]]] = {}
+_overlays_lock = threading.Lock()
+
+
+def _callable_name(fn: Callable[..., Any]) -> str:
+    qualname = getattr(fn, "__qualname__", None) or repr(fn)
+    name = f"{getattr(fn, '__module__', '')}.{qualname}"
+    # lambda / 闭包的限定名不唯一，附加 id 区分（只影响该进程内的缓存命中）
+    return f"{name}@{id(fn)}" if "<" in qualname else name
+
+
+def filters_signature(filters: Optional[dict[str, Callable[..., Any]]]) -> str:
+    """
+    过滤器集合的稳定描述（名称 + 实现函数的限定名），用于区分截图缓存键。
+    """
+    if not filters:
+        return ""
+    return ",".join(f"{name}={_callable_name(fn)}" for name, fn in sorted(filters.items()))
+
+
+def filters_time_bucket(filters: Optional[dict[str, Callable[..., Any]]]) -> str:
+    """
+    输出依赖当前时间的过滤器（如“N分钟前”）通过 render_cache_bucket_seconds 属性声明粒度；
+    返回当前所处的时间桶，拼入截图缓存键后缓存只在同一个桶内复用。没有这类过滤器时返回空串。
+    """
+    buckets = [
+        float(getattr(fn, "render_cache_bucket_seconds", 0) or 0) for fn in (filters or {}).values()
+    ]
+    bucket_seconds = min((bucket for bucket in buckets if bucket > 0), default=0)
+    if not bucket_seconds:
+        return ""
+    return f"t{bucket_seconds:g}:{int(time.time() // bucket_seconds)}"
+
+
+def bind_filters(env: Environment, filters: Optional[dict[str, Callable[..., Any]]]) -> Environment:
+    """
+    返回带有额外过滤器的派生环境（Environment.overlay），不修改共享 env。
+
+    同一 (env, 过滤器集合) 只创建一次派生环境，其模板缓存随之复用；
+    overlay 默认与父环境共用 filters 字典、复制父环境的模板缓存，这里都换成独立的一份。
+    """
+    if not filters:
+        return env
+    key = (id(env), tuple(sorted((name, id(fn)) for name, fn in filters.items())))
+    with _overlays_lock:
+        cached = _overlays.get(key)
+        if cached is not None:
+            return cached[0]
+        # 必须使用独立的模板缓存：从父环境复制来的 Template 仍绑定父环境，渲染时会取到父环境的过滤器
+        overlay = env.overlay(cache_size=400)
+        overlay.filters = {**env.filters, **filters}
+        # 持有过滤器函数引用，避免 id 被回收后复用导致误命中
+        _overlays[key] = (overlay, tuple(filters.values()))
+        return overlay
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import time
+from functools import partial
 from typing import Any
 
 import config as cfg
@@ -8,6 +9,10 @@ from nonebot import get_driver, on_regex
 from nonebot.adapters.onebot.v11 import Event
 from nonebot.rule import Rule
 
+from src.infra.asset_cache import asset_cache
+from src.infra.browser_pool import browser_pool
+from src.infra.http_pool import http_pool
+from src.infra.template_env import warm_templates
 from src.plugins.jx3bot_handlers.announcements import register as register_announcements
 from src.plugins.jx3bot_handlers.baizhan import register as register_baizhan
 from src.plugins.jx3bot_handlers.cache_init import register as register_cache_init
@@ -21,7 +26,7 @@ from src.plugins.jx3bot_handlers.queries import register as register_queries
 from src.plugins.jx3bot_handlers.reminder import register as register_reminder
 from src.plugins.jx3bot_handlers.trade import register as register_trade
 from src.plugins.jx3bot_handlers.zili import register as register_zili
-from src.renderers.jx3.image import render_template_image
+from src.renderers.jx3.image import iter_template_images, render_template_image
 from src.renderers.jx3.jjc_ranking import send_combined_ranking_image, send_split_ranking_images
 from src.services.jx3.singletons import (
     env,
@@ -115,7 +120,12 @@ BOT_STATUS = {
     "status_file": "log.txt",
 }
 
-register_lifecycle(driver, BOT_STATUS)
+register_lifecycle(
+    driver,
+    BOT_STATUS,
+    startup_hooks=[partial(warm_templates, env), browser_pool.start, asset_cache.prefetch_configured],
+    shutdown_hooks=[http_pool.aclose, browser_pool.aclose],
+)
 
 register_announcements(
     huodong,
@@ -163,7 +173,7 @@ register_jjc_ranking(
         bot,
         event,
         env=env,
-        render_template_image=render_template_image,
+        iter_template_images=iter_template_images,
         current_season=cfg.CURRENT_SEASON,
         stats=stats,
         week_info=week_info,
@@ -9,7 +9,7 @@ from nonebot.adapters.onebot.v11 import Bot, Event, Message
 
 from config import API_URLS, TOKEN
 from src.infra.jx3api_get import has_server_catalog, idget
-from src.renderers.jx3.image import render_template_image, send_image, send_text
+from src.renderers.jx3.image import RenderBusyError, render_template_image, send_image, send_text
 from src.services.jx3.baizhan import (
     baizhan_cache_paths,
     load_cached_baizhan_image_bytes,
@@ -125,9 +125,18 @@ def register(baizhan_matcher: Any, env: Environment) -> None:
 
             role_result = parse_role_baizhan_data(items, skill_icon_index=build_skill_icon_index())
             spec = build_role_baizhan_spec(result=role_result, random_text=suijitext())
-            image_bytes = await render_template_image(
-                env, spec.template_name, spec.context, width=spec.width, height=spec.height
-            )
+            try:
+                image_bytes = await render_template_image(
+                    env,
+                    spec.template_name,
+                    spec.context,
+                    width=spec.width,
+                    height=spec.height,
+                    encoding=spec.encoding,
+                )
+            except RenderBusyError as exc:
+                await send_text(bot, event, f"   {exc}", at_user=True)
+                return
             await send_image(bot, event, image_bytes, at_user=True, prefix=spec.prefix or "   查询结果")
             return
 
@@ -149,8 +158,17 @@ def register(baizhan_matcher: Any, env: Environment) -> None:
 
         result = parse_baizhan_data(items)
         spec = build_baizhan_spec(result=result, random_text=suijitext())
-        image_bytes = await render_template_image(
-            env, spec.template_name, spec.context, width=spec.width, height=spec.height
-        )
+        try:
+            image_bytes = await render_template_image(
+                env,
+                spec.template_name,
+                spec.context,
+                width=spec.width,
+                height=spec.height,
+                encoding=spec.encoding,
+            )
+        except RenderBusyError as exc:
+            await send_text(bot, event, f"   {exc}", at_user=True)
+            return
         save_baizhan_cache(paths, result=result, image_bytes=image_bytes)
         await send_image(bot, event, image_bytes, at_user=True, prefix=spec.prefix or "   查询结果")
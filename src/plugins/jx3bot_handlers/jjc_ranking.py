@@ -4,6 +4,8 @@ from typing import Any, Awaitable, Callable
 
 from nonebot.adapters.onebot.v11 import Bot, Event
 
+from src.renderers.jx3.fast_image import FastList, fast_image_or_text
+
 
 def register(
     zhanji_ranking_matcher: Any,
@@ -97,8 +99,16 @@ def register(
                 for start in range(0, total_lines, chunk_size):
                     end = min(start + chunk_size, total_lines)
                     chunk_header = f"未查询到心法的角色（共{total_lines}人，第{start + 1}-{end}名）"
-                    chunk_message = "\n".join(missing_kungfu_lines[start:end])
-                    await bot.send(event, f"{chunk_header}\n{chunk_message}")
+                    chunk_lines = missing_kungfu_lines[start:end]
+                    chunk_message = "\n".join(chunk_lines)
+                    await bot.send(
+                        event,
+                        await fast_image_or_text(
+                            "jjc_missing_kungfu",
+                            FastList(title=chunk_header, lines=tuple(chunk_lines)),
+                            f"{chunk_header}\n{chunk_message}",
+                        ),
+                    )
 
         except Exception as exc:
             import traceback
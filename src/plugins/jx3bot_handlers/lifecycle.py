@@ -1,13 +1,19 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Any
+from typing import Any, Awaitable, Callable, Optional, Sequence
 
 from nonebot import logger
 from nonebot.adapters.onebot.v11 import Bot
 
 
-def register(driver: Any, bot_status: dict[str, Any]) -> None:
+def register(
+    driver: Any,
+    bot_status: dict[str, Any],
+    *,
+    startup_hooks: Optional[Sequence[Callable[[], Awaitable[None]]]] = None,
+    shutdown_hooks: Optional[Sequence[Callable[[], Awaitable[None]]]] = None,
+) -> None:
     def save_status() -> None:
         try:
             with open(bot_status["status_file"], "w", encoding="utf-8") as file_handle:
@@ -40,6 +46,11 @@ def register(driver: Any, bot_status: dict[str, Any]) -> None:
         logger.info(
             f"机器人启动于 {datetime.fromtimestamp(bot_status['startup_time']).strftime('%Y-%m-%d %H:%M:%S')}"
         )
+        for hook in startup_hooks or ():
+            try:
+                await hook()
+            except Exception as exc:
+                logger.warning(f"初始化共享资源失败: hook={getattr(hook, '__qualname__', hook)} error={exc}")
 
     @driver.on_bot_connect
     async def connect_handler(bot: Bot) -> None:
@@ -57,3 +68,10 @@ def register(driver: Any, bot_status: dict[str, Any]) -> None:
         save_status()
         logger.info(f"机器人已断开连接于 {datetime.fromtimestamp(now).strftime('%Y-%m-%d %H:%M:%S')}")
 
+    @driver.on_shutdown
+    async def shutdown_handler() -> None:
+        for hook in shutdown_hooks or ():
+            try:
+                await hook()
+            except Exception as exc:
+                logger.warning(f"释放共享资源失败: hook={getattr(hook, '__qualname__', hook)} error={exc}")
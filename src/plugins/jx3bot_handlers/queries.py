@@ -7,7 +7,7 @@ from nonebot.adapters.onebot.v11 import Bot, Event, Message, MessageSegment
 from nonebot.params import RegexGroup
 
 from config import API_URLS, TICKET, TOKEN
-from src.renderers.jx3.image import apply_filters, render_and_send_template_image, send_text
+from src.renderers.jx3.image import render_and_send_template_image, send_text
 from src.services.jx3.command_context import (
     CommandContextError,
     fetch_jx3api_or_raise,
@@ -57,7 +57,6 @@ def register(
             time_filter=time_ago_filter,
             random_text=suijitext(),
         )
-        apply_filters(env, spec.filters)
         await render_and_send_template_image(
             bot,
             event,
@@ -68,6 +67,8 @@ def register(
             height=spec.height,
             at_user=spec.at_user,
             prefix=spec.prefix,
+            filters=spec.filters,
+            encoding=spec.encoding,
         )
 
     @qiyu_matcher.handle()
@@ -98,7 +99,6 @@ def register(
             jjc_time_filter=timestamp_jjc,
             random_text=suijitext(),
         )
-        apply_filters(env, spec.filters)
         await render_and_send_template_image(
             bot,
             event,
@@ -109,6 +109,8 @@ def register(
             height=spec.height,
             at_user=spec.at_user,
             prefix=spec.prefix,
+            filters=spec.filters,
+            encoding=spec.encoding,
         )
 
     @zhuangfen_matcher.handle()
@@ -149,6 +151,8 @@ def register(
             height=spec.height,
             at_user=spec.at_user,
             prefix=spec.prefix,
+            filters=spec.filters,
+            encoding=spec.encoding,
         )
 
     @jjc_matcher.handle()
@@ -186,7 +190,6 @@ def register(
         if not spec:
             return
 
-        apply_filters(env, spec.filters)
         await render_and_send_template_image(
             bot,
             event,
@@ -197,6 +200,8 @@ def register(
             height=spec.height,
             at_user=spec.at_user,
             prefix=spec.prefix,
+            filters=spec.filters,
+            encoding=spec.encoding,
         )
 
     @fuben_matcher.handle()
@@ -243,4 +248,6 @@ def register(
             height=spec.height,
             at_user=spec.at_user,
             prefix=spec.prefix,
+            filters=spec.filters,
+            encoding=spec.encoding,
         )
@@ -16,6 +16,8 @@ from nonebot.matcher import Matcher
 from nonebot.params import RegexGroup
 from nonebot.rule import Rule
 
+from src.renderers.jx3.fast_image import FastTable, fast_image_or_text
+
 REMINDER_FILE = Path("data/group_reminders.json")
 CANCEL_TIMEOUT_SECONDS = 45
 JOB_ID_PREFIX = "group_reminder:"
@@ -250,6 +252,19 @@ async def _send_reminder(reminder_id: str) -> None:
         _schedule_reminder_job(reminder_id, datetime.fromtimestamp(time.time() + 60))
 
 
+def _build_list_table(reminders: list[dict[str, Any]]) -> FastTable:
+    rows = []
+    for i, reminder in enumerate(reminders, 1):
+        mention_label = "@all" if reminder.get("mention_type") == "all" else f"@{reminder.get('creator_user_id')}"
+        rows.append((i, _render_time(reminder.get("remind_at", "")), mention_label, reminder.get("message", "")))
+    return FastTable(
+        title=f"当前群共有 {len(reminders)} 条待执行提醒",
+        columns=("序号", "提醒时间", "提醒对象", "内容"),
+        rows=tuple(rows),
+        weights=(1, 3, 2.5, 6),
+    )
+
+
 def _build_list_message(reminders: list[dict[str, Any]]) -> str:
     lines = [f"当前群共有 {len(reminders)} 条待执行提醒："]
     for i, reminder in enumerate(reminders, 1):
@@ -379,7 +394,9 @@ def register(
             await matcher.finish("当前群没有待执行提醒")
             return
 
-        await matcher.finish(_build_list_message(reminders))
+        await matcher.finish(
+            await fast_image_or_text("reminder_list", _build_list_table(reminders), _build_list_message(reminders))
+        )
 
     @cancel_reminder_matcher.handle()
     async def _handle_cancel_reminder(event: Event, matcher: Matcher) -> None:
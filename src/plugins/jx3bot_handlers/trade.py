@@ -6,7 +6,7 @@ from jinja2 import Environment
 from nonebot.adapters.onebot.v11 import Bot, Event, Message, MessageSegment
 from nonebot.params import RegexGroup
 
-from src.renderers.jx3.image import apply_filters, render_and_send_template_image
+from src.renderers.jx3.image import render_and_send_template_image
 from src.services.jx3.command_context import CommandContextError, resolve_server_and_name
 from src.utils.defget import fetch_json
 from src.utils.money_format import convert_number
@@ -86,7 +86,6 @@ def register(jiayi_matcher: Any, env: Environment) -> None:
         ):
             newxs = newxs["data"]["logs"][0]
 
-        apply_filters(env, {"time": time_ago_fenzhong, "timego": convert_number})
         await render_and_send_template_image(
             bot,
             event,
@@ -103,4 +102,5 @@ def register(jiayi_matcher: Any, env: Environment) -> None:
             },
             width=800,
             height="ck",
+            filters={"time": time_ago_fenzhong, "timego": convert_number},
         )
@@ -8,7 +8,7 @@ from nonebot.adapters.onebot.v11 import Bot, Event, Message, MessageSegment
 from nonebot.params import RegexGroup
 
 from config import SESSION_TIMEOUT, TICKET, TOKEN, API_URLS
-from src.renderers.jx3.image import render_template_image, send_image, send_text
+from src.renderers.jx3.image import RenderBusyError, render_template_image, send_image, send_text
 from src.services.jx3.command_context import (
     CommandContextError,
     fetch_jx3api_or_raise,
@@ -322,13 +322,17 @@ def register(zili_matcher: Any, zili_choice_matcher: Any, env: Environment, *, m
 
         tongji[0] = round((tongji[3] / tongji[4]) * 100, 2) if tongji[4] else 0
 
-        image_bytes = await render_template_image(
-            env,
-            "资历查询.html",
-            {"text": text, "tongji": tongji, "qufu": server, "items": my_dict},
-            width=960,
-            height="ck",
-        )
+        try:
+            image_bytes = await render_template_image(
+                env,
+                "资历查询.html",
+                {"text": text, "tongji": tongji, "qufu": server, "items": my_dict},
+                width=960,
+                height="ck",
+            )
+        except RenderBusyError as exc:
+            await send_text(bot, event, f"   {exc}", at_user=True)
+            return
         await send_image(bot, event, image_bytes, at_user=False, prefix="   查询结果")
 
         expiry_time = time.time() + SESSION_TIMEOUT
@@ -342,6 +346,18 @@ def register(zili_matcher: Any, zili_choice_matcher: Any, env: Environment, *, m
     async def handle_zili_choice(
         bot: Bot, event: Event, choice: Annotated[tuple[Any, ...], RegexGroup()]
     ) -> None:
+        user_id = str(event.user_id)
+        session = user_sessions.get(user_id)
+        saved_path = list(session.get("nav_path") or []) if session else []
+        try:
+            await _handle_zili_choice(bot, event, choice)
+        except RenderBusyError as exc:
+            # 图片排队已满：导航位置保持在本次选择之前，用户稍后可重新输入同一序号
+            if user_id in user_sessions:
+                user_sessions[user_id]["nav_path"] = saved_path
+            await send_text(bot, event, f"   {exc}", at_user=True)
+
+    async def _handle_zili_choice(bot: Bot, event: Event, choice: tuple[Any, ...]) -> None:
         user_id = str(event.user_id)
         if user_id not in user_sessions:
             return
@@ -572,5 +588,7 @@ def register(zili_matcher: Any, zili_choice_matcher: Any, env: Environment, *, m
             user_sessions[user_id]["expiry_time"] = time.time() + SESSION_TIMEOUT
         except ValueError:
             await bot.send(event, Message("   请输入有效的数字序号"))
+        except RenderBusyError:
+            raise
         except Exception as e:
             await send_text(bot, event, f"   处理失败: {str(e)}", at_user=True)
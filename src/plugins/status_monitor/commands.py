@@ -7,6 +7,7 @@ from nonebot.adapters.onebot.v11 import Bot, GroupMessageEvent
 from nonebot.exception import FinishedException
 from nonebot.params import CommandArg
 
+from src.renderers.jx3.fast_image import FastTable, fast_image_or_text
 from src.services.jx3.singletons import group_config_repo
 
 from .jobs import (
@@ -60,13 +61,21 @@ async def handle_codes(event: GroupMessageEvent):
             return
 
         reply_msg = ""
+        rows = []
         for i, code in enumerate(codes[:8]):
             title = code.get("title", "未知活动")
             desc = code.get("desc", "无描述")
             created_at = code.get("created_at", "").replace("T", " ").replace("Z", "")
             reply_msg += f"{i + 1}. 奖励: {desc}\n   兑换码: {title}\n   创建时间: {created_at}\n\n"
-
-        await gte_cmd.finish(reply_msg)
+            rows.append((i + 1, desc, title, created_at))
+
+        table = FastTable(
+            title="魔盒兑换码",
+            columns=("序号", "奖励", "兑换码", "创建时间"),
+            rows=tuple(rows),
+            weights=(1, 5, 4, 3),
+        )
+        await gte_cmd.finish(await fast_image_or_text("codes", table, reply_msg))
     except FinishedException:
         raise
     except Exception as e:
@@ -3,14 +3,14 @@ import json
 import re
 import time
 from datetime import datetime
-from functools import wraps
+from functools import partial, wraps
 
 import config as cfg
-import httpx
 from nonebot import get_driver, logger
 from nonebot.adapters.onebot.v11 import MessageSegment
 from nonebot_plugin_apscheduler import scheduler
 
+from src.infra.http_pool import http_pool
 from src.services.jx3.singletons import jjc_ranking_service
 from src.services.jx3.singletons import group_config_repo
 from src.services.jx3.singletons import env
@@ -163,12 +163,11 @@ async def get_gte_data(url, server):
     try:
         url = f"{url}?server={server}"
         logger.debug("status_monitor 请求日常: {}", url)
-        async with httpx.AsyncClient(verify=False) as client:
-            response = await client.get(url)
-            if response.status_code != 200:
-                logger.warning("status_monitor 日常API返回错误: {}", response.status_code)
-                return None
-            return response.json()
+        response = await http_pool.arequest("GET", url, verify=False)
+        if response.status_code != 200:
+            logger.warning("status_monitor 日常API返回错误: {}", response.status_code)
+            return None
+        return response.json()
     except Exception as e:
         logger.warning("status_monitor 请求日常API失败: {}", e)
         return None
@@ -176,12 +175,11 @@ async def get_gte_data(url, server):
 
 async def get_server_status():
     try:
-        async with httpx.AsyncClient(verify=False) as client:
-            response = await client.get(STATUS_check_API)
-            if response.status_code != 200:
-                logger.warning("status_monitor 开服监测API返回错误: {}", response.status_code)
-                return None
-            return response.json()
+        response = await http_pool.arequest("GET", STATUS_check_API, verify=False)
+        if response.status_code != 200:
+            logger.warning("status_monitor 开服监测API返回错误: {}", response.status_code)
+            return None
+        return response.json()
     except Exception as e:
         logger.warning("status_monitor 开服监测请求失败: {}", e)
         return None
@@ -189,12 +187,11 @@ async def get_server_status():
 
 async def get_server_banben():
     try:
-        async with httpx.AsyncClient(verify=False) as client:
-            response = await client.get("https://www.jx3api.com/data/news/announce")
-            if response.status_code != 200:
-                logger.warning("status_monitor 公告API返回错误: {}", response.status_code)
-                return None
-            return response.json()
+        response = await http_pool.arequest("GET", "https://www.jx3api.com/data/news/announce", verify=False)
+        if response.status_code != 200:
+            logger.warning("status_monitor 公告API返回错误: {}", response.status_code)
+            return None
+        return response.json()
     except Exception as e:
         logger.warning("status_monitor 公告请求失败: {}", e)
         return None
@@ -202,12 +199,11 @@ async def get_server_banben():
 
 async def get_news_data():
     try:
-        async with httpx.AsyncClient(verify=False) as client:
-            response = await client.get(NEWS_API_URL)
-            if response.status_code != 200:
-                logger.warning("status_monitor 新闻API返回错误: {}", response.status_code)
-                return None
-            return response.json()
+        response = await http_pool.arequest("GET", NEWS_API_URL, verify=False)
+        if response.status_code != 200:
+            logger.warning("status_monitor 新闻API返回错误: {}", response.status_code)
+            return None
+        return response.json()
     except Exception as e:
         logger.warning("status_monitor 请求新闻API失败: {}", e)
         return None
@@ -215,12 +211,11 @@ async def get_news_data():
 
 async def get_records_data():
     try:
-        async with httpx.AsyncClient(verify=False) as client:
-            response = await client.get(SKILL_records_URL)
-            if response.status_code != 200:
-                logger.warning("status_monitor 技改API返回错误: {}", response.status_code)
-                return None
-            return response.json()
+        response = await http_pool.arequest("GET", SKILL_records_URL, verify=False)
+        if response.status_code != 200:
+            logger.warning("status_monitor 技改API返回错误: {}", response.status_code)
+            return None
+        return response.json()
     except Exception as e:
         logger.warning("status_monitor 请求技改API失败: {}", e)
         return None
@@ -228,12 +223,11 @@ async def get_records_data():
 
 async def get_jx3box_data():
     try:
-        async with httpx.AsyncClient(verify=False) as client:
-            response = await client.get(jx3box_URL)
-            if response.status_code != 200:
-                logger.warning("status_monitor 福利API返回错误: {}", response.status_code)
-                return None
-            return response.json()
+        response = await http_pool.arequest("GET", jx3box_URL, verify=False)
+        if response.status_code != 200:
+            logger.warning("status_monitor 福利API返回错误: {}", response.status_code)
+            return None
+        return response.json()
     except Exception as e:
         logger.warning("status_monitor 请求福利API失败: {}", e)
         return None
@@ -647,7 +641,8 @@ async def push_daily_jjc_ranking():
                 logger.info("status_monitor 没有开启竞技排名推送的群组")
                 return
 
-            ranking_result = await jjc_ranking_service.query_jjc_ranking()
+            # 每日推送必须是最新数据，不使用 stale-while-revalidate 的过期缓存
+            ranking_result = await jjc_ranking_service.query_jjc_ranking(allow_stale=False)
             if not ranking_result:
                 logger.warning("status_monitor 获取竞技场排行榜数据失败：返回为空")
                 return
@@ -693,7 +688,7 @@ async def push_daily_jjc_ranking():
 
             payload = await render_combined_ranking_image(
                 env=env,
-                render_template_image=render_template_image,
+                render_template_image=partial(render_template_image, priority="scheduled"),
                 current_season=cfg.CURRENT_SEASON,
                 stats=stats,
                 week_info=week_info,
@@ -3,10 +3,11 @@ from __future__ import annotations
 import smtplib
 
 import config as cfg
-import httpx
 from email.message import EmailMessage
 from nonebot import logger
 
+from src.infra.http_pool import http_pool
+
 
 async def get_NapCat_data() -> dict | None:
     napcat_addr = getattr(cfg, "STATUS_MONITOR_NAPCAT_ADDR", "") or ""
@@ -17,14 +18,13 @@ async def get_NapCat_data() -> dict | None:
 
     napcat_status_url = f"{napcat_base_url}/get_status"
     try:
-        async with httpx.AsyncClient(verify=False) as client:
-            response = await client.get(napcat_status_url)
-            if response.status_code != 200:
-                logger.warning(
-                    f"status_monitor NapCat status 返回错误: url={napcat_status_url}, status_code={response.status_code}"
-                )
-                return None
-            return response.json()
+        response = await http_pool.arequest("GET", napcat_status_url, verify=False)
+        if response.status_code != 200:
+            logger.warning(
+                f"status_monitor NapCat status 返回错误: url={napcat_status_url}, status_code={response.status_code}"
+            )
+            return None
+        return response.json()
     except Exception as exc:
         logger.warning(f"status_monitor NapCat status 请求失败: url={napcat_status_url}, exc={exc!r}")
         return None
@@ -7,28 +7,29 @@ from nonebot.params import RegexGroup
 from nonebot.exception import FinishedException
 from nonebot.log import logger
 from nonebot.rule import Rule
-import json
-import os
 import time
-from pathlib import Path
 from typing import Dict, List, Any, Optional
 from nonebot.log import logger
 from nonebot.matcher import Matcher
-from jinja2 import Environment, FileSystemLoader, Template
 from src.plugins.wanbaolou.api import api, JX3TradeAPI, search_jx3_appearances
 from src.plugins.wanbaolou.config import config
 from src.plugins.wanbaolou.utils import format_time_string, save_image_cache
 from src.infra.screenshot import jietu
+from src.infra.template_env import create_template_env
+from src.renderers.jx3.fast_image import FastTable, fast_image_or_text
+from src.renderers.jx3.image import RenderBusyError, render_scheduler
 from src.utils.random_text import suijitext
 from config import wanbaolou
 from src.utils.shared_data import SEARCH_RESULTS,user_sessions
-from .alias import setup_alias_refresh_job
+from .alias import get_canonical_name, setup_alias_refresh_job
+from . import price_history, price_sweep
+from .subscriptions import SubscriptionRepo
 
 
 # 导出主要功能函数，方便直接导入使用
 # 创建全局API实例（禁用SSL验证）
 api = JX3TradeAPI(verify_ssl=False)
-env = Environment(loader=FileSystemLoader('templates'))
+env = create_template_env('templates')
 
 
 # 导出获取物品列表的方法（带解析功能）
@@ -113,41 +114,15 @@ NOTIFIED_USERS = set()  # 已通知的用户集合
 # 全局变量定义（放在代码顶部，其他全局变量旁边）
 USER_LAST_QUERY = {}  # 用户ID -> 最近查询的外观信息
 
-# 订阅数据文件路径
-SUBSCRIPTION_FILE = "data/wanbaolou_subscriptions.json"
-# 订阅数据文件路径
+# 订阅数据以内存为主副本，按用户 / 物品建索引，修改后延迟合并写回 SUBSCRIPTION_FILE
 SUBSCRIPTION_FILE = "data/wanbaolou_subscriptions.json"
+subscription_repo = SubscriptionRepo(SUBSCRIPTION_FILE)
 
-# 确保目录存在
-def ensure_dir_exists():
-    dir_path = os.path.dirname(SUBSCRIPTION_FILE)
-    if not os.path.exists(dir_path):
-        os.makedirs(dir_path)
 
-# 从文件加载订阅数据
+# 从仓库获取全部订阅的快照
 async def load_subscriptions() -> Dict[str, List[Dict[str, Any]]]:
-    """从JSON文件加载订阅数据"""
-    ensure_dir_exists()
-    try:
-        if os.path.exists(SUBSCRIPTION_FILE):
-            async with asyncio.Lock():
-                with open(SUBSCRIPTION_FILE, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-        return {}
-    except Exception as e:
-        logger.error(f"加载订阅数据失败: {e}")
-        return {}
-
-# 保存订阅数据到文件
-async def save_subscriptions(subscriptions: Dict[str, List[Dict[str, Any]]]):
-    """保存订阅数据到JSON文件"""
-    ensure_dir_exists()
-    try:
-        async with asyncio.Lock():
-            with open(SUBSCRIPTION_FILE, 'w', encoding='utf-8') as f:
-                json.dump(subscriptions, f, ensure_ascii=False, indent=2)
-    except Exception as e:
-        logger.error(f"保存订阅数据失败: {e}")
+    """返回 {user_id: [订阅, ...]} 的副本"""
+    return subscription_repo.all()
 
 # 获取全局机器人实例
 _bot = None
@@ -228,6 +203,7 @@ async def check_timeouts():
                         sort_type=1,  # 1表示价格从低到高
                         status_filter=2  # 公示=1 2表示在售
                     )
+                    price_history.record_listing(mingcheng, sale_items)
                     public_items = await api.get_item_list(
                         item_name=mingcheng,
                         follow_sort=0,  # 关注排序方式 (0:从低到高, 1:从高到低)
@@ -236,12 +212,10 @@ async def check_timeouts():
                     # 检查用户是否已订阅此外观，并获取订阅价格
                     is_subscribed = False
                     subscribed_price = 0
-                    user_subscriptions = await get_user_subscriptions(user_id)
-                    for sub in user_subscriptions:
-                        if sub["item_name"] == mingcheng:
-                            is_subscribed = True
-                            subscribed_price = sub["price_threshold"]
-                            break
+                    subscription = subscription_repo.find(user_id, mingcheng)
+                    if subscription is not None:
+                        is_subscribed = True
+                        subscribed_price = subscription["price_threshold"]
                     img = await get_item_image(mingcheng)
                     template = env.get_template('万宝楼查询.html')
                     html_content = template.render(
@@ -253,7 +227,16 @@ async def check_timeouts():
                         is_subscribed=is_subscribed,  # 是否已订阅
                         subscribed_price=subscribed_price,  # 订阅价格阈值
                     )
-                    image_bytes = await jietu(html_content, 810, "ck")
+                    try:
+                        image_bytes = await render_scheduler.submit(
+                            "interactive", lambda: jietu(html_content, 810, "ck")
+                        )
+                    except RenderBusyError as exc:
+                        if group_id:
+                            await _bot.send_group_msg(group_id=group_id, message=MessageSegment.at(user_id) + f"   {exc}")
+                        else:
+                            await _bot.send_private_msg(user_id=int(user_id), message=str(exc))
+                        continue
 
                     # 发送消息
                     if group_id:
@@ -464,6 +447,7 @@ async def process_appearance_query(bot: Bot, event: Event, selected: dict, is_au
         sort_type=1,  # 1表示价格从低到高
         status_filter=2  # 公示=1 2表示在售
     )
+    price_history.record_listing(mingcheng, sale_items)
     # 获取公示物品
     public_items = await api.get_item_list(
         item_name=mingcheng,
@@ -474,12 +458,10 @@ async def process_appearance_query(bot: Bot, event: Event, selected: dict, is_au
     # 检查用户是否已订阅此外观，并获取订阅价格
     is_subscribed = False
     subscribed_price = 0
-    user_subscriptions = await get_user_subscriptions(user_id)
-    for sub in user_subscriptions:
-        if sub["item_name"] == mingcheng:
-            is_subscribed = True
-            subscribed_price = sub["price_threshold"]
-            break
+    subscription = subscription_repo.find(user_id, mingcheng)
+    if subscription is not None:
+        is_subscribed = True
+        subscribed_price = subscription["price_threshold"]
     text = suijitext()
     img = await get_item_image(mingcheng)
     template = env.get_template('万宝楼查询.html')
@@ -493,7 +475,12 @@ async def process_appearance_query(bot: Bot, event: Event, selected: dict, is_au
         subscribed_price=subscribed_price , # 订阅价格阈值
         text=text
     )
-    image_bytes = await jietu(html_content, 820, "ck")
+    # 经共享渲染调度器截图：与其他查询共用优先级通道、排队上限与统计
+    try:
+        image_bytes = await render_scheduler.submit("interactive", lambda: jietu(html_content, 820, "ck"))
+    except RenderBusyError as exc:
+        await bot.send(event, MessageSegment.at(event.user_id) + Message(f"   {exc}"))
+        return
 
     # 发送结果
     await bot.send(
@@ -588,23 +575,7 @@ async def add_price_subscription(user_id: str, item_name: str, price_threshold:
         bool: 是否成功添加订阅
     """
     try:
-        # 加载现有订阅
-        subscriptions = await load_subscriptions()
-
-        # 如果用户不存在，创建新的订阅列表
-        if user_id not in subscriptions:
-            subscriptions[user_id] = []
-
-        # 添加新的订阅
-        subscriptions[user_id].append({
-            "item_name": item_name,
-            "price_threshold": price_threshold,
-            "group_id": group_id,
-            "created_at": time.time()
-        })
-
-        # 保存到文件
-        await save_subscriptions(subscriptions)
+        subscription_repo.add(user_id, item_name, price_threshold, group_id)
 
         logger.info(f"用户 {user_id} 订阅了 {item_name} 的价格提醒，阈值: {price_threshold}")
         return True
@@ -625,8 +596,7 @@ async def get_user_subscriptions(user_id: str) -> List[Dict[str, Any]]:
     Returns:
         List[Dict]: 订阅列表
     """
-    subscriptions = await load_subscriptions()
-    return subscriptions.get(user_id, [])
+    return subscription_repo.for_user(user_id)
 
 
 # 删除订阅
@@ -642,29 +612,10 @@ async def remove_subscription(user_id: str, index: int) -> Optional[Dict[str, An
         Dict 或 None: 被删除的订阅信息，如果失败则返回None
     """
     try:
-        # 加载现有订阅
-        subscriptions = await load_subscriptions()
-
-        # 检查用户是否有订阅
-        if user_id not in subscriptions or not subscriptions[user_id]:
+        removed = subscription_repo.remove_at(user_id, index)
+        if removed is None:
             return None
 
-        user_subs = subscriptions[user_id]
-
-        # 检查索引是否有效
-        if index < 1 or index > len(user_subs):
-            return None
-
-        # 删除订阅
-        removed = user_subs.pop(index - 1)
-
-        # 如果用户没有订阅了，删除用户条目
-        if not user_subs:
-            del subscriptions[user_id]
-
-        # 保存到文件
-        await save_subscriptions(subscriptions)
-
         logger.info(f"用户 {user_id} 删除了对 {removed['item_name']} 的价格订阅")
         return removed
 
@@ -712,7 +663,11 @@ async def get_all_subscriptions(bot: Bot, event: Event):
     if len(message) > 1000:
         # 生成图片发送
         html_content = f"<pre>{message}</pre>"
-        image_bytes = await jietu(html_content, 600, "ck")
+        try:
+            image_bytes = await render_scheduler.submit("interactive", lambda: jietu(html_content, 600, "ck"))
+        except RenderBusyError:
+            # 渲染排队已满时直接发送文本
+            await suoyou_config_cmd.finish(message)
         await suoyou_config_cmd.finish(MessageSegment.image(image_bytes))
     else:
         # 直接发送文本
@@ -786,15 +741,24 @@ async def handle_my_subscriptions(bot: Bot, event: Event, matcher: Matcher):
 
     # 构建回复消息
     reply = f"\n您当前有 {len(subscriptions)} 个价格订阅：\n"
+    rows = []
     for i, alert in enumerate(subscriptions, 1):
         item_name = alert["item_name"]
         threshold = alert["price_threshold"]
         created_at = time.strftime("%Y-%m-%d %H:%M", time.localtime(alert["created_at"]))
         reply += f"{i}. 【{item_name}】价格低于 {threshold} 元 (创建于 {created_at})\n"
+        rows.append((i, item_name, f"{threshold} 元", created_at))
 
     reply += "\n回复「取消订阅 序号」可以取消对应的订阅"
 
-    await matcher.finish(MessageSegment.at(event.user_id) + Message(reply))
+    table = FastTable(
+        title=f"您当前有 {len(subscriptions)} 个价格订阅",
+        columns=("序号", "外观", "提醒价格", "创建时间"),
+        rows=tuple(rows),
+        footer="回复「取消订阅 序号」可以取消对应的订阅",
+        weights=(1, 5, 2.5, 3),
+    )
+    await matcher.finish(MessageSegment.at(event.user_id) + await fast_image_or_text("my_subscriptions", table, reply))
 
 
 # 查看订阅价格
@@ -830,9 +794,10 @@ async def handle_my_subscriptions(bot: Bot, event: Event, matcher: Matcher):
                 item_name=item_name,
                 sort_type=1,  # 1表示价格从低到高
                 status_filter=2,  # 公示=1 2表示在售
-                page_size=1,  # 仅获取1条记录
+                page_size=price_history.SAMPLE_SIZE,  # 与价格巡检相同的页大小，共用接口缓存与价格历史口径
                 page=1  # 第一页
             )
+            price_history.record_listing(item_name, sale_items)
 
             # 检查在售物品是否有价格
             if sale_items and 'parsed_items' in sale_items and sale_items['parsed_items']:
@@ -905,36 +870,17 @@ async def handle_cancel_subscription(bot: Bot, event: Event, matcher: Matcher,
     try:
         index = int(index_str)
 
-        # 删除订阅并获取删除的订阅信息，但不立即保存
-        subscriptions = await get_user_subscriptions(user_id)
+        # 按序号删除订阅
+        removed = subscription_repo.remove_at(user_id, index)
 
-        if not subscriptions or index <= 0 or index > len(subscriptions):
+        if removed is None:
             await matcher.finish(MessageSegment.at(event.user_id) + Message("\n未找到指定的订阅或序号无效"))
             return
 
-        # 获取要删除的订阅信息
-        removed = subscriptions[index - 1]
         item_name = removed["item_name"]
 
-        # 删除指定订阅
-        subscriptions.pop(index - 1)
-
-        # 获取所有订阅数据
-        all_subscriptions = await load_subscriptions()
-
-        # 更新用户的订阅
-        if subscriptions:
-            all_subscriptions[user_id] = subscriptions
-        else:
-            # 如果用户没有订阅了，删除用户条目
-            if user_id in all_subscriptions:
-                del all_subscriptions[user_id]
-
-        # 保存更新后的数据
-        await save_subscriptions(all_subscriptions)
-
         # 获取剩余订阅数量
-        remaining = len(subscriptions)
+        remaining = len(subscription_repo.for_user(user_id))
 
         # 发送成功消息，包含剩余订阅数量
         if remaining > 0:
@@ -955,89 +901,75 @@ async def handle_cancel_subscription(bot: Bot, event: Event, matcher: Matcher,
 
 # 定期检查价格的任务
 async def check_price_alerts():
-    """定期检查所有价格提醒"""
+    """定期检查所有价格提醒：按物品去重后每个物品只查询一次最低价，再分发给订阅了该物品的所有提醒"""
     if not _bot:
         return
 
-    # 加载所有订阅 - 使用load_subscriptions而不是get_all_subscriptions
-    all_subscriptions = await load_subscriptions()
-
-    if not all_subscriptions:
+    item_names = subscription_repo.item_names()
+    if not item_names:
         logger.info("没有有效的价格订阅")
         return
 
-    logger.info(f"开始检查价格提醒 ({len(all_subscriptions)} 个用户)")
-    subscriptions_changed = False
+    repo_stats = subscription_repo.stats()
+    report = price_sweep.SweepReport(
+        users=repo_stats["users"],
+        subscriptions=repo_stats["subscriptions"],
+        items=len(item_names),
+    )
+    started_at = time.perf_counter()
+    logger.info(
+        f"开始检查价格提醒 ({report.users} 个用户, {report.subscriptions} 个订阅, {report.items} 个物品)"
+    )
+
+    lowest_prices = await price_sweep.fetch_lowest_prices(api, item_names, report)
+
+    for item_name in item_names:
+        lowest_price = lowest_prices.get(item_name)
+        if lowest_price is None:
+            continue
+
+        # 查价期间用户可能已取消订阅，这里取最新的订阅者列表
+        for user_id, alert in subscription_repo.subscribers(item_name):
+            threshold = alert["price_threshold"]
 
-    for user_id, alerts in list(all_subscriptions.items()):
-        removed_alerts = []
+            # 检查价格是否低于阈值
+            if lowest_price > threshold:
+                continue
 
-        for i, alert in enumerate(alerts):
             try:
-                item_name = alert["item_name"]
-                threshold = alert["price_threshold"]
-
-                # 查询物品当前价格
-                sale_items = await api.get_item_list(
-                    item_name=item_name,
-                    sort_type=1,  # 价格从低到高
-                    status_filter=2,  # 在售状态
-                    page=1,
-                    page_size=1  # 只需要最低价
+                # 发送通知
+                message = (
+                    f"\n价格提醒：【{item_name}】\n"
+                    f"当前最低价: {lowest_price} 元\n"
+                    f"您设置的阈值: {threshold} 元\n"
+                    f"请及时查看，此条订阅已完成！"
                 )
 
-                # 检查是否有在售物品
-                if sale_items and sale_items.get('parsed_items') and len(sale_items['parsed_items']) > 0:
-                    lowest_price = sale_items['parsed_items'][0]['price']
-
-                    # 检查价格是否低于阈值
-                    if lowest_price <= threshold:
-                        # 发送通知
-                        message = (
-                            f"\n价格提醒：【{item_name}】\n"
-                            f"当前最低价: {lowest_price} 元\n"
-                            f"您设置的阈值: {threshold} 元\n"
-                            f"请及时查看，此条订阅已完成！"
-                        )
-
-                        # 根据接收方式发送
-                        if alert.get("group_id"):
-                            await _bot.send_group_msg(
-                                group_id=alert["group_id"],
-                                message=f"[CQ:at,qq={user_id}] {message}"
-                            )
-                        else:
-                            await _bot.send_private_msg(
-                                user_id=int(user_id),
-                                message=message
-                            )
+                # 根据接收方式发送
+                if alert.get("group_id"):
+                    await _bot.send_group_msg(
+                        group_id=alert["group_id"],
+                        message=f"[CQ:at,qq={user_id}] {message}"
+                    )
+                else:
+                    await _bot.send_private_msg(
+                        user_id=int(user_id),
+                        message=message
+                    )
 
-                        # 标记此提醒为已处理，需要删除
-                        removed_alerts.append(i)
-                        subscriptions_changed = True
+                # 此提醒已完成，删除（按订阅 id，写回由仓库延迟合并）
+                subscription_repo.remove(user_id, alert["id"])
+                report.notified += 1
 
-                        logger.info(
-                            f"已通知用户 {user_id} 关于 {item_name} 的价格提醒 ({lowest_price} <= {threshold})，该提醒将被删除")
+                logger.info(
+                    f"已通知用户 {user_id} 关于 {item_name} 的价格提醒 ({lowest_price} <= {threshold})，该提醒将被删除")
 
             except Exception as e:
                 logger.error(f"检查价格提醒时出错: {str(e)}")
 
-        # 删除已处理的提醒
-        if removed_alerts:
-            # 从后往前删除，避免索引变化问题
-            for idx in sorted(removed_alerts, reverse=True):
-                alerts.pop(idx)
-
-            # 如果用户没有订阅了，删除用户条目
-            if not alerts:
-                del all_subscriptions[user_id]
-
-    # 如果有变更，保存更新后的订阅数据
-    if subscriptions_changed:
-        await save_subscriptions(all_subscriptions)
-        logger.info("已更新订阅数据，删除已通知的提醒")
-
-    logger.info("价格提醒检查完成")
+    report.duration = time.perf_counter() - started_at
+    price_sweep.last_sweep_report = report
+    logger.info(f"价格提醒检查完成: {report.summary()}")
 
 
 # 确保启动时加载订阅数据，并启动定期检查任务
@@ -1047,4 +979,35 @@ async def init_subscription_system():
     logger.info("初始化价格订阅系统...")
     # 启动定期检查任务
     scheduler.add_job(check_price_alerts, "interval", minutes=wanbaolou)
+    # 价格历史的降采样与写回独立于巡检：没有订阅时查询产生的记录也会定期落盘
+    scheduler.add_job(
+        price_history.maintain,
+        "interval",
+        minutes=price_history.FLUSH_MINUTES,
+        id="wanbaolou_price_history_maintain",
+        coalesce=True,
+        max_instances=1,
+        replace_existing=True,
+    )
     logger.info("价格订阅系统初始化完成")
+
+
+@driver.on_shutdown
+async def flush_subscription_repo():
+    """关闭前把尚未写回的订阅变更与价格历史落盘"""
+    await subscription_repo.flush()
+    await price_history.flush()
+
+
+price_trend_cmd = on_regex(r"^(物价走势|历史最低)\s+(.+)$", priority=5, block=True)
+
+
+@price_trend_cmd.handle()
+async def handle_price_trend(bot: Bot, event: Event, matcher: Matcher, matched: Annotated[tuple[str, ...], RegexGroup()]):
+    """查询本地记录的价格走势与历史最低价（不请求万宝楼）"""
+    keyword = matched[1].strip()
+    item_name = await get_canonical_name(keyword) or keyword
+    reply, table = price_history.build_trend_reply(item_name)
+    if table is None:
+        await matcher.finish(MessageSegment.at(event.user_id) + Message("\n" + reply))
+    await matcher.finish(MessageSegment.at(event.user_id) + await fast_image_or_text("price_trend", table, "\n" + reply))
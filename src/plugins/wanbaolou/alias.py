@@ -6,6 +6,7 @@ import asyncio
 from typing import Dict, List, Tuple
 from nonebot.log import logger
 from .config import config
+from .search_index import AliasIndex
 
 # 排查期：直接使用 print 打印关键日志，不覆盖全局 logger
 
@@ -13,6 +14,8 @@ from .config import config
 _alias_to_canonical: Dict[str, str] = {}
 # 反向索引：canonical_name -> [alias_names]
 _canonical_to_aliases: Dict[str, List[str]] = {}
+# 查询只读这份索引；刷新时整体构建新索引后替换引用
+_alias_index: AliasIndex = AliasIndex()
 _initialized: bool = False
 _init_lock = asyncio.Lock()
 
@@ -64,10 +67,12 @@ def _flatten_alias_items(items: List[dict]) -> List[dict]:
 
 
 async def _build_from_items(items: List[dict]) -> Tuple[int, int]:
+    global _alias_to_canonical, _canonical_to_aliases, _alias_index
     loaded_alias = 0
     loaded_canonical = 0
-    _alias_to_canonical.clear()
-    _canonical_to_aliases.clear()
+    # 在新的映射上构建，完成后再替换全局引用
+    alias_to_canonical: Dict[str, str] = {}
+    canonical_to_aliases: Dict[str, List[str]] = {}
     total = len(items)
     miss_name = 0
     miss_show = 0
@@ -100,13 +105,15 @@ async def _build_from_items(items: List[dict]) -> Tuple[int, int]:
                 except Exception:
                     pass
             continue
-        _alias_to_canonical[name] = show_name
+        alias_to_canonical[name] = show_name
         loaded_alias += 1
-        if show_name not in _canonical_to_aliases:
-            _canonical_to_aliases[show_name] = []
+        if show_name not in canonical_to_aliases:
+            canonical_to_aliases[show_name] = []
             loaded_canonical += 1
-        if name not in _canonical_to_aliases[show_name]:
-            _canonical_to_aliases[show_name].append(name)
+        if name not in canonical_to_aliases[show_name]:
+            canonical_to_aliases[show_name].append(name)
+    alias_index = AliasIndex.build(alias_to_canonical, canonical_to_aliases)
+    _alias_to_canonical, _canonical_to_aliases, _alias_index = alias_to_canonical, canonical_to_aliases, alias_index
     print(f"[alias] build index done: alias={loaded_alias}, canonical={loaded_canonical}, total={total}, miss_name={miss_name}, miss_showName={miss_show}")
     if miss_examples:
         try:
@@ -341,25 +348,16 @@ async def get_canonical_name(keyword: str) -> str:
     if not _initialized:
         await initialize_aliases()
     key = (keyword or "").strip()
-    if key in _canonical_to_aliases:
+    index = _alias_index
+    result = index.canonical(key)
+    if result == key and key in index.canonical_to_aliases:
         print(f"[alias] canonical lookup hit original: '{key}'")
-        return key
-    result = _alias_to_canonical.get(key, key)
-    print(f"[alias] canonical lookup: '{key}' -> '{result}', alias_size={len(_alias_to_canonical)}")
+        return result
+    print(f"[alias] canonical lookup: '{key}' -> '{result}', alias_size={len(index.alias_to_canonical)}")
     return result
 
 
 async def search_aliases(keyword: str) -> List[str]:
     if not _initialized:
         await initialize_aliases()
-    k = (keyword or "").strip().lower()
-    candidates = set()
-    for alias, canonical in _alias_to_canonical.items():
-        a = alias.lower()
-        if a.startswith(k) or k in a:
-            candidates.add(canonical)
-    for canonical in _canonical_to_aliases.keys():
-        c = canonical.lower()
-        if c.startswith(k) or k in c:
-            candidates.add(canonical)
-    return list(candidates)[:20] 
\ No newline at end of file
+    return _alias_index.search((keyword or "").strip(), limit=20)
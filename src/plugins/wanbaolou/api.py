@@ -10,6 +10,7 @@ import httpx
 from httpx import HTTPError, ConnectError, ReadTimeout, Response
 
 from src.plugins.wanbaolou.config import config
+from src.infra.http_pool import http_pool
 
 import logging
 
@@ -26,7 +27,7 @@ class SimpleCache:
         if key not in self.cache:
             return None
 
-        data, expire_time = self.cache[key]
+        data, expire_time, _stored_at = self.cache[key]
         if time.time() > expire_time:
             del self.cache[key]
             return None
@@ -35,8 +36,14 @@ class SimpleCache:
 
     def set(self, key, value, ttl=None):
         """设置缓存内容及过期时间"""
-        expire_time = time.time() + (ttl if ttl is not None else self.ttl)
-        self.cache[key] = (value, expire_time)
+        now = time.time()
+        expire_time = now + (ttl if ttl is not None else self.ttl)
+        self.cache[key] = (value, expire_time, now)
+
+    def stored_at(self, key):
+        """缓存内容的写入时间（即实际请求上游的时间），不存在时返回None"""
+        entry = self.cache.get(key)
+        return entry[2] if entry else None
 
     def clear(self):
         """清空缓存"""
@@ -60,16 +67,15 @@ class JX3TradeAPI:
         self.cdn_base_url = config.jx3_cdn_base_url
         self.endpoints = config.jx3_api_endpoints
 
-        # 创建异步HTTP客户端
-        self.client = httpx.AsyncClient(
-            timeout=self.timeout,
-            verify=verify_ssl,
-            follow_redirects=True
-        )
+    async def _request(self, method, url, **kwargs):
+        """通过共享连接池发送请求（连接按 host 复用）"""
+        kwargs.setdefault("timeout", self.timeout)
+        kwargs.setdefault("follow_redirects", True)
+        return await http_pool.arequest(method, url, verify=self.verify_ssl, **kwargs)
 
     async def close(self):
-        """关闭HTTP客户端"""
-        await self.client.aclose()
+        """共享连接池由 src.infra.http_pool 在 driver 关闭时统一释放，这里无需处理"""
+        return None
 
     async def _make_request(self, url, params=None, method="GET", cache_key=None):
         """发送HTTP请求并处理重试逻辑"""
@@ -83,9 +89,9 @@ class JX3TradeAPI:
         for attempt in range(self.retry_times):
             try:
                 if method == "GET":
-                    response = await self.client.get(url, params=params)
+                    response = await self._request("GET", url, params=params)
                 elif method == "POST":
-                    response = await self.client.post(url, json=params)
+                    response = await self._request("POST", url, json=params)
                 else:
                     raise ValueError(f"不支持的HTTP方法: {method}")
 
@@ -124,7 +130,8 @@ class JX3TradeAPI:
         """检查URL是否存在"""
         try:
             # 使用HEAD请求检查URL是否存在
-            response = await self.client.head(
+            response = await self._request(
+                "HEAD",
                 url,
                 timeout=5.0,
                 follow_redirects=True
@@ -208,6 +215,8 @@ class JX3TradeAPI:
             # 如果需要解析数据
             if parse_data:
                 result = {
+                    # 实际请求上游的时间；命中缓存时为缓存写入时间，而不是本次调用时间
+                    "fetched_at": cache.stored_at(cache_key) or time.time(),
                     "total_items": data.get("total_record", 0),
                     "current_page": data.get("current_page", 1),
                     "total_pages": data.get("total_page", 0),
@@ -287,9 +296,8 @@ class JX3TradeAPI:
                 # 先检查URL是否存在
                 exists = False
                 try:
-                    async with httpx.AsyncClient(verify=False) as client:
-                        head_response = await client.head(image_url, timeout=10)
-                        exists = head_response.status_code == 200
+                    head_response = await http_pool.arequest("HEAD", image_url, verify=False, timeout=10)
+                    exists = head_response.status_code == 200
                 except Exception as e:
                     logger.debug(f"检查URL {image_url} 失败: {e}")
                     continue
@@ -298,13 +306,12 @@ class JX3TradeAPI:
                     continue
 
                 # URL有效，下载图片
-                async with httpx.AsyncClient(verify=False) as client:
-                    response = await client.get(image_url, timeout=10)
-                    if response.status_code == 200:
-                        # 保存到本地
-                        local_path.write_bytes(response.content)
-                        logger.info(f"图片已下载到: {file_name}")
-                        return f"{base_url}/{file_name}"
+                response = await http_pool.arequest("GET", image_url, verify=False, timeout=10)
+                if response.status_code == 200:
+                    # 保存到本地
+                    local_path.write_bytes(response.content)
+                    logger.info(f"图片已下载到: {file_name}")
+                    return f"{base_url}/{file_name}"
             except Exception as e:
                 logger.error(f"处理图片URL {image_url} 时出错: {e}")
                 # 继续尝试下一个模板
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import statistics
+import time
+from typing import Any, Optional
+
+from nonebot.log import logger
+
+from src.renderers.jx3.fast_image import FastTable
+from src.storage.price_history_store import DAY, PriceHistoryStore, get_price_history_store
+
+try:
+    import config as cfg
+except Exception:  # pragma: no cover
+    cfg = None  # type: ignore
+
+PRICE_HISTORY_DB = getattr(cfg, "WANBAOLOU_PRICE_HISTORY_DB", "data/wanbaolou_price_history.db") if cfg else "data/wanbaolou_price_history.db"
+RAW_HOURS = float(getattr(cfg, "WANBAOLOU_PRICE_HISTORY_RAW_HOURS", 48) if cfg else 48)
+HOURLY_DAYS = float(getattr(cfg, "WANBAOLOU_PRICE_HISTORY_HOURLY_DAYS", 30) if cfg else 30)
+DAILY_DAYS = float(getattr(cfg, "WANBAOLOU_PRICE_HISTORY_DAILY_DAYS", 730) if cfg else 730)
+FLUSH_MINUTES = float(getattr(cfg, "WANBAOLOU_PRICE_HISTORY_FLUSH_MINUTES", 5) if cfg else 5)
+
+# 中位价固定取“在售最便宜的 SAMPLE_SIZE 件”的中位数；查询返回的页更大时只取前 SAMPLE_SIZE 件，口径一致
+SAMPLE_SIZE = 5
+
+_store: Optional[PriceHistoryStore] = None
+
+
+def get_store() -> PriceHistoryStore:
+    global _store
+    if _store is None:
+        _store = get_price_history_store(
+            PRICE_HISTORY_DB,
+            raw_retention_seconds=RAW_HOURS * 3600,
+            hourly_retention_seconds=HOURLY_DAYS * DAY,
+            daily_retention_seconds=DAILY_DAYS * DAY,
+        )
+    return _store
+
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(number) else number
+
+
+def record_listing(item_name: str, sale_items: Optional[dict]) -> None:
+    """
+    记录一次在售查询结果（sort_type=1 价格从低到高，第一页）：第一条为最低价，
+    最便宜的 SAMPLE_SIZE 件的中位数为中位价；本页不足 SAMPLE_SIZE 件且还有更多在售时中位价记为缺失。
+
+    时间戳取实际请求上游的时间（fetched_at），命中接口缓存的重复结果不会再记一次。
+    记录失败只打日志，不影响查询本身。
+    """
+    if not item_name or not isinstance(sale_items, dict):
+        return
+    try:
+        prices = [
+            price
+            for price in (_to_float(item.get("price")) for item in sale_items.get("parsed_items") or [])
+            if price is not None
+        ]
+        listings = _to_float(sale_items.get("total_items"))
+        sample = prices[:SAMPLE_SIZE]
+        complete = len(sample) >= SAMPLE_SIZE or (listings is not None and len(sample) >= listings)
+        low = prices[0] if prices else None
+        median = float(statistics.median(sample)) if sample and complete else None
+        get_store().record(
+            item_name, low, median=median, listings=listings, ts=_to_float(sale_items.get("fetched_at"))
+        )
+    except Exception as e:
+        logger.warning(f"记录价格历史失败: item={item_name} error={e}")
+
+
+async def flush() -> None:
+    try:
+        written = await asyncio.to_thread(get_store().flush)
+        if written:
+            logger.debug(f"价格历史已写回: rows={written}")
+    except Exception as e:
+        logger.error(f"写回价格历史失败: {e}")
+
+
+async def maintain() -> None:
+    """
+    定时任务：对所有物品降采样 / 过期删除（不再被查询的物品也会按保留规则处理），然后写回 SQLite。
+    """
+    try:
+        compacted = await asyncio.to_thread(get_store().compact)
+        if compacted:
+            logger.debug(f"价格历史已降采样: items={compacted}")
+    except Exception as e:
+        logger.error(f"价格历史降采样失败: {e}")
+    await flush()
+
+
+def _fmt_price(value: float) -> str:
+    if math.isnan(value):
+        return "-"
+    return f"{value:.0f}" if value == int(value) else f"{value:.2f}"
+
+
+def _fmt_time(ts: float, pattern: str = "%m-%d %H:%M") -> str:
+    return time.strftime(pattern, time.localtime(ts))
+
+
+def build_trend_reply(item_name: str, *, days: int = 7, table_days: int = 14) -> tuple[str, Optional[FastTable]]:
+    """
+    全部来自本地价格历史：历史最低、近 days 天走势和近 table_days 天的日线表。没有记录时表格为 None。
+    """
+    store = get_store()
+    lowest = store.historical_low(item_name)
+    if lowest is None:
+        return f"本地暂无【{item_name}】的价格记录，查询或订阅该外观后会开始记录", None
+
+    low_price, low_at = lowest
+    lines = [f"【{item_name}】价格走势", f"历史最低: {_fmt_price(low_price)} 元（{_fmt_time(low_at, '%Y-%m-%d')}）"]
+    trend = store.trend(item_name, days=days)
+    if trend is None:
+        lines.append(f"近{days}天没有在售记录")
+    else:
+        change_pct = trend["change_pct"]
+        change = f"{trend['change']:+.0f} 元" + (f"（{change_pct:+.2f}%）" if change_pct is not None else "")
+        lines.extend([
+            f"最新最低价: {_fmt_price(trend['last'])} 元（{_fmt_time(trend['last_at'])}）",
+            f"近{days}天: 最低 {_fmt_price(trend['min'])} / 最高 {_fmt_price(trend['max'])} 元，涨跌 {change}",
+        ])
+
+    daily = store.buckets(item_name, DAY, since=time.time() - table_days * DAY)
+    rows = [
+        (_fmt_time(ts, "%m-%d"), _fmt_price(low), _fmt_price(median), "-" if math.isnan(count) else f"{count:.0f}")
+        for ts, low, median, count in reversed(daily)
+    ]
+    for date, low, median, _count in rows[:days]:
+        lines.append(f"{date}  最低 {low}  前{SAMPLE_SIZE}中位 {median}")
+
+    table = FastTable(
+        title=f"{item_name} 价格走势",
+        columns=("日期", "最低价", f"前{SAMPLE_SIZE}中位", "在售"),
+        rows=tuple(rows),
+        subtitle=lines[1],
+        footer=f"近{table_days}天日线，数据来自本地价格记录",
+    )
+    return "\n".join(lines), table
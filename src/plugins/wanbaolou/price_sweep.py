@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+from nonebot.log import logger
+
+from src.infra.rate_limiter import TokenBucket
+
+from . import price_history
+
+try:
+    import config as cfg
+except Exception:  # pragma: no cover
+    cfg = None  # type: ignore
+
+SWEEP_CONCURRENCY = int(getattr(cfg, "WANBAOLOU_SWEEP_CONCURRENCY", 4) if cfg else 4)
+RATE_LIMIT_QPS = float(getattr(cfg, "WANBAOLOU_RATE_LIMIT_QPS", 4.0) if cfg else 4.0)
+RATE_LIMIT_BURST = int(getattr(cfg, "WANBAOLOU_RATE_LIMIT_BURST", 4) if cfg else 4)
+
+# 每个上游 host 一个令牌桶，价格巡检的所有请求共享
+_host_limiters: Dict[str, TokenBucket] = {}
+
+
+def host_limiter(url: str) -> TokenBucket:
+    host = (urlsplit(url).hostname or "").lower()
+    limiter = _host_limiters.get(host)
+    if limiter is None:
+        limiter = TokenBucket(rate=RATE_LIMIT_QPS, burst=RATE_LIMIT_BURST)
+        _host_limiters[host] = limiter
+    return limiter
+
+
+@dataclass
+class SweepReport:
+    """
+    一次价格巡检的统计：订阅数、去重后的物品数、上游调用 / 失败次数、发出的通知与耗时。
+    """
+
+    users: int = 0
+    subscriptions: int = 0
+    items: int = 0
+    upstream_calls: int = 0
+    failed_items: int = 0
+    notified: int = 0
+    rate_limited_seconds: float = 0.0
+    started_at: float = field(default_factory=time.time)
+    duration: float = 0.0
+
+    def summary(self) -> str:
+        return (
+            f"users={self.users} subscriptions={self.subscriptions} items={self.items} "
+            f"upstream_calls={self.upstream_calls} failed_items={self.failed_items} "
+            f"notified={self.notified} rate_limited={self.rate_limited_seconds:.1f}s "
+            f"duration={self.duration:.2f}s"
+        )
+
+
+last_sweep_report: Optional[SweepReport] = None
+
+
+async def fetch_lowest_prices(
+    api: Any,
+    item_names: Iterable[str],
+    report: SweepReport,
+    *,
+    concurrency: int = SWEEP_CONCURRENCY,
+) -> Dict[str, Optional[Any]]:
+    """
+    每个物品只查询一次在售最低价，并发数受 concurrency 限制，请求速率受上游 host 的令牌桶限制。
+
+    返回 物品名 -> 最低价；无在售返回 None，查询失败的物品不出现在结果中。每次成功的查询同时写入价格历史。
+    """
+    names = list(dict.fromkeys(item_names))
+    semaphore = asyncio.Semaphore(max(1, int(concurrency)))
+    limiter = host_limiter(getattr(api, "base_url", "") or "")
+    prices: Dict[str, Optional[Any]] = {}
+
+    async def one(item_name: str) -> None:
+        async with semaphore:
+            # 先等待再累加：写成 += await ... 会在等待前读取旧值，并发时互相覆盖
+            waited = await limiter.acquire()
+            report.rate_limited_seconds += waited
+            report.upstream_calls += 1
+            try:
+                sale_items = await api.get_item_list(
+                    item_name=item_name,
+                    sort_type=1,  # 价格从低到高
+                    status_filter=2,  # 在售状态
+                    page=1,
+                    page_size=price_history.SAMPLE_SIZE,  # 最低价取第一条；同时按统一口径记录价格历史
+                )
+            except Exception as e:
+                report.failed_items += 1
+                logger.error(f"查询物品 {item_name} 最低价失败: {str(e)}")
+                return
+        price_history.record_listing(item_name, sale_items)
+        if sale_items and sale_items.get('parsed_items'):
+            prices[item_name] = sale_items['parsed_items'][0]['price']
+        else:
+            prices[item_name] = None
+
+    await asyncio.gather(*(one(name) for name in names))
+    return prices
@@ -0,0 +1,375 @@
+from __future__ import annotations
+
+import heapq
+from array import array
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+# 本模块不依赖 nonebot，便于 scripts/bench_appearance_search.py 单独加载
+
+
+def clean_text(text: str) -> str:
+    return (text or "").lower().replace('·', '').replace(' ', '')
+
+
+def is_subsequence(s: str, t: str) -> bool:
+    """
+    检查s是否是t的子序列(字符按顺序出现但可以不连续)
+    """
+    i, j = 0, 0
+    while i < len(s) and j < len(t):
+        if s[i] == t[j]:
+            i += 1
+        j += 1
+    return i == len(s)
+
+
+def calculate_consecutive_bonus(keyword: str, text: str) -> int:
+    """
+    计算连续匹配字符的额外分数
+    """
+    bonus = 0
+    current_pos = 0
+    consecutive_count = 0
+
+    for char in keyword:
+        # 从上一个找到的位置之后开始查找
+        pos = text.find(char, current_pos)
+        if pos == -1:
+            break
+
+        # 如果字符位置连续，增加连续计数
+        if pos == current_pos:
+            consecutive_count += 1
+        else:
+            # 重置连续计数
+            consecutive_count = 1
+
+        current_pos = pos + 1
+
+    # 连续字符越多，奖励越高
+    bonus = consecutive_count * 20
+    return bonus
+
+
+def score_item(clean_keyword: str, clean_name: str, clean_category: str) -> int:
+    """
+    单个物品的相关度得分（规则与原先线性扫描完全一致）。
+    """
+    score = 0
+
+    # 1. 精确匹配 (最高分)
+    if clean_keyword == clean_name:
+        score = 1000
+
+    # 2. 前缀匹配 (高分)
+    elif clean_name.startswith(clean_keyword):
+        score = 800
+
+    # 3. 包含整个关键词 (较高分)
+    elif clean_keyword in clean_name:
+        score = 600
+
+    # 4. 有序子序列匹配 (适中分数) - 关键词字符按顺序出现，但可以不连续
+    elif is_subsequence(clean_keyword, clean_name):
+        score = 500
+
+        # 额外加分：字符连续性越高分数越高
+        consecutive_bonus = calculate_consecutive_bonus(clean_keyword, clean_name)
+        score += consecutive_bonus
+
+    # 5. 分离字符匹配 (低分) - 例如"龙隐金"的所有字符都在名称中，但顺序可能不同
+    else:
+        # 计算关键词中有多少字符出现在名称中
+        char_match_count = sum(1 for char in clean_keyword if char in clean_name)
+        match_ratio = char_match_count / len(clean_keyword)
+
+        if match_ratio >= 0.7:  # 至少70%的字符匹配
+            # 基础分
+            score = 300
+
+            # 根据匹配比例加分
+            score += int(match_ratio * 100)
+
+            # 检查有没有关键字组合出现在名称中
+            for i in range(len(clean_keyword) - 1):
+                if clean_keyword[i:i + 2] in clean_name:
+                    score += 50  # 每有一个2字连续组合加50分
+
+    # 6. 类别匹配 (额外加分)
+    if clean_keyword in clean_category:
+        score += 100
+
+    return score
+
+
+@dataclass(frozen=True)
+class AppearanceIndex:
+    """
+    外观搜索的预计算索引，在 init_appearance_searcher 时构建一次。
+
+    - clean_names / clean_categories: 规范化后的名称与分类（与 data 下标对应）
+    - char_postings: 字符 -> 名称中含该字符的物品下标（升序）
+    - category_postings: 规范化分类 -> 物品下标；分类种类很少，逐个做子串判断
+    - name_postings: 原名 -> 物品下标，用于别名加分
+
+    得分 > 0 的物品要么分类包含关键词，要么名称覆盖了关键词至少 70% 的字符（规则 1-4 要求全部字符），
+    因此按字符倒排统计覆盖数即可精确筛出候选，候选之外的物品得分必为 0，排序结果与全量扫描一致。
+    """
+
+    data: List[Dict[str, Any]] = field(default_factory=list)
+    clean_names: List[str] = field(default_factory=list)
+    clean_categories: List[str] = field(default_factory=list)
+    char_postings: Dict[str, List[int]] = field(default_factory=dict)
+    category_postings: Dict[str, List[int]] = field(default_factory=dict)
+    name_postings: Dict[str, List[int]] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, data: List[Dict[str, Any]]) -> "AppearanceIndex":
+        index = cls(data=list(data))
+        for idx, item in enumerate(index.data):
+            clean_name = clean_text(item['name'])
+            clean_category = clean_text(item['category'])
+            index.clean_names.append(clean_name)
+            index.clean_categories.append(clean_category)
+            for char in set(clean_name):
+                index.char_postings.setdefault(char, []).append(idx)
+            index.category_postings.setdefault(clean_category, []).append(idx)
+            index.name_postings.setdefault(item['name'], []).append(idx)
+        return index
+
+    def candidates(self, clean_keyword: str) -> List[int]:
+        if not clean_keyword:
+            # 空关键词时所有名称都满足前缀匹配
+            return list(range(len(self.data)))
+
+        coverage: Dict[int, int] = {}
+        for char, count in Counter(clean_keyword).items():
+            for idx in self.char_postings.get(char, ()):
+                coverage[idx] = coverage.get(idx, 0) + count
+        keyword_length = len(clean_keyword)
+        selected: Set[int] = {idx for idx, covered in coverage.items() if covered / keyword_length >= 0.7}
+
+        for clean_category, indices in self.category_postings.items():
+            if clean_keyword in clean_category:
+                selected.update(indices)
+        return sorted(selected)
+
+    def alias_items(self, canonical_names: Iterable[str]) -> List[int]:
+        indices: Set[int] = set()
+        for name in canonical_names:
+            indices.update(self.name_postings.get(name, ()))
+        return sorted(indices)
+
+    def rank(self, clean_keyword: str, alias_canonical_set: Set[str]) -> List[Tuple[Dict[str, Any], int]]:
+        """
+        返回按得分降序排列的 (物品, 得分)；同名同分类的物品只保留一条，别名命中的原名至少 850 分。
+        """
+        # 使用字典聚合同名项分数，便于后续基于别名结果加分/补全
+        item_score_map: Dict[str, int] = {}
+        item_obj_map: Dict[str, Dict[str, Any]] = {}
+        for idx in self.candidates(clean_keyword):
+            score = score_item(clean_keyword, self.clean_names[idx], self.clean_categories[idx])
+            if score <= 0:
+                continue
+            item = self.data[idx]
+            key = f"{item['name']}|{item['category']}"
+            prev = item_score_map.get(key, 0)
+            if score > prev:
+                item_score_map[key] = score
+                item_obj_map[key] = item
+
+        # 对别名模糊匹配到的原名，直接给予较高分数，确保能够被检索到
+        for idx in self.alias_items(alias_canonical_set):
+            item = self.data[idx]
+            key = f"{item['name']}|{item['category']}"
+            # 给予一个较高的基础分，但低于原有的“完全精确匹配(1000)”
+            item_score_map[key] = max(item_score_map.get(key, 0), 850)
+            item_obj_map[key] = item
+
+        scored_results = [(item_obj_map[k], v) for k, v in item_score_map.items()]
+        # 按分数降序排序（稳定排序，同分保持物品原有顺序）
+        scored_results.sort(key=lambda x: x[1], reverse=True)
+        return scored_results
+
+
+# 后缀数组中的文本分隔符；关键词不会包含该字符，匹配不会跨越名称 / 分类边界
+_SEPARATOR = "\x00"
+
+
+class SuffixIndex:
+    """
+    名称与分类的子串索引：所有物品的 "名称\0分类\0"（小写）拼成一个字符串，对其中每个位置建后缀数组。
+
+    - positions: 按后缀字典序排列的起始位置（array('I')，每个位置 4 字节）
+    - owners: 与 positions 对应的物品下标；同名同分类的重复物品统一记为第一次出现的下标
+    关键词的所有出现位置在后缀数组中是连续的一段，两次二分即可定位；
+    取前 limit 个物品时只维护大小为 limit 的堆，不生成完整的匹配列表。
+    """
+
+    __slots__ = ("text", "positions", "owners", "size")
+
+    def __init__(self) -> None:
+        self.text = ""
+        self.positions = array("I")
+        self.owners = array("I")
+        self.size = 0
+
+    @classmethod
+    def build(cls, data: List[Dict[str, Any]]) -> "SuffixIndex":
+        index = cls()
+        parts: List[str] = []
+        starts: List[int] = []
+        canonical: List[int] = []
+        first_seen: Dict[Tuple[str, str], int] = {}
+        offset = 0
+        for idx, item in enumerate(data):
+            key = (item['name'], item['category'])
+            canonical.append(first_seen.setdefault(key, idx))
+            for field_text in (item['name'].lower(), item['category'].lower()):
+                starts.append(offset)
+                parts.append(field_text + _SEPARATOR)
+                offset += len(field_text) + 1
+        text = "".join(parts)
+
+        # 按各自所在字段内的后缀排序（截止到分隔符），排序键总长度只与单个字段长度的平方相关
+        suffixes: List[Tuple[str, int, int]] = []
+        for field_no, start in enumerate(starts):
+            end = text.index(_SEPARATOR, start)
+            owner = canonical[field_no // 2]
+            for pos in range(start, end):
+                suffixes.append((text[pos:end + 1], pos, owner))
+        suffixes.sort()
+
+        index.text = text
+        index.positions = array("I", (pos for _, pos, _ in suffixes))
+        index.owners = array("I", (owner for _, _, owner in suffixes))
+        index.size = len(data)
+        return index
+
+    def _range(self, keyword: str) -> Tuple[int, int]:
+        # 比较时只截取与关键词等长的前缀；越过分隔符的部分含 \0，不会与关键词相等，也不影响与关键词的大小关系
+        length = len(keyword)
+        text = self.text
+        positions = self.positions
+
+        lo, hi = 0, len(positions)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            pos = positions[mid]
+            if text[pos:pos + length] < keyword:
+                lo = mid + 1
+            else:
+                hi = mid
+        start = lo
+        hi = len(positions)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            pos = positions[mid]
+            if text[pos:pos + length] <= keyword:
+                lo = mid + 1
+            else:
+                hi = mid
+        return start, lo
+
+    def count(self, keyword: str) -> int:
+        lo, hi = self._range(keyword)
+        return hi - lo
+
+    def top_items(self, keyword: str, limit: int) -> List[int]:
+        """
+        名称或分类包含关键词的物品下标，按物品原有顺序取前 limit 个（已按名称 + 分类去重）。
+        """
+        if not keyword or limit <= 0 or _SEPARATOR in keyword:
+            return []
+        lo, hi = self._range(keyword)
+        chosen: Set[int] = set()
+        heap: List[int] = []  # 存负数，堆顶为当前入选的最大下标
+        for i in range(lo, hi):
+            owner = self.owners[i]
+            if owner in chosen:
+                continue
+            if len(heap) < limit:
+                heapq.heappush(heap, -owner)
+                chosen.add(owner)
+            elif owner < -heap[0]:
+                chosen.discard(-heapq.heapreplace(heap, -owner))
+                chosen.add(owner)
+        return sorted(chosen)
+
+
+def _bigrams(text: str) -> Set[str]:
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+@dataclass(frozen=True)
+class AliasIndex:
+    """
+    别名索引，在 refresh_alias_cache 时整体重建后一次性替换，查询不会看到构建到一半的状态。
+
+    - alias_to_canonical / canonical_to_aliases: 与缓存文件一致的两张映射
+    - texts / owners: 预先小写的别名与原名，以及各自对应的原名
+    - char_postings / bigram_postings: 字符、二元组 -> texts 下标（升序）
+
+    子串查询取关键词各二元组倒排表的交集作为候选，再做一次真实的子串判断；单字关键词直接取字符倒排表。
+    """
+
+    alias_to_canonical: Dict[str, str] = field(default_factory=dict)
+    canonical_to_aliases: Dict[str, List[str]] = field(default_factory=dict)
+    texts: List[str] = field(default_factory=list)
+    owners: List[str] = field(default_factory=list)
+    char_postings: Dict[str, List[int]] = field(default_factory=dict)
+    bigram_postings: Dict[str, List[int]] = field(default_factory=dict)
+
+    @classmethod
+    def build(
+        cls,
+        alias_to_canonical: Dict[str, str],
+        canonical_to_aliases: Dict[str, List[str]],
+    ) -> "AliasIndex":
+        index = cls(alias_to_canonical=alias_to_canonical, canonical_to_aliases=canonical_to_aliases)
+        # 顺序与原先逐个扫描一致：先别名，后原名
+        pairs = [(alias, canonical) for alias, canonical in alias_to_canonical.items()]
+        pairs += [(canonical, canonical) for canonical in canonical_to_aliases]
+        for text, owner in pairs:
+            idx = len(index.texts)
+            lowered = text.lower()
+            index.texts.append(lowered)
+            index.owners.append(owner)
+            for char in set(lowered):
+                index.char_postings.setdefault(char, []).append(idx)
+            for gram in _bigrams(lowered):
+                index.bigram_postings.setdefault(gram, []).append(idx)
+        return index
+
+    def canonical(self, key: str) -> str:
+        if key in self.canonical_to_aliases:
+            return key
+        return self.alias_to_canonical.get(key, key)
+
+    def _matching_texts(self, keyword: str) -> Iterable[int]:
+        if not keyword:
+            return range(len(self.texts))
+        if len(keyword) == 1:
+            return self.char_postings.get(keyword, [])
+        postings = sorted((self.bigram_postings.get(gram, []) for gram in _bigrams(keyword)), key=len)
+        if not postings[0]:
+            return []
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                return []
+        return [idx for idx in sorted(candidates) if keyword in self.texts[idx]]
+
+    def search(self, keyword: str, limit: int = 20) -> List[str]:
+        """
+        别名或原名包含关键词（忽略大小写）的原名列表，按首次命中顺序去重，最多 limit 个。
+        """
+        result: Dict[str, None] = {}
+        for idx in self._matching_texts(keyword.lower()):
+            result.setdefault(self.owners[idx], None)
+            if len(result) >= limit:
+                break
+        return list(result)
@@ -1,44 +1,17 @@
 # appearance_search/searcher.py
 import json
 import aiofiles
-from typing import List, Dict, Any, Set
+from typing import List, Dict, Any
 from nonebot import logger
 from .alias import get_canonical_name, search_aliases
-
-
-class TrieNode:
-    def __init__(self):
-        self.children = {}
-        self.is_end = False
-        self.items = []
-
-
-class AsyncTrie:
-    def __init__(self):
-        self.root = TrieNode()
-
-    def insert(self, word: str, item: Dict[str, Any]) -> None:
-        node = self.root
-        for char in word:
-            if char not in node.children:
-                node.children[char] = TrieNode()
-            node = node.children[char]
-            node.items.append(item)
-        node.is_end = True
-
-    def search_prefix(self, prefix: str) -> List[Dict[str, Any]]:
-        node = self.root
-        for char in prefix:
-            if char not in node.children:
-                return []
-            node = node.children[char]
-        return node.items
+from .search_index import AppearanceIndex, SuffixIndex, clean_text
 
 
 class AppearanceSearcher:
     def __init__(self):
-        self.trie = AsyncTrie()
+        self.suffix_index = SuffixIndex()
         self.data = []
+        self.index = AppearanceIndex()
         self.is_initialized = False
 
     async def initialize(self, file_path: str = 'waiguan.json') -> None:
@@ -64,6 +37,7 @@ class AppearanceSearcher:
                         self.data.append({'name': item['name'], 'category': item['category']})
 
                 await self._build_index()
+                self.index = AppearanceIndex.build(self.data)
 
                 self.is_initialized = True
                 logger.success(f"外观搜索索引已初始化，共 {len(self.data)} 个物品")
@@ -73,37 +47,16 @@ class AppearanceSearcher:
             raise
 
     async def _build_index(self) -> None:
-        for item in self.data:
-            # 索引名称的每个子串
-            for i in range(len(item['name'])):
-                self.trie.insert(item['name'][i:].lower(), item)
-
-            # 索引分类的每个子串
-            for i in range(len(item['category'])):
-                self.trie.insert(item['category'][i:].lower(), item)
+        # 名称与分类的子串索引（后缀数组），替代逐个后缀插入的字典树
+        self.suffix_index = SuffixIndex.build(self.data)
 
     async def search(self, keyword: str, limit: int = 10) -> List[Dict[str, Any]]:
         if not self.is_initialized:
             logger.warning("搜索器未初始化，正在尝试初始化...")
             await self.initialize()
 
-        keyword = keyword.lower()
-        raw_results = self.trie.search_prefix(keyword)
-
-        # 去重并限制结果数量
-        unique_results = []
-        seen: Set[str] = set()
-
-        for item in raw_results:
-            item_key = f"{item['name']}_{item['category']}"
-            if item_key not in seen and len(unique_results) < limit:
-                unique_results.append(item)
-                seen.add(item_key)
-
-                if len(unique_results) >= limit:
-                    break
-
-        return unique_results
+        # 名称或分类包含关键词的物品，按原有顺序取前 limit 个（同名同分类只保留一条）
+        return [self.data[idx] for idx in self.suffix_index.top_items(keyword.lower(), limit)]
 
 
 # 创建全局搜索器实例
@@ -140,88 +93,12 @@ async def search_appearance(keyword: str, limit: int = 15) -> List[Dict[str, Any
         print(f"[search] alias fuzzy matched canonicals count={len(alias_canonicals)} sample={alias_canonicals[:5]}")
 
     # 清理关键词
-    clean_keyword = canonical.lower().replace('·', '').replace(' ', '')
-
-    # 存储所有结果及其得分
-    scored_results = []
-
-    # 遍历所有物品
-    for item in appearance_searcher.data:
-        clean_name = item['name'].lower().replace('·', '').replace(' ', '')
-        clean_category = item['category'].lower().replace('·', '').replace(' ', '')
-        score = 0
-
-        # 1. 精确匹配 (最高分)
-        if clean_keyword == clean_name:
-            score = 1000
-
-        # 2. 前缀匹配 (高分)
-        elif clean_name.startswith(clean_keyword):
-            score = 800
-
-        # 3. 包含整个关键词 (较高分)
-        elif clean_keyword in clean_name:
-            score = 600
-
-        # 4. 有序子序列匹配 (适中分数) - 关键词字符按顺序出现，但可以不连续
-        elif is_subsequence(clean_keyword, clean_name):
-            score = 500
-
-            # 额外加分：字符连续性越高分数越高
-            consecutive_bonus = calculate_consecutive_bonus(clean_keyword, clean_name)
-            score += consecutive_bonus
+    clean_keyword = clean_text(canonical)
 
-        # 5. 分离字符匹配 (低分) - 例如"龙隐金"的所有字符都在名称中，但顺序可能不同
-        else:
-            # 计算关键词中有多少字符出现在名称中
-            char_match_count = sum(1 for char in clean_keyword if char in clean_name)
-            match_ratio = char_match_count / len(clean_keyword)
-
-            if match_ratio >= 0.7:  # 至少70%的字符匹配
-                # 基础分
-                score = 300
-
-                # 根据匹配比例加分
-                score += int(match_ratio * 100)
-
-                # 检查有没有关键字组合出现在名称中
-                for i in range(len(clean_keyword) - 1):
-                    if clean_keyword[i:i + 2] in clean_name:
-                        score += 50  # 每有一个2字连续组合加50分
-
-        # 6. 类别匹配 (额外加分)
-        if clean_keyword in clean_category:
-            score += 100
-
-        # 只记录有分数的结果
-        if score > 0:
-            scored_results.append((item, score))
-
-    # 使用字典聚合同名项分数，便于后续基于别名结果加分/补全
-    item_score_map: Dict[str, int] = {}
-    item_obj_map: Dict[str, Dict[str, Any]] = {}
-    for item, score in scored_results:
-        key = f"{item['name']}|{item['category']}"
-        prev = item_score_map.get(key, 0)
-        if score > prev:
-            item_score_map[key] = score
-            item_obj_map[key] = item
-
-    # 对别名模糊匹配到的原名，直接给予较高分数，确保能够被检索到
+    # 只对倒排索引筛出的候选打分，得分规则与排序与全量扫描一致
+    scored_results = appearance_searcher.index.rank(clean_keyword, alias_canonical_set)
     if alias_canonical_set:
-        for item in appearance_searcher.data:
-            if item.get('name') in alias_canonical_set:
-                key = f"{item['name']}|{item['category']}"
-                # 给予一个较高的基础分，但低于原有的“完全精确匹配(1000)”
-                boosted = max(item_score_map.get(key, 0), 850)
-                item_score_map[key] = boosted
-                item_obj_map[key] = item
-        print(f"[search] alias boosted items={len(item_obj_map)}")
-
-    # 还原为列表并排序
-    scored_results = [(item_obj_map[k], v) for k, v in item_score_map.items()]
-    # 按分数降序排序
-    scored_results.sort(key=lambda x: x[1], reverse=True)
+        print(f"[search] alias boosted items={len(scored_results)}")
 
     # 获取前limit个结果
     top_results_raw = [item for item, _ in scored_results[:limit]]
@@ -237,42 +114,3 @@ async def search_appearance(keyword: str, limit: int = 15) -> List[Dict[str, Any
     print(f"[search] result_count={len(top_results)} for canonical='{canonical}'")
     return top_results
 
-
-def is_subsequence(s: str, t: str) -> bool:
-    """
-    检查s是否是t的子序列(字符按顺序出现但可以不连续)
-    """
-    i, j = 0, 0
-    while i < len(s) and j < len(t):
-        if s[i] == t[j]:
-            i += 1
-        j += 1
-    return i == len(s)
-
-
-def calculate_consecutive_bonus(keyword: str, text: str) -> int:
-    """
-    计算连续匹配字符的额外分数
-    """
-    bonus = 0
-    current_pos = 0
-    consecutive_count = 0
-
-    for char in keyword:
-        # 从上一个找到的位置之后开始查找
-        pos = text.find(char, current_pos)
-        if pos == -1:
-            break
-
-        # 如果字符位置连续，增加连续计数
-        if pos == current_pos:
-            consecutive_count += 1
-        else:
-            # 重置连续计数
-            consecutive_count = 1
-
-        current_pos = pos + 1
-
-    # 连续字符越多，奖励越高
-    bonus = consecutive_count * 20
-    return bonus
\ No newline at end of file
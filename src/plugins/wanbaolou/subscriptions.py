@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from nonebot.log import logger
+
+
+class SubscriptionRepo:
+    """
+    万宝楼价格订阅仓库：内存中的数据是唯一主副本，文件只做持久化。
+
+    - 按用户（保持用户看到的序号顺序）与按物品两套索引，新增、删除、“某物品的订阅者”都是 O(1)
+    - 每条订阅带内部 id，删除按 id 进行，巡检与用户取消同时发生也不会删错
+    - 写回延迟合并（write-behind）：修改后 flush_delay 秒内的多次变更只落盘一次；
+      先写临时文件再 os.replace，进程中途退出不会留下半截 JSON。driver 关闭时调用 flush() 立即落盘
+    - 文件格式仍为 {user_id: [订阅, ...]}，与旧数据兼容，旧数据缺少的 id 在加载时补齐
+    """
+
+    def __init__(self, path: str, *, flush_delay: float = 1.0) -> None:
+        self.path = path
+        self.flush_delay = max(0.0, float(flush_delay))
+        self._by_user: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._by_item: Dict[str, Dict[str, str]] = {}  # 物品名 -> {订阅 id: user_id}
+        self._loaded = False
+        self._dirty = False
+        self._flush_task: Optional[asyncio.Task] = None
+        # 串行化整个 flush（生成快照 + 写文件），避免较旧的快照后写入覆盖较新的；在事件循环内首次使用时创建
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._write_lock = threading.Lock()
+        self._counters = {"writes": 0, "write_failures": 0}
+
+    # ---- 加载 / 落盘 -----------------------------------------------------
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.error(f"加载订阅数据失败: {e}")
+            return
+
+        patched = False
+        for user_id, alerts in (raw or {}).items():
+            for alert in alerts or []:
+                if not isinstance(alert, dict) or not alert.get("item_name"):
+                    continue
+                if not alert.get("id"):
+                    alert["id"] = uuid.uuid4().hex
+                    patched = True
+                self._index(str(user_id), alert)
+        if patched:
+            self._dirty = True
+
+    def _index(self, user_id: str, alert: Dict[str, Any]) -> None:
+        self._by_user.setdefault(user_id, {})[alert["id"]] = alert
+        self._by_item.setdefault(alert["item_name"], {})[alert["id"]] = user_id
+
+    def _snapshot(self) -> Dict[str, List[Dict[str, Any]]]:
+        return {user_id: [dict(alert) for alert in alerts.values()] for user_id, alerts in self._by_user.items()}
+
+    def _write(self, snapshot: Dict[str, List[Dict[str, Any]]]) -> None:
+        with self._write_lock:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+
+    def _mark_dirty(self) -> None:
+        self._dirty = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = loop.create_task(self._delayed_flush())
+
+    async def _delayed_flush(self) -> None:
+        # 写文件期间发生的新修改由同一个任务在下一轮写回；写失败时停止，等下次修改或关闭时重试
+        while self._dirty:
+            await asyncio.sleep(self.flush_delay)
+            if not await self.flush():
+                return
+
+    async def flush(self) -> bool:
+        """
+        把当前内存数据写入文件；快照在事件循环线程中生成，写文件在线程中执行。
+
+        延迟写回任务与关闭时的 flush 可能重叠：两者排队执行，后执行的一次总是基于最新数据。
+        """
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            if not self._dirty:
+                return True
+            self._dirty = False
+            snapshot = self._snapshot()
+            try:
+                await asyncio.to_thread(self._write, snapshot)
+                self._counters["writes"] += 1
+                return True
+            except Exception as e:
+                self._dirty = True
+                self._counters["write_failures"] += 1
+                logger.error(f"保存订阅数据失败: {e}")
+                return False
+
+    # ---- 查询 / 修改 -----------------------------------------------------
+
+    def add(self, user_id: str, item_name: str, price_threshold: int, group_id: Optional[int] = None) -> Dict[str, Any]:
+        self._ensure_loaded()
+        alert = {
+            "id": uuid.uuid4().hex,
+            "item_name": item_name,
+            "price_threshold": price_threshold,
+            "group_id": group_id,
+            "created_at": time.time(),
+        }
+        self._index(str(user_id), alert)
+        self._mark_dirty()
+        return dict(alert)
+
+    def remove(self, user_id: str, subscription_id: str) -> Optional[Dict[str, Any]]:
+        self._ensure_loaded()
+        user_id = str(user_id)
+        alerts = self._by_user.get(user_id)
+        if not alerts or subscription_id not in alerts:
+            return None
+        alert = alerts.pop(subscription_id)
+        if not alerts:
+            del self._by_user[user_id]
+        watchers = self._by_item.get(alert["item_name"])
+        if watchers is not None:
+            watchers.pop(subscription_id, None)
+            if not watchers:
+                del self._by_item[alert["item_name"]]
+        self._mark_dirty()
+        return dict(alert)
+
+    def remove_at(self, user_id: str, index: int) -> Optional[Dict[str, Any]]:
+        """
+        按用户看到的序号（从1开始）删除订阅。
+        """
+        self._ensure_loaded()
+        alerts = self._by_user.get(str(user_id))
+        if not alerts or index < 1 or index > len(alerts):
+            return None
+        subscription_id = list(alerts)[index - 1]
+        return self.remove(user_id, subscription_id)
+
+    def for_user(self, user_id: str) -> List[Dict[str, Any]]:
+        self._ensure_loaded()
+        return [dict(alert) for alert in self._by_user.get(str(user_id), {}).values()]
+
+    def find(self, user_id: str, item_name: str) -> Optional[Dict[str, Any]]:
+        """
+        用户对某物品的第一条订阅。
+        """
+        self._ensure_loaded()
+        for alert in self._by_user.get(str(user_id), {}).values():
+            if alert["item_name"] == item_name:
+                return dict(alert)
+        return None
+
+    def subscribers(self, item_name: str) -> List[Tuple[str, Dict[str, Any]]]:
+        self._ensure_loaded()
+        return [
+            (user_id, dict(self._by_user[user_id][subscription_id]))
+            for subscription_id, user_id in self._by_item.get(item_name, {}).items()
+        ]
+
+    def item_names(self) -> List[str]:
+        self._ensure_loaded()
+        return list(self._by_item)
+
+    def all(self) -> Dict[str, List[Dict[str, Any]]]:
+        self._ensure_loaded()
+        return self._snapshot()
+
+    def stats(self) -> Dict[str, Any]:
+        self._ensure_loaded()
+        return {
+            "users": len(self._by_user),
+            "subscriptions": sum(len(alerts) for alerts in self._by_user.values()),
+            "items": len(self._by_item),
+            "dirty": self._dirty,
+            **self._counters,
+        }
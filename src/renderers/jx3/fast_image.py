@@ -0,0 +1,330 @@
+from __future__ import annotations
+
+import asyncio
+import io
+import os
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Any, Sequence
+
+import config as cfg
+from nonebot import logger
+from nonebot.adapters.onebot.v11 import Message, MessageSegment
+
+from src.infra.image_encoding import ImageEncoding
+from src.infra.render_cache import make_render_key, render_cache
+
+# Pillow 快速渲染：纯文本列表 / 表格直接在进程内栅格化，不经过 Chromium，也不依赖 playwright。
+# 按命令开启（config.FAST_RENDER_COMMANDS），未开启或缺少 Pillow 时调用方继续发送原文本。
+
+FAST_RENDER_COMMANDS = set(getattr(cfg, "FAST_RENDER_COMMANDS", ()) or ())
+FAST_RENDER_ENCODING = ImageEncoding.from_config(
+    getattr(cfg, "FAST_RENDER_ENCODING", None) or {"format": "png", "scale": 2}
+)
+DEFAULT_FONT_PATHS = (
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/truetype/wqy/wqy-microhei.ttc",
+    "/usr/share/fonts/wqy-microhei/wqy-microhei.ttc",
+    "C:/Windows/Fonts/msyh.ttc",
+    "/System/Library/Fonts/PingFang.ttc",
+)
+
+THEME = {
+    "background": (248, 249, 250),
+    "title_bg": (44, 62, 80),
+    "title_fg": (255, 255, 255),
+    "subtitle_fg": (200, 210, 220),
+    "header_bg": (233, 236, 239),
+    "text": (44, 62, 80),
+    "muted": (108, 117, 125),
+    "stripe": (255, 255, 255),
+    "stripe_alt": (241, 243, 245),
+    "border": (222, 226, 230),
+}
+
+
+@dataclass(frozen=True)
+class FastList:
+    title: str
+    lines: tuple[str, ...]
+    subtitle: str | None = None
+    footer: str | None = None
+
+
+@dataclass(frozen=True)
+class FastTable:
+    title: str
+    columns: tuple[str, ...]
+    rows: tuple[tuple[Any, ...], ...]
+    subtitle: str | None = None
+    footer: str | None = None
+    # 各列相对宽度；None 时按内容自动分配
+    weights: tuple[float, ...] | None = None
+
+
+def _load_pillow() -> Any:
+    try:
+        from PIL import Image, ImageDraw, ImageFont  # type: ignore
+    except Exception:
+        return None
+    return Image, ImageDraw, ImageFont
+
+
+def fast_render_available() -> bool:
+    return _load_pillow() is not None
+
+
+def fast_render_enabled(command: str) -> bool:
+    """
+    命令是否启用 Pillow 快速渲染：需在 config.FAST_RENDER_COMMANDS 中开启且已安装 Pillow。
+    """
+    return command in FAST_RENDER_COMMANDS and fast_render_available()
+
+
+@lru_cache(maxsize=1)
+def _font_path() -> str | None:
+    candidates = list(getattr(cfg, "FAST_RENDER_FONT_PATHS", ()) or ()) + list(DEFAULT_FONT_PATHS)
+    for path in candidates:
+        if path and os.path.exists(path):
+            return path
+    logger.warning("fast_image 未找到中文字体，请在 config.FAST_RENDER_FONT_PATHS 中指定，中文可能显示为方块")
+    return None
+
+
+@lru_cache(maxsize=16)
+def _font(size: int) -> Any:
+    _, _, ImageFont = _load_pillow()
+    path = _font_path()
+    if path:
+        return ImageFont.truetype(path, size)
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:  # Pillow < 10.1
+        return ImageFont.load_default()
+
+
+@lru_cache(maxsize=8192)
+def _char_width(font: Any, char: str) -> float:
+    return font.getlength(char)
+
+
+def _wrap(text: str, font: Any, max_width: float) -> list[str]:
+    # 整段放得下时只测一次；否则按单字宽度累加断行（中文没有空格，逐字断行）
+    lines: list[str] = []
+    for paragraph in str(text).split("\n"):
+        if font.getlength(paragraph) <= max_width:
+            lines.append(paragraph)
+            continue
+        current = ""
+        current_width = 0.0
+        for char in paragraph:
+            char_width = _char_width(font, char)
+            if current and current_width + char_width > max_width:
+                lines.append(current)
+                current, current_width = char, char_width
+            else:
+                current += char
+                current_width += char_width
+        lines.append(current)
+    return lines
+
+
+class _Canvas:
+    """
+    先计算布局（draw 操作列表与总高度），再一次性创建图片绘制。
+    """
+
+    def __init__(self, width: int, scale: float) -> None:
+        self.scale = scale
+        self.width = int(width * scale)
+        self.padding = int(20 * scale)
+        self.y = 0
+        self.ops: list[tuple[str, tuple[Any, ...]]] = []
+
+    def px(self, value: float) -> int:
+        return int(value * self.scale)
+
+    def rect(self, box: tuple[int, int, int, int], fill: tuple[int, int, int], outline: Any = None) -> None:
+        self.ops.append(("rect", (box, fill, outline)))
+
+    def text(self, xy: tuple[int, int], text: str, font: Any, fill: tuple[int, int, int]) -> None:
+        self.ops.append(("text", (xy, text, font, fill)))
+
+    def title_block(self, title: str, subtitle: str | None) -> None:
+        title_font = _font(self.px(22))
+        sub_font = _font(self.px(14))
+        inner = self.width - 2 * self.padding
+        title_lines = _wrap(title, title_font, inner)
+        sub_lines = _wrap(subtitle, sub_font, inner) if subtitle else []
+        line_h = self.px(32)
+        sub_h = self.px(22)
+        height = self.padding + len(title_lines) * line_h + len(sub_lines) * sub_h + self.px(12)
+        self.rect((0, self.y, self.width, self.y + height), THEME["title_bg"])
+        y = self.y + self.padding
+        for line in title_lines:
+            self.text((self.padding, y), line, title_font, THEME["title_fg"])
+            y += line_h
+        for line in sub_lines:
+            self.text((self.padding, y), line, sub_font, THEME["subtitle_fg"])
+            y += sub_h
+        self.y += height + self.px(12)
+
+    def footer_block(self, footer: str | None) -> None:
+        if footer:
+            font = _font(self.px(13))
+            for line in _wrap(footer, font, self.width - 2 * self.padding):
+                self.text((self.padding, self.y), line, font, THEME["muted"])
+                self.y += self.px(20)
+        self.y += self.padding
+
+    def render(self, encoding: ImageEncoding) -> bytes:
+        Image, ImageDraw, _ = _load_pillow()
+        image = Image.new("RGB", (self.width, max(self.y, 1)), THEME["background"])
+        draw = ImageDraw.Draw(image)
+        for kind, args in self.ops:
+            if kind == "rect":
+                box, fill, outline = args
+                draw.rectangle(box, fill=fill, outline=outline)
+            else:
+                xy, text, font, fill = args
+                draw.text(xy, text, font=font, fill=fill)
+        output = io.BytesIO()
+        if encoding.format == "jpeg":
+            image.save(output, format="JPEG", quality=int(encoding.quality or 85), optimize=True)
+        elif encoding.format == "webp":
+            image.save(output, format="WEBP", quality=int(encoding.quality or 85), method=4)
+        elif encoding.format == "png8":
+            image.quantize(colors=256, method=Image.Quantize.FASTOCTREE).save(output, format="PNG", optimize=True)
+        else:
+            # 纯色块 + 文字压缩率本就很高，低压缩等级换取编码耗时
+            image.save(output, format="PNG", compress_level=1)
+        return output.getvalue()
+
+
+def _draw_list(layout: FastList, width: int, encoding: ImageEncoding) -> bytes:
+    canvas = _Canvas(width, encoding.scale)
+    canvas.title_block(layout.title, layout.subtitle)
+    font = _font(canvas.px(15))
+    line_h = canvas.px(24)
+    inner = canvas.width - 2 * canvas.padding - canvas.px(16)
+    for index, text in enumerate(layout.lines):
+        wrapped = _wrap(text, font, inner)
+        height = len(wrapped) * line_h + canvas.px(8)
+        fill = THEME["stripe"] if index % 2 == 0 else THEME["stripe_alt"]
+        canvas.rect((canvas.padding, canvas.y, canvas.width - canvas.padding, canvas.y + height), fill)
+        y = canvas.y + canvas.px(4)
+        for line in wrapped:
+            canvas.text((canvas.padding + canvas.px(8), y), line, font, THEME["text"])
+            y += line_h
+        canvas.y += height
+    canvas.y += canvas.px(12)
+    canvas.footer_block(layout.footer)
+    return canvas.render(encoding)
+
+
+def _column_widths(layout: FastTable, font: Any, total: int) -> list[int]:
+    count = len(layout.columns)
+    if layout.weights and len(layout.weights) == count:
+        weights = [max(float(w), 0.01) for w in layout.weights]
+    else:
+        # 按表头与前 50 行内容的最大宽度分配，单列不超过总宽的一半
+        weights = []
+        for col in range(count):
+            cells = [layout.columns[col]] + [str(row[col]) for row in layout.rows[:50] if col < len(row)]
+            weights.append(min(max(font.getlength(cell) for cell in cells), total / 2) + 1)
+    scale = total / sum(weights)
+    widths = [int(w * scale) for w in weights]
+    widths[-1] += total - sum(widths)
+    return widths
+
+
+def _draw_table(layout: FastTable, width: int, encoding: ImageEncoding) -> bytes:
+    canvas = _Canvas(width, encoding.scale)
+    canvas.title_block(layout.title, layout.subtitle)
+    font = _font(canvas.px(15))
+    header_font = _font(canvas.px(15))
+    cell_pad = canvas.px(8)
+    line_h = canvas.px(22)
+    total = canvas.width - 2 * canvas.padding
+    widths = _column_widths(layout, font, total)
+
+    def draw_row(cells: Sequence[Any], fill: tuple[int, int, int], row_font: Any) -> None:
+        wrapped = [
+            _wrap("" if cell is None else str(cell), row_font, max(widths[i] - 2 * cell_pad, 1))
+            for i, cell in enumerate(list(cells)[: len(widths)])
+        ]
+        lines = max((len(item) for item in wrapped), default=1)
+        height = lines * line_h + 2 * cell_pad
+        x = canvas.padding
+        for i, column_width in enumerate(widths):
+            box = (x, canvas.y, x + column_width, canvas.y + height)
+            canvas.rect(box, fill, THEME["border"])
+            y = canvas.y + cell_pad
+            for line in wrapped[i] if i < len(wrapped) else []:
+                canvas.text((x + cell_pad, y), line, row_font, THEME["text"])
+                y += line_h
+            x += column_width
+        canvas.y += height
+
+    draw_row(layout.columns, THEME["header_bg"], header_font)
+    for index, row in enumerate(layout.rows):
+        draw_row(row, THEME["stripe"] if index % 2 == 0 else THEME["stripe_alt"], font)
+    canvas.y += canvas.px(12)
+    canvas.footer_block(layout.footer)
+    return canvas.render(encoding)
+
+
+def draw_fast_image(layout: FastList | FastTable, *, width: int = 800, encoding: ImageEncoding | None = None) -> bytes:
+    if not fast_render_available():
+        raise RuntimeError("缺少依赖 Pillow：请执行 pip install Pillow")
+    encoding = encoding or FAST_RENDER_ENCODING
+    if isinstance(layout, FastTable):
+        return _draw_table(layout, width, encoding)
+    return _draw_list(layout, width, encoding)
+
+
+async def render_fast_image(
+    layout: FastList | FastTable,
+    *,
+    width: int = 800,
+    encoding: ImageEncoding | None = None,
+    cache: bool = True,
+) -> bytes:
+    """
+    与 render_template_image 对应的快速渲染入口：在线程中绘制，结果同样进入截图缓存。
+    """
+    encoding = encoding or FAST_RENDER_ENCODING
+
+    async def render() -> bytes:
+        return await asyncio.to_thread(draw_fast_image, layout, width=width, encoding=encoding)
+
+    if not cache:
+        return await render()
+    key = make_render_key(
+        f"fast:{type(layout).__name__}",
+        None,
+        asdict(layout),
+        width,
+        "auto",
+        variant=encoding.signature,
+    )
+    return await render_cache.get_or_render(key, render)
+
+
+async def fast_image_or_text(
+    command: str,
+    layout: FastList | FastTable,
+    fallback_text: str,
+    *,
+    width: int = 800,
+) -> Message:
+    """
+    命令已开启快速渲染时返回图片消息，否则（或绘制失败时）返回原文本消息。
+    """
+    if fast_render_enabled(command):
+        try:
+            return Message(MessageSegment.image(await render_fast_image(layout, width=width)))
+        except Exception as exc:
+            logger.warning(f"快速渲染失败，改为发送文本: command={command} error={exc}")
+    return Message(fallback_text)
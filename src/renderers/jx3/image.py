@@ -1,19 +1,177 @@
 from __future__ import annotations
 
-from typing import Any
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Sequence
 
+import config as cfg
 from jinja2 import Environment
 from nonebot.adapters.onebot.v11 import Message, MessageSegment
 from nonebot import logger
 
+from src.infra.image_encoding import ImageEncoding, encoding_report, resolve_encoding
+from src.infra.render_cache import make_render_key, render_cache
 from src.infra.screenshot import jietu
+from src.infra.template_env import bind_filters, filters_signature, filters_time_bucket
 
+# 渲染优先级：交互查询 > 定时推送 > 后台预热
+RENDER_PRIORITIES = ("interactive", "scheduled", "prewarm")
+RENDER_BUSY_MESSAGE = "当前查询人数较多，图片生成排队已满，请稍后再试"
+# 模板渲染（生成 HTML）放到线程中执行，避免千人排行等大模板阻塞事件循环
+TEMPLATE_RENDER_IN_THREAD = bool(getattr(cfg, "TEMPLATE_RENDER_IN_THREAD", True))
 
-def apply_filters(env: Environment, filters: dict[str, Any] | None) -> None:
-    if not filters:
-        return
-    for name, fn in filters.items():
-        env.filters[name] = fn
+
+class RenderBusyError(RuntimeError):
+    def __init__(self, priority: str, queued: int) -> None:
+        super().__init__(RENDER_BUSY_MESSAGE)
+        self.priority = priority
+        self.queued = queued
+
+
+def _percentile(samples: Sequence[float], pct: float) -> float | None:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return round(ordered[index], 4)
+
+
+class _LaneMetrics:
+    def __init__(self, sample_size: int) -> None:
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self.queued = 0
+        self.wait_seconds: deque[float] = deque(maxlen=sample_size)
+        self.run_seconds: deque[float] = deque(maxlen=sample_size)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "failed": self.failed,
+            "queued": self.queued,
+            "wait_p50": _percentile(self.wait_seconds, 50),
+            "wait_p95": _percentile(self.wait_seconds, 95),
+            "run_p50": _percentile(self.run_seconds, 50),
+            "run_p95": _percentile(self.run_seconds, 95),
+        }
+
+
+class RenderScheduler:
+    """
+    全局渲染调度：限制同时进行的截图数，排队时按优先级（interactive > scheduled > prewarm）先到先得。
+
+    - 各优先级有独立的排队上限，排满直接抛 RenderBusyError，由调用方快速回复“繁忙”而不是无限堆积
+    - 只调度真正需要 Chromium 的渲染；截图缓存命中不占用名额
+    - 每个优先级记录排队等待与渲染耗时的 p50/p95（最近 sample_size 次），见 stats()
+    """
+
+    def __init__(
+        self,
+        *,
+        max_concurrency: int,
+        queue_limits: dict[str, int],
+        sample_size: int = 200,
+    ) -> None:
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.queue_limits = {lane: int(queue_limits.get(lane, 0)) for lane in RENDER_PRIORITIES}
+        self._running = 0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._metrics = {lane: _LaneMetrics(sample_size) for lane in RENDER_PRIORITIES}
+
+    def _queued(self) -> int:
+        return sum(metrics.queued for metrics in self._metrics.values())
+
+    def _acquire_nowait(self) -> bool:
+        if self._running < self.max_concurrency and not self._queued():
+            self._running += 1
+            return True
+        return False
+
+    def _release(self) -> None:
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                # 名额直接转交给队首等待者，_running 不变
+                future.set_result(None)
+                return
+        self._running -= 1
+
+    async def submit(self, priority: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        if priority not in self._metrics:
+            raise ValueError(f"未知的渲染优先级: {priority}")
+        metrics = self._metrics[priority]
+        metrics.submitted += 1
+        queued_at = time.monotonic()
+
+        if not self._acquire_nowait():
+            if metrics.queued >= self.queue_limits[priority]:
+                metrics.rejected += 1
+                logger.warning(f"渲染队列已满: priority={priority} queued={metrics.queued} running={self._running}")
+                raise RenderBusyError(priority, metrics.queued)
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (RENDER_PRIORITIES.index(priority), next(self._seq), future))
+            metrics.queued += 1
+            try:
+                await future
+            except BaseException:
+                if future.done() and not future.cancelled():
+                    # 已拿到名额后才被取消，需要把名额交还
+                    self._release()
+                else:
+                    future.cancel()
+                raise
+            finally:
+                metrics.queued -= 1
+
+        started_at = time.monotonic()
+        metrics.wait_seconds.append(started_at - queued_at)
+        try:
+            result = await factory()
+        except BaseException:
+            metrics.failed += 1
+            raise
+        else:
+            metrics.completed += 1
+            return result
+        finally:
+            metrics.run_seconds.append(time.monotonic() - started_at)
+            self._release()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "running": self._running,
+            "queued": self._queued(),
+            "max_concurrency": self.max_concurrency,
+            "lanes": {lane: metrics.snapshot() for lane, metrics in self._metrics.items()},
+        }
+
+
+render_scheduler = RenderScheduler(
+    max_concurrency=int(getattr(cfg, "RENDER_SCHEDULER_CONCURRENCY", getattr(cfg, "BROWSER_POOL_MAX_PAGES", 4))),
+    queue_limits=dict(
+        getattr(cfg, "RENDER_QUEUE_LIMITS", {"interactive": 32, "scheduled": 16, "prewarm": 8})
+    ),
+)
+
+
+def _template_mtime(template: Any) -> float | None:
+    filename = getattr(template, "filename", None)
+    if not filename:
+        return None
+    try:
+        return os.path.getmtime(filename)
+    except OSError:
+        return None
 
 
 async def render_template_image(
@@ -23,10 +181,96 @@ async def render_template_image(
     *,
     width: int,
     height: int | str = "ck",
+    cache: bool = True,
+    priority: str = "interactive",
+    filters: dict[str, Callable[..., Any]] | None = None,
+    encoding: ImageEncoding | None = None,
 ) -> bytes:
-    template = env.get_template(template_name)
-    html_content = template.render(**context)
-    return await jietu(html_content, width, height)
+    # 过滤器绑定在派生环境上，不修改共享 env，并发命令之间互不影响
+    template = bind_filters(env, filters).get_template(template_name)
+    output_encoding = resolve_encoding(template_name, encoding)
+
+    async def render() -> bytes:
+        if TEMPLATE_RENDER_IN_THREAD:
+            html_content = await asyncio.to_thread(template.render, **context)
+        else:
+            html_content = template.render(**context)
+        started_at = time.monotonic()
+        image_bytes = await render_scheduler.submit(
+            priority, lambda: jietu(html_content, width, height, encoding=output_encoding)
+        )
+        encoding_report.record(template_name, output_encoding, len(image_bytes), time.monotonic() - started_at)
+        return image_bytes
+
+    if not cache:
+        return await render()
+    key = make_render_key(
+        template_name,
+        _template_mtime(template),
+        context,
+        width,
+        height,
+        variant=f"{filters_signature(filters)}|{filters_time_bucket(filters)}|{output_encoding.signature}",
+    )
+    return await render_cache.get_or_render(key, render)
+
+
+@dataclass(frozen=True)
+class RenderJob:
+    template_name: str
+    context: dict[str, Any]
+    width: int
+    height: int | str = "ck"
+    cache: bool = True
+    priority: str = "interactive"
+    filters: dict[str, Callable[..., Any]] | None = None
+    encoding: ImageEncoding | None = None
+
+
+@dataclass(frozen=True)
+class RenderResult:
+    index: int
+    job: RenderJob
+    image_bytes: bytes | None = None
+    error: BaseException | None = None
+
+
+async def iter_template_images(env: Environment, jobs: Sequence[RenderJob]) -> AsyncIterator[RenderResult]:
+    """
+    批量渲染：所有任务同时提交（并发度由共享浏览器池限制），按 jobs 顺序逐个产出结果；
+    前面的任务一完成就立即产出，不必等全部结束。单个任务失败以 error 形式返回，不影响其余任务。
+    调用方提前退出时取消尚未完成的任务。
+    """
+    tasks = [
+        asyncio.create_task(
+            render_template_image(
+                env,
+                job.template_name,
+                job.context,
+                width=job.width,
+                height=job.height,
+                cache=job.cache,
+                priority=job.priority,
+                filters=job.filters,
+                encoding=job.encoding,
+            )
+        )
+        for job in jobs
+    ]
+    try:
+        for index, (job, task) in enumerate(zip(jobs, tasks)):
+            try:
+                yield RenderResult(index=index, job=job, image_bytes=await task)
+            except Exception as exc:
+                yield RenderResult(index=index, job=job, error=exc)
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+async def render_template_images(env: Environment, jobs: Sequence[RenderJob]) -> list[RenderResult]:
+    return [result async for result in iter_template_images(env, jobs)]
 
 
 async def send_image(
@@ -71,6 +315,8 @@ async def render_and_send_template_image(
     height: int | str = "ck",
     at_user: bool = True,
     prefix: str | None = "   查询结果",
+    filters: dict[str, Callable[..., Any]] | None = None,
+    encoding: ImageEncoding | None = None,
 ) -> None:
     try:
         image_bytes = await render_template_image(
@@ -79,8 +325,12 @@ async def render_and_send_template_image(
             context,
             width=width,
             height=height,
+            filters=filters,
+            encoding=encoding,
         )
         await send_image(bot, event, image_bytes, at_user=at_user, prefix=prefix)
+    except RenderBusyError as exc:
+        await send_text(bot, event, f"   {exc}", at_user=at_user)
     except Exception:
         logger.exception("render_and_send_template_image failed: template={}", template_name)
         raise
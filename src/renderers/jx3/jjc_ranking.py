@@ -1,10 +1,15 @@
 from __future__ import annotations
 
-from typing import Any, Awaitable, Callable
+import asyncio
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Sequence
 
 from jinja2 import Environment
+from nonebot import logger
 from nonebot.adapters.onebot.v11 import Bot, Event, MessageSegment
 
+from src.renderers.jx3.image import RenderBusyError, RenderJob, RenderResult
+
 
 def _prepare_template_data(
     rank_data: dict[str, Any], rank_type: str
@@ -96,14 +101,18 @@ async def send_combined_ranking_image(
     week_info: str,
     show_legendary: bool,
 ) -> None:
-    payload = await render_combined_ranking_image(
-        env=env,
-        render_template_image=render_template_image,
-        current_season=current_season,
-        stats=stats,
-        week_info=week_info,
-        show_legendary=show_legendary,
-    )
+    try:
+        payload = await render_combined_ranking_image(
+            env=env,
+            render_template_image=render_template_image,
+            current_season=current_season,
+            stats=stats,
+            week_info=week_info,
+            show_legendary=show_legendary,
+        )
+    except RenderBusyError as exc:
+        await bot.send(event, f"   {exc}")
+        return
     await bot.send(event, MessageSegment.image(payload["image_bytes"]))
     await bot.send(
         event,
@@ -116,11 +125,12 @@ async def send_split_ranking_images(
     event: Event,
     *,
     env: Environment,
-    render_template_image: Callable[..., Awaitable[bytes]],
+    iter_template_images: Callable[[Environment, Sequence[RenderJob]], AsyncIterator[RenderResult]],
     current_season: Any,
     stats: dict[str, Any],
     week_info: str,
     show_legendary: bool,
+    send_interval: float = 1.0,
 ) -> None:
     has_top_1000 = "top_1000" in stats
     ranking_configs = []
@@ -182,30 +192,38 @@ async def send_split_ranking_images(
         ]
     )
 
+    jobs = [
+        RenderJob(
+            template_name=config["template"],
+            context={
+                "current_season": current_season,
+                "week_info": week_info,
+                config["data_key"]: config["data"],
+                "show_legendary": show_legendary,
+            },
+            width=800,
+        )
+        for config in ranking_configs
+    ]
+
+    # 各张图并发渲染，按顺序逐张发送；发送间隔保持 send_interval，渲染与等待重叠进行
     images_sent = 0
-    for i, config in enumerate(ranking_configs, 1):
+    last_sent_at: float | None = None
+    async for result in iter_template_images(env, jobs):
+        config = ranking_configs[result.index]
+        if last_sent_at is not None:
+            wait = send_interval - (time.monotonic() - last_sent_at)
+            if wait > 0:
+                await asyncio.sleep(wait)
         try:
-            image_bytes = await render_template_image(
-                env,
-                config["template"],
-                {
-                    "current_season": current_season,
-                    "week_info": week_info,
-                    config["data_key"]: config["data"],
-                    "show_legendary": show_legendary,
-                },
-                width=800,
-                height="ck",
-            )
-            await bot.send(event, MessageSegment.image(image_bytes))
+            if result.error is not None:
+                raise result.error
+            await bot.send(event, MessageSegment.image(result.image_bytes))
             images_sent += 1
-            if i < len(ranking_configs):
-                import asyncio
-
-                await asyncio.sleep(1)
         except Exception as exc:
-            print(f"生成{config['name']}图片失败: {exc}")
+            logger.warning(f"生成{config['name']}图片失败: {exc}")
             await bot.send(event, f"生成{config['name']}图片失败: {str(exc)}")
+        last_sent_at = time.monotonic()
 
     processed_key = "top_1000" if has_top_1000 else "top_200"
     total_valid_data = (stats.get(processed_key, {}) or {}).get("total_valid_count", 0) or 0
@@ -5,14 +5,18 @@ import os
 import re
 from collections import Counter
 from dataclasses import dataclass
-from urllib import error, request
 from urllib.parse import quote
 
+import httpx
+
+from src.infra.http_pool import http_pool
+
 
 SKILL_API_URL = "https://node.jx3box.com/monster/skills"
 ICON_URL_TEMPLATE = "https://icon.jx3box.com/icon/{icon_id}.png"
 DEFAULT_OUTPUT_DIR = os.path.join("mpimg", "img", "baizhan", "skills")
 INVALID_FILENAME_RE = re.compile(r'[\\/:*?"<>|\x00-\x1f]')
+REQUEST_HEADERS = {"User-Agent": "jx3bot/skill-icon-sync"}
 
 
 @dataclass(frozen=True)
@@ -75,9 +79,9 @@ def get_skill_icon_url(
 def ensure_baizhan_skill_icons(output_dir: str = DEFAULT_OUTPUT_DIR) -> SkillIconSyncResult:
     os.makedirs(output_dir, exist_ok=True)
 
-    req = request.Request(SKILL_API_URL, headers={"User-Agent": "jx3bot/skill-icon-sync"})
-    with request.urlopen(req, timeout=20) as resp:
-        payload = json.loads(resp.read().decode("utf-8"))
+    resp = http_pool.request("GET", SKILL_API_URL, headers=REQUEST_HEADERS, timeout=20, follow_redirects=True)
+    resp.raise_for_status()
+    payload = json.loads(resp.content.decode("utf-8"))
 
     skills = (payload.get("data") or {}).get("list") or []
     name_counter: Counter[str] = Counter()
@@ -104,17 +108,17 @@ def ensure_baizhan_skill_icons(output_dir: str = DEFAULT_OUTPUT_DIR) -> SkillIco
             continue
 
         icon_url = ICON_URL_TEMPLATE.format(icon_id=int(icon_id))
-        icon_req = request.Request(icon_url, headers={"User-Agent": "jx3bot/skill-icon-sync"})
         try:
-            with request.urlopen(icon_req, timeout=15) as resp:
-                data = resp.read()
+            resp = http_pool.request("GET", icon_url, headers=REQUEST_HEADERS, timeout=15, follow_redirects=True)
+            resp.raise_for_status()
+            data = resp.content
             if not data.startswith(b"\x89PNG"):
                 failed += 1
                 continue
             with open(file_path, "wb") as f:
                 f.write(data)
             downloaded += 1
-        except (error.URLError, TimeoutError, ValueError, OSError):
+        except (httpx.HTTPError, TimeoutError, ValueError, OSError):
             failed += 1
 
     return SkillIconSyncResult(
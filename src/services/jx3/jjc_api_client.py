@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+import asyncio
 import json
 from dataclasses import dataclass
-from typing import Any, Callable
+from typing import Any, Awaitable, Callable, Optional
 
 from nonebot import logger
 
@@ -12,6 +13,25 @@ class JjcApiClient:
     arena_time_tag_url: str
     arena_ranking_url: str
     tuilan_request: Callable[[str, dict[str, Any]], Any]
+    async_tuilan_request: Optional[Callable[[str, dict[str, Any]], Awaitable[Any]]] = None
+
+    async def _arequest(self, url: str, params: dict[str, Any]) -> Any:
+        if self.async_tuilan_request is None:
+            return await asyncio.to_thread(self.tuilan_request, url, params)
+        return await self.async_tuilan_request(url, params)
+
+    @staticmethod
+    def _check_result(result: Any, label: str) -> dict[str, Any]:
+        if result is None:
+            logger.warning(f"{label}请求失败: 返回None")
+            return {"error": "请求返回None"}
+
+        if "error" in result:
+            logger.warning(f"{label}请求失败: {result['error']}")
+            return result
+
+        logger.info(f"{label}请求成功")
+        return result
 
     def get_arena_time_tag(self, type_param: str = "role") -> dict[str, Any]:
         url = self.arena_time_tag_url
@@ -20,21 +40,20 @@ class JjcApiClient:
         logger.info(f"竞技场时间标签请求: url={url} params={json.dumps(params, ensure_ascii=False)}")
 
         try:
-            result = self.tuilan_request(url, params)
+            return self._check_result(self.tuilan_request(url, params), "竞技场时间标签")
+        except Exception as exc:
+            logger.exception(f"竞技场时间标签请求异常: {exc}")
+            return {"error": f"请求异常: {exc}"}
 
-            if result is None:
-                logger.warning("竞技场时间标签请求失败: 返回None")
-                return {"error": "请求返回None"}
+    async def aget_arena_time_tag(self, type_param: str = "role") -> dict[str, Any]:
+        url = self.arena_time_tag_url
+        params = {"type": type_param}
 
-            if "error" in result:
-                logger.warning(f"竞技场时间标签请求失败: {result['error']}")
-                return result
+        logger.info(f"竞技场时间标签请求: url={url} params={json.dumps(params, ensure_ascii=False)}")
 
-            logger.info("竞技场时间标签请求成功")
-            return result
+        try:
+            return self._check_result(await self._arequest(url, params), "竞技场时间标签")
         except Exception as exc:
-            import traceback
-
             logger.exception(f"竞技场时间标签请求异常: {exc}")
             return {"error": f"请求异常: {exc}"}
 
@@ -45,20 +64,19 @@ class JjcApiClient:
         logger.info(f"竞技场排行榜请求: url={url} params={json.dumps(params, ensure_ascii=False)}")
 
         try:
-            result = self.tuilan_request(url, params)
+            return self._check_result(self.tuilan_request(url, params), "竞技场排行榜")
+        except Exception as exc:
+            logger.exception(f"竞技场排行榜请求异常: {exc}")
+            return {"error": f"请求异常: {exc}"}
 
-            if result is None:
-                logger.warning("竞技场排行榜请求失败: 返回None")
-                return {"error": "请求返回None"}
+    async def aget_arena_ranking(self, tag: int) -> dict[str, Any]:
+        url = self.arena_ranking_url
+        params = {"typeName": "week", "heiMaBang": False, "tag": tag}
 
-            if "error" in result:
-                logger.warning(f"竞技场排行榜请求失败: {result['error']}")
-                return result
+        logger.info(f"竞技场排行榜请求: url={url} params={json.dumps(params, ensure_ascii=False)}")
 
-            logger.info("竞技场排行榜请求成功")
-            return result
+        try:
+            return self._check_result(await self._arequest(url, params), "竞技场排行榜")
         except Exception as exc:
-            import traceback
-
             logger.exception(f"竞技场排行榜请求异常: {exc}")
             return {"error": f"请求异常: {exc}"}
@@ -5,7 +5,10 @@ import os
 import time
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any
+from collections import Counter
+from typing import Any, Iterable
+
+from src.storage.kungfu_cache_store import KungfuCacheStore, get_kungfu_cache_store
 
 try:
     from nonebot import logger  # type: ignore
@@ -20,6 +23,9 @@ class JjcCacheRepo:
     jjc_ranking_cache_file: str
     jjc_ranking_cache_duration: int
     kungfu_cache_duration: int
+    kungfu_cache_db: str = "data/cache/kungfu_cache.sqlite3"
+    # 旧版按角色拆分的 JSON 目录，仅用于首次打开数据库时的一次性迁移
+    legacy_kungfu_cache_dir: str = "data/cache/kungfu"
 
     def load_ranking_cache(self) -> dict[str, Any] | None:
         if not os.path.exists(self.jjc_ranking_cache_file):
@@ -39,56 +45,75 @@ class JjcCacheRepo:
         logger.info("竞技场排行榜文件缓存已过期")
         return None
 
+    def load_ranking_cache_entry(self) -> dict[str, Any] | None:
+        """
+        读取文件缓存原始条目（不做过期判断），供内存缓存层在启动时预热或过期后兜底。
+        """
+        if not os.path.exists(self.jjc_ranking_cache_file):
+            return None
+        try:
+            with open(self.jjc_ranking_cache_file, "r", encoding="utf-8") as file_handle:
+                cached_data = json.load(file_handle)
+        except Exception as exc:
+            logger.warning(f"读取竞技场排行榜缓存失败: file={self.jjc_ranking_cache_file} error={exc}")
+            return None
+        if not isinstance(cached_data, dict) or not isinstance(cached_data.get("data"), dict):
+            return None
+        return cached_data
+
     def save_ranking_cache(self, ranking_result: dict[str, Any]) -> None:
         cache_dir = os.path.dirname(self.jjc_ranking_cache_file)
         os.makedirs(cache_dir, exist_ok=True)
+        tmp_file = f"{self.jjc_ranking_cache_file}.tmp"
         try:
-            with open(self.jjc_ranking_cache_file, "w", encoding="utf-8") as file_handle:
+            with open(tmp_file, "w", encoding="utf-8") as file_handle:
                 json.dump(
                     {
                         "cache_time": ranking_result.get("cache_time", time.time()),
+                        "defaultWeek": ranking_result.get("defaultWeek"),
                         "data": ranking_result,
                     },
                     file_handle,
                     ensure_ascii=False,
                     indent=2,
                 )
+            os.replace(tmp_file, self.jjc_ranking_cache_file)
             logger.info(f"竞技场排行榜数据已保存到文件缓存: {self.jjc_ranking_cache_file}")
         except Exception as exc:
             logger.warning(f"保存竞技场排行榜缓存失败: file={self.jjc_ranking_cache_file} error={exc}")
 
+    def _kungfu_store(self) -> KungfuCacheStore:
+        return get_kungfu_cache_store(self.kungfu_cache_db, legacy_dir=self.legacy_kungfu_cache_dir)
+
     def kungfu_cache_path(self, server: str, name: str) -> str:
-        cache_dir = "data/cache/kungfu"
-        os.makedirs(cache_dir, exist_ok=True)
-        return os.path.join(cache_dir, f"{server}_{name}.json")
+        return os.path.join(self.legacy_kungfu_cache_dir, f"{server}_{name}.json")
 
     def load_kungfu_cache_raw(self, server: str, name: str) -> dict[str, Any] | None:
-        cache_file = self.kungfu_cache_path(server, name)
-        if not os.path.exists(cache_file):
-            return None
         try:
-            with open(cache_file, "r", encoding="utf-8") as file_handle:
-                return json.load(file_handle)
+            return self._kungfu_store().get(server, name)
         except Exception as exc:
-            logger.warning(f"读取心法缓存失败(原始): file={cache_file} error={exc}")
+            logger.warning(f"读取心法缓存失败(原始): server={server} name={name} error={exc}")
             return None
 
-    def load_kungfu_cache(self, server: str, name: str) -> dict[str, Any] | None:
-        cache_file = self.kungfu_cache_path(server, name)
-        if not os.path.exists(cache_file):
-            logger.info(f"心法缓存未命中: server={server} name={name} reason=cache_file_missing")
-            return None
+    def load_kungfu_cache_raw_many(self, keys: Iterable[tuple[str, str]]) -> dict[tuple[str, str], dict[str, Any]]:
         try:
-            with open(cache_file, "r", encoding="utf-8") as file_handle:
-                cached_data = json.load(file_handle)
+            return self._kungfu_store().get_many(keys)
         except Exception as exc:
-            logger.warning(f"读取心法缓存失败: file={cache_file} error={exc}")
-            return None
+            logger.warning(f"批量读取心法缓存失败: error={exc}")
+            return {}
+
+    def kungfu_cache_miss_reasons(self, cached_data: dict[str, Any] | None, now: float | None = None) -> list[str]:
+        """
+        心法缓存新鲜度判定，返回不命中原因；空列表表示命中。
+        规则：kungfu 非空、cache_time 在有效期内、weapon_checked/teammates_checked 均为真、
+        teammates 非空且每个队友都带 kungfu_id。
+        """
+        if not cached_data:
+            return ["cache_missing"]
+        if cached_data.get("kungfu") in [None, ""]:
+            return ["kungfu_empty"]
 
         cache_time = cached_data.get("cache_time", 0)
-        kungfu_value = cached_data.get("kungfu")
-        weapon_checked = cached_data.get("weapon_checked", False)
-        teammates_checked = cached_data.get("teammates_checked", False)
         teammates = cached_data.get("teammates")
         teammates_ok = (
             isinstance(teammates, list)
@@ -96,47 +121,76 @@ class JjcCacheRepo:
             and all(isinstance(item, dict) and item.get("kungfu_id") not in (None, "") for item in teammates)
         )
 
-        if kungfu_value not in [None, ""]:
-            current_time = time.time()
-            cache_age = current_time - cache_time if cache_time else None
-            cache_fresh = (
-                cache_time
-                and cache_age is not None
-                and cache_age < self.kungfu_cache_duration
-                and weapon_checked
-                and teammates_checked
-                and teammates_ok
-            )
-            if cache_fresh:
-                logger.info(f"使用心法缓存: server={server} name={name} cache_time={cache_time}")
-                return cached_data
-
-            reasons = []
-            if not cache_time:
-                reasons.append("missing_cache_time")
-            elif cache_age is not None and cache_age >= self.kungfu_cache_duration:
-                reasons.append("cache_time_expired")
-            if not weapon_checked:
-                reasons.append("weapon_not_checked")
-            if not teammates_checked:
-                reasons.append("teammates_not_checked")
-            if not teammates_ok:
-                reasons.append("teammates_kungfu_id_missing")
-            cache_dt = datetime.fromtimestamp(cache_time).strftime("%Y-%m-%d %H:%M:%S") if cache_time else "未知"
-            reason_text = ",".join(reasons) if reasons else "unknown"
-            logger.info(
-                f"心法缓存不命中: server={server} name={name} cache_time={cache_dt} reason={reason_text}"
-            )
-        else:
-            logger.info(f"心法缓存不命中: server={server} name={name} reason=kungfu_empty")
+        reasons = []
+        if not cache_time:
+            reasons.append("missing_cache_time")
+        elif (now if now is not None else time.time()) - cache_time >= self.kungfu_cache_duration:
+            reasons.append("cache_time_expired")
+        if not cached_data.get("weapon_checked", False):
+            reasons.append("weapon_not_checked")
+        if not cached_data.get("teammates_checked", False):
+            reasons.append("teammates_not_checked")
+        if not teammates_ok:
+            reasons.append("teammates_kungfu_id_missing")
+        return reasons
+
+    def partition_kungfu_cache(
+        self, keys: Iterable[tuple[str, str]]
+    ) -> tuple[dict[tuple[str, str], dict[str, Any]], list[tuple[str, str]]]:
+        """
+        一次批量读取并按 load_kungfu_cache 的规则划分命中/未命中，未命中保持传入顺序。
+        """
+        ordered_keys = list(dict.fromkeys((str(server), str(name)) for server, name in keys))
+        raw = self.load_kungfu_cache_raw_many(ordered_keys)
+        now = time.time()
+        hits: dict[tuple[str, str], dict[str, Any]] = {}
+        misses: list[tuple[str, str]] = []
+        reason_counts: Counter[str] = Counter()
+        for key in ordered_keys:
+            cached_data = raw.get(key)
+            reasons = self.kungfu_cache_miss_reasons(cached_data, now=now)
+            if reasons:
+                misses.append(key)
+                reason_counts.update(reasons)
+            else:
+                hits[key] = cached_data
+        logger.info(
+            f"心法缓存批量判定: total={len(ordered_keys)} hits={len(hits)} misses={len(misses)} "
+            f"reasons={dict(reason_counts)}"
+        )
+        return hits, misses
 
+    def load_kungfu_cache(self, server: str, name: str) -> dict[str, Any] | None:
+        cached_data = self.load_kungfu_cache_raw(server, name)
+        if cached_data is None:
+            logger.info(f"心法缓存未命中: server={server} name={name} reason=cache_missing")
+            return None
+
+        reasons = self.kungfu_cache_miss_reasons(cached_data)
+        cache_time = cached_data.get("cache_time", 0)
+        if not reasons:
+            logger.info(f"使用心法缓存: server={server} name={name} cache_time={cache_time}")
+            return cached_data
+
+        if reasons == ["kungfu_empty"]:
+            logger.info(f"心法缓存不命中: server={server} name={name} reason=kungfu_empty")
+            return None
+        cache_dt = datetime.fromtimestamp(cache_time).strftime("%Y-%m-%d %H:%M:%S") if cache_time else "未知"
+        logger.info(
+            f"心法缓存不命中: server={server} name={name} cache_time={cache_dt} reason={','.join(reasons)}"
+        )
         return None
 
     def save_kungfu_cache(self, server: str, name: str, result: dict[str, Any]) -> None:
-        cache_file = self.kungfu_cache_path(server, name)
         try:
-            with open(cache_file, "w", encoding="utf-8") as file_handle:
-                json.dump(result, file_handle, ensure_ascii=False, indent=2)
-            logger.info(f"心法信息已更新缓存到: {cache_file}")
+            self._kungfu_store().put(server, name, result)
+            logger.info(f"心法信息已更新缓存: server={server} name={name}")
+        except Exception as exc:
+            logger.warning(f"保存心法缓存失败: server={server} name={name} error={exc}")
+
+    def save_kungfu_cache_many(self, items: Iterable[tuple[str, str, dict[str, Any]]]) -> int:
+        try:
+            return self._kungfu_store().put_many(items)
         except Exception as exc:
-            logger.warning(f"保存心法缓存失败: file={cache_file} error={exc}")
+            logger.warning(f"批量保存心法缓存失败: error={exc}")
+            return 0
@@ -3,18 +3,27 @@ from __future__ import annotations
 import asyncio
 import json
 import os
-import random
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Any, Awaitable, Callable
+from typing import Any, Awaitable, Callable, Optional
 from urllib.parse import quote
 
 from nonebot import logger
 
-from src.services.jx3.kungfu import get_kungfu_detail_by_role_info
+from src.infra.rate_limiter import TokenBucket
+from src.infra.single_flight import SingleFlight, make_flight_key
+from src.services.jx3.kungfu import aget_kungfu_detail_by_role_info, get_kungfu_detail_by_role_info
 from src.services.jx3.jjc_api_client import JjcApiClient
 from src.services.jx3.jjc_cache_repo import JjcCacheRepo
+from src.services.jx3.ranking_index import RankingIndex
+from src.services.jx3.ranking_snapshot import RankingSnapshot, load_latest_ranking_snapshot
+from src.services.jx3.kungfu_stats import aggregate_kungfu_by_ranges
+from src.services.jx3.kungfu_pipeline import (
+    KungfuResolveJob,
+    ProgressCallback,
+    resolve_kungfu_concurrently,
+)
 
 
 @dataclass(frozen=True)
@@ -35,12 +44,66 @@ class JjcRankingService:
     kungfu_pinyin_to_chinese: dict[str, str]
     tuilan_request: Callable[[str, dict[str, Any]], Any]
     defget_get: Callable[..., Awaitable[dict[str, Any]]]
+    kungfu_resolve_concurrency: int = 4
+    async_tuilan_request: Optional[Callable[[str, dict[str, Any]], Awaitable[Any]]] = None
+    # 心法查询失败时回退到 jx3api 竞技查询（defget_get）的限速；不经过推栏令牌桶，None 表示不限速
+    jx3api_rate_limiter: Optional[TokenBucket] = field(default=None, repr=False, compare=False)
+    # 心法分布统计的排名范围（top_N），单次遍历累计，增加范围几乎不增加成本
+    kungfu_stat_cutoffs: tuple[int, ...] = (1000, 200, 100, 50)
+    jjc_ranking_stats_dir: str = os.path.join("data", "jjc_ranking_stats")
+    # 增量统计：上次统计快照中解析时间不超过该时长（秒）的角色直接沿用结果，0 表示关闭增量
+    jjc_ranking_incremental_max_age: int = 0
+    # 排行榜缓存过期后仍可先返回旧数据、后台刷新的时长（秒）；跨自然周的数据不会被当作旧数据复用
+    jjc_ranking_stale_duration: int = 0
+    ranking_single_flight: SingleFlight = field(
+        default_factory=lambda: SingleFlight("query_jjc_ranking"), repr=False, compare=False
+    )
+    # 内存热缓存：defaultWeek -> 排行榜结果；进程内共享，返回值只读
+    _ranking_hot: dict[int, dict[str, Any]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _background_tasks: set[asyncio.Task] = field(default_factory=set, init=False, repr=False, compare=False)
+    # id(排行榜结果) -> (排行榜结果, 索引)；持有原对象引用，避免 id 被复用
+    _ranking_indexes: dict[int, tuple[dict[str, Any], RankingIndex]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
 
     def _api(self) -> JjcApiClient:
         return JjcApiClient(
             arena_time_tag_url=self.arena_time_tag_url,
             arena_ranking_url=self.arena_ranking_url,
             tuilan_request=self.tuilan_request,
+            async_tuilan_request=self.async_tuilan_request,
+        )
+
+    async def _get_kungfu_detail(
+        self,
+        game_role_id: str,
+        zone: str,
+        server: str,
+        *,
+        role_name: str,
+        rank: int | None,
+    ) -> dict[str, Any] | None:
+        if self.async_tuilan_request is None:
+            return await asyncio.to_thread(
+                get_kungfu_detail_by_role_info,
+                game_role_id,
+                zone,
+                server,
+                tuilan_request=self.tuilan_request,
+                kungfu_pinyin_to_chinese=self.kungfu_pinyin_to_chinese,
+                match_detail_url=self.match_detail_url,
+                role_name=role_name,
+                rank=rank,
+            )
+        return await aget_kungfu_detail_by_role_info(
+            game_role_id,
+            zone,
+            server,
+            tuilan_request=self.async_tuilan_request,
+            kungfu_pinyin_to_chinese=self.kungfu_pinyin_to_chinese,
+            match_detail_url=self.match_detail_url,
+            role_name=role_name,
+            rank=rank,
         )
 
     def _cache(self) -> JjcCacheRepo:
@@ -70,6 +133,23 @@ class JjcRankingService:
         if cached_teammates_checked and not result.get("teammates_checked"):
             result["teammates_checked"] = cached_teammates_checked
 
+    def _store_kungfu_result(
+        self, server: str, name: str, result: dict[str, Any], *, merge_cached: bool = False
+    ) -> dict[str, Any]:
+        """
+        合并旧缓存里的武器 / 队友信息后写回心法缓存；SQLite 读写是同步的，调用方经 asyncio.to_thread 放到线程里执行。
+        merge_cached=True 时以旧缓存为底、本次结果覆盖其上。
+        """
+        self._merge_cached_weapon(server, name, result)
+        cache = self._cache()
+        if merge_cached:
+            cached = cache.load_kungfu_cache(server, name)
+            if cached:
+                cached.update(result)
+                result = cached
+        cache.save_kungfu_cache(server, name, result)
+        return result
+
     @staticmethod
     def _coerce_score(value: Any) -> int | None:
         if value is None:
@@ -112,12 +192,106 @@ class JjcRankingService:
                 return score
         return None
 
-    async def query_jjc_ranking(self) -> dict[str, Any]:
+    @staticmethod
+    def _same_iso_week(left: float, right: float) -> bool:
+        return datetime.fromtimestamp(left).isocalendar()[:2] == datetime.fromtimestamp(right).isocalendar()[:2]
+
+    def _latest_cached_ranking(self) -> dict[str, Any] | None:
+        """
+        缓存层级：内存热缓存 -> 文件缓存（仅在内存为空时读一次并回填内存）。
+        """
+        if self._ranking_hot:
+            return self._ranking_hot[max(self._ranking_hot)]
+
+        entry = self._cache().load_ranking_cache_entry()
+        if not entry:
+            return None
+        ranking_result = entry["data"]
+        if ranking_result.get("code") != 0 or not ranking_result.get("defaultWeek"):
+            return None
+        ranking_result.setdefault("cache_time", entry.get("cache_time", 0))
+        self._ranking_hot[int(ranking_result["defaultWeek"])] = ranking_result
+        logger.info(
+            f"竞技场排行榜内存缓存已从文件预热: defaultWeek={ranking_result['defaultWeek']} "
+            f"cache_time={ranking_result.get('cache_time')}"
+        )
+        return ranking_result
+
+    async def _refresh_ranking(self) -> dict[str, Any]:
+        ranking_result = await self._query_jjc_ranking_upstream()
+        if not ranking_result.get("error") and ranking_result.get("code") == 0:
+            self._ranking_hot[int(ranking_result["defaultWeek"])] = ranking_result
+            for week in sorted(self._ranking_hot)[:-2]:
+                self._ranking_hot.pop(week, None)
+            await asyncio.to_thread(self._cache().save_ranking_cache, ranking_result)
+        return ranking_result
+
+    def _refresh_ranking_shared(self) -> Awaitable[dict[str, Any]]:
+        key = make_flight_key(self.arena_ranking_url, {"time_tag_url": self.arena_time_tag_url})
+        return self.ranking_single_flight.do(key, self._refresh_ranking)
+
+    def _schedule_ranking_refresh(self) -> None:
+        if self.ranking_single_flight.stats()["inflight"]:
+            return
+        task = asyncio.get_running_loop().create_task(self._refresh_ranking_shared())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    def ranking_index(self, ranking_result: dict[str, Any]) -> RankingIndex:
+        """
+        返回排行榜结果对应的角色索引；同一份结果（缓存层共享的对象）只构建一次。
+        """
+        cached = self._ranking_indexes.get(id(ranking_result))
+        if cached is not None and cached[0] is ranking_result:
+            return cached[1]
+        index = RankingIndex.build(ranking_result)
+        self._ranking_indexes[id(ranking_result)] = (ranking_result, index)
+        while len(self._ranking_indexes) > 4:
+            self._ranking_indexes.pop(next(iter(self._ranking_indexes)))
+        return index
+
+    async def query_jjc_ranking(self, *, allow_stale: bool = True) -> dict[str, Any]:
+        """
+        查询本周竞技场排行榜（按 defaultWeek 缓存）：
+        - 缓存未过期：直接返回内存/文件缓存
+        - 过期但仍在 stale 窗口内且未跨周：先返回旧数据，后台刷新
+        - 其余情况请求上游；多个群/定时推送同时触发时合并为一次请求
+        allow_stale=False（如每日定时推送）时不返回过期缓存：同步等待刷新，刷新失败也不回退到旧数据。
+        返回结果在调用方之间共享，应视为只读。
+        """
+        now = time.time()
+        cached = self._latest_cached_ranking()
+        same_week = False
+        if cached is not None:
+            cache_time = float(cached.get("cache_time") or 0)
+            age = now - cache_time
+            same_week = self._same_iso_week(cache_time, now)
+            if age < self.jjc_ranking_cache_duration and same_week:
+                self.ranking_single_flight.record_cache_hit()
+                logger.debug(f"竞技场排行榜缓存命中: defaultWeek={cached.get('defaultWeek')} age={age:.0f}s")
+                return cached
+            if allow_stale and age < self.jjc_ranking_cache_duration + self.jjc_ranking_stale_duration and same_week:
+                self.ranking_single_flight.record_cache_hit()
+                logger.info(f"竞技场排行榜缓存已过期，先返回旧数据并后台刷新: age={age:.0f}s")
+                self._schedule_ranking_refresh()
+                return cached
+
+        ranking_result = await self._refresh_ranking_shared()
+        failed = ranking_result.get("error") or ranking_result.get("code") != 0
+        if failed and allow_stale and cached is not None and same_week:
+            logger.warning(
+                f"竞技场排行榜刷新失败，回退到本周旧缓存: defaultWeek={cached.get('defaultWeek')} "
+                f"error={ranking_result.get('message') or ranking_result.get('msg')}"
+            )
+            return cached
+        return ranking_result
+
+    async def _query_jjc_ranking_upstream(self) -> dict[str, Any]:
         logger.info("开始查询竞技场排行榜数据")
 
         try:
             logger.info("获取竞技场时间标签")
-            time_tag_result = await asyncio.to_thread(self._api().get_arena_time_tag)
+            time_tag_result = await self._api().aget_arena_time_tag()
 
             if time_tag_result.get("error"):
                 logger.warning(f"获取竞技场时间标签失败: {time_tag_result}")
@@ -147,7 +321,7 @@ class JjcRankingService:
 
             logger.info(f"获取竞技场时间标签成功: defaultWeek={default_week} tag={tag}")
             logger.info("获取竞技场排行榜")
-            ranking_result = await asyncio.to_thread(self._api().get_arena_ranking, tag)
+            ranking_result = await self._api().aget_arena_ranking(tag)
 
             if ranking_result.get("error"):
                 return {"error": True, "message": f"获取竞技场排行榜失败: {ranking_result.get('error')}"}
@@ -166,54 +340,46 @@ class JjcRankingService:
             logger.exception(f"查询竞技场排行榜失败: {exc}")
             return {"error": True, "message": f"查询竞技场排行榜失败: {exc}"}
 
-    async def update_kungfu_cache(self, server: str, name: str, jjc_data: dict[str, Any]) -> None:
+    async def update_kungfu_cache(
+        self,
+        server: str,
+        name: str,
+        jjc_data: dict[str, Any],
+        ranking_index: Optional[RankingIndex] = None,
+    ) -> None:
         logger.info(f"优先使用心法查询接口更新心法信息: server={server} name={name}")
 
         kungfu_info = None
         kungfu_detail: dict[str, Any] | None = None
         try:
-            ranking_result = await self.query_jjc_ranking()
-            if ranking_result and not ranking_result.get("error") and ranking_result.get("code") == 0:
-                ranking_data = ranking_result.get("data", [])
-                for player in ranking_data:
-                    person_info = player.get("personInfo", {})
-                    player_server = person_info.get("server")
-                    player_name = person_info.get("roleName")
-
-                    if player_name and "·" in player_name:
-                        player_name = player_name.split("·")[0]
-
-                    if player_server == server and player_name == name:
-                        game_role_id = person_info.get("gameRoleId")
-                        zone = person_info.get("zone")
-
-                        if game_role_id and zone:
-                            logger.info(
-                                f"在排行榜中找到角色: server={server} name={name} role_id={game_role_id} zone={zone}"
-                            )
-                            kungfu_detail = await asyncio.to_thread(
-                                get_kungfu_detail_by_role_info,
-                                game_role_id,
-                                zone,
-                                server,
-                                tuilan_request=self.tuilan_request,
-                                kungfu_pinyin_to_chinese=self.kungfu_pinyin_to_chinese,
-                                match_detail_url=self.match_detail_url,
-                                role_name=name,
-                                rank=None,
-                            )
-                            kungfu_name = (kungfu_detail or {}).get("kungfu")
-                            if kungfu_name:
-                                logger.info(f"心法查询成功: server={server} name={name} kungfu={kungfu_name}")
-                                kungfu_info = kungfu_name
-                                break
-                            logger.info("心法查询失败: 未找到心法信息")
-                            break
+            if ranking_index is None:
+                ranking_result = await self.query_jjc_ranking()
+                if ranking_result and not ranking_result.get("error") and ranking_result.get("code") == 0:
+                    ranking_index = self.ranking_index(ranking_result)
+                else:
+                    logger.warning("获取排行榜数据失败，无法进行心法查询")
+            if ranking_index is not None:
+                entry = ranking_index.find(server, name)
+                if entry is not None and entry.game_role_id and entry.zone:
+                    logger.info(
+                        f"在排行榜中找到角色: server={server} name={name} role_id={entry.game_role_id} zone={entry.zone}"
+                    )
+                    kungfu_detail = await self._get_kungfu_detail(
+                        entry.game_role_id,
+                        entry.zone,
+                        server,
+                        role_name=name,
+                        rank=None,
+                    )
+                    kungfu_name = (kungfu_detail or {}).get("kungfu")
+                    if kungfu_name:
+                        logger.info(f"心法查询成功: server={server} name={name} kungfu={kungfu_name}")
+                        kungfu_info = kungfu_name
+                    else:
+                        logger.info("心法查询失败: 未找到心法信息")
 
                 if not kungfu_info:
                     logger.info(f"在排行榜中未找到匹配的角色: server={server} name={name}")
-            else:
-                logger.warning("获取排行榜数据失败，无法进行心法查询")
         except Exception as exc:
             logger.warning(f"心法查询过程中出错: {exc}")
 
@@ -236,9 +402,7 @@ class JjcRankingService:
         if kungfu_detail:
             result.update(kungfu_detail)
         result.setdefault("weapon_checked", True)
-        self._merge_cached_weapon(server, name, result)
-
-        self._cache().save_kungfu_cache(server, name, result)
+        await asyncio.to_thread(self._store_kungfu_result, server, name, result)
 
     def save_ranking_stats(
         self,
@@ -247,7 +411,7 @@ class JjcRankingService:
         week_info: str,
         payload: dict[str, Any] | None = None,
     ) -> None:
-        stats_dir = os.path.join("data", "jjc_ranking_stats")
+        stats_dir = self.jjc_ranking_stats_dir
         ranking_timestamp = int(ranking_result.get("cache_time") or time.time())
         stats_entry_dir = os.path.join(stats_dir, str(ranking_timestamp))
         summary_path = os.path.join(stats_entry_dir, "summary.json")
@@ -349,81 +513,79 @@ class JjcRankingService:
         name: str,
         ranking_data: dict[str, Any] | None = None,
         rank: int | None = None,
+        ranking_index: Optional[RankingIndex] = None,
     ) -> dict[str, Any]:
-        cached = self._cache().load_kungfu_cache(server, name)
+        cached = await asyncio.to_thread(self._cache().load_kungfu_cache, server, name)
         if cached:
             return cached
+        return await self._fetch_user_kungfu(
+            server, name, ranking_data=ranking_data, rank=rank, ranking_index=ranking_index
+        )
 
-        delay = random.uniform(3, 5)
-        logger.info(f"等待 {delay:.2f} 秒后发起请求")
-        await asyncio.sleep(delay)
-
+    async def _fetch_user_kungfu(
+        self,
+        server: str,
+        name: str,
+        *,
+        ranking_data: dict[str, Any] | None = None,
+        rank: int | None = None,
+        ranking_index: Optional[RankingIndex] = None,
+    ) -> dict[str, Any]:
+        # 推栏请求节流由 tuilan_request 的全局令牌桶负责，这里不再逐人随机等待
         logger.info(f"优先使用心法查询接口查询心法信息: server={server} name={name}")
 
         try:
-            ranking_result = ranking_data
-            if not ranking_result:
-                ranking_result = await self.query_jjc_ranking()
-            if ranking_result and not ranking_result.get("error") and ranking_result.get("code") == 0:
-                ranking_list = ranking_result.get("data", [])
-
-                for player in ranking_list:
-                    person_info = player.get("personInfo", {})
-                    player_server = person_info.get("server")
-                    player_name = person_info.get("roleName")
-
-                    if player_name and "·" in player_name:
-                        player_name = player_name.split("·")[0]
-
-                    if player_server == server and player_name == name:
-                        game_role_id = person_info.get("gameRoleId")
-                        zone = person_info.get("zone")
-
-                        if game_role_id and zone:
-                            logger.info(
-                                f"在排行榜中找到角色: server={server} name={name} role_id={game_role_id} zone={zone}"
-                            )
-
-                            kungfu_detail = await asyncio.to_thread(
-                                get_kungfu_detail_by_role_info,
-                                game_role_id,
-                                zone,
-                                server,
-                                tuilan_request=self.tuilan_request,
-                                kungfu_pinyin_to_chinese=self.kungfu_pinyin_to_chinese,
-                                match_detail_url=self.match_detail_url,
-                                role_name=name,
-                                rank=rank,
-                            )
-                            kungfu_name = (kungfu_detail or {}).get("kungfu")
-
-                            if kungfu_name:
-                                logger.info(f"心法查询成功: server={server} name={name} kungfu={kungfu_name}")
-
-                            result = {
-                                "server": server,
-                                "name": name,
-                                "cache_time": time.time(),
-                                **(kungfu_detail or {}),
-                            }
-                            result["found"] = result.get("kungfu") is not None
-                            self._merge_cached_weapon(server, name, result)
-
-                            self._cache().save_kungfu_cache(server, name, result)
-                            if result["found"]:
-                                return result
-
-                            logger.info("心法查询失败: 未找到心法信息")
-                            break
+            if ranking_index is None:
+                ranking_result = ranking_data
+                if not ranking_result:
+                    ranking_result = await self.query_jjc_ranking()
+                if ranking_result and not ranking_result.get("error") and ranking_result.get("code") == 0:
+                    ranking_index = self.ranking_index(ranking_result)
+                else:
+                    logger.warning("获取排行榜数据失败，无法进行心法查询")
+
+            if ranking_index is not None:
+                entry = ranking_index.find(server, name)
+                if entry is not None and entry.game_role_id and entry.zone:
+                    logger.info(
+                        f"在排行榜中找到角色: server={server} name={name} role_id={entry.game_role_id} zone={entry.zone}"
+                    )
+
+                    kungfu_detail = await self._get_kungfu_detail(
+                        entry.game_role_id,
+                        entry.zone,
+                        server,
+                        role_name=name,
+                        rank=rank,
+                    )
+                    kungfu_name = (kungfu_detail or {}).get("kungfu")
+
+                    if kungfu_name:
+                        logger.info(f"心法查询成功: server={server} name={name} kungfu={kungfu_name}")
+
+                    result = {
+                        "server": server,
+                        "name": name,
+                        "cache_time": time.time(),
+                        **(kungfu_detail or {}),
+                    }
+                    result["found"] = result.get("kungfu") is not None
+                    await asyncio.to_thread(self._store_kungfu_result, server, name, result)
+                    if result["found"]:
+                        return result
+
+                    logger.info("心法查询失败: 未找到心法信息")
 
                 logger.info(f"在排行榜中未找到匹配的角色: server={server} name={name}")
-            else:
-                logger.warning("获取排行榜数据失败，无法进行心法查询")
         except Exception as exc:
             logger.warning(f"心法查询过程中出错: {exc}")
 
         logger.info("心法查询失败，使用竞技场数据查询作为备选方案")
         logger.info(f"正在查询竞技场数据: server={server} name={name}")
+        if self.jx3api_rate_limiter is not None:
+            waited = await self.jx3api_rate_limiter.acquire()
+            if waited > 0:
+                logger.debug(f"jx3api 竞技查询限速等待 {waited:.2f} 秒: server={server} name={name}")
         jjc_data = await self.defget_get(
             url=self.jjc_query_url,
             server=server,
@@ -441,7 +603,7 @@ class JjcRankingService:
                 "name": name,
             }
 
-        await self.update_kungfu_cache(server, name, jjc_data)
+        await self.update_kungfu_cache(server, name, jjc_data, ranking_index=ranking_index)
 
         kungfu_info = None
         history_data = jjc_data.get("data", {}).get("history", [])
@@ -459,15 +621,73 @@ class JjcRankingService:
             "cache_time": time.time(),
         }
         result.setdefault("weapon_checked", True)
-        self._merge_cached_weapon(server, name, result)
-        cached = self._cache().load_kungfu_cache(server, name)
-        if cached:
-            cached.update(result)
-            result = cached
-        self._cache().save_kungfu_cache(server, name, result)
-        return result
+        return await asyncio.to_thread(self._store_kungfu_result, server, name, result, merge_cached=True)
+
+    def partition_kungfu_cache(self, jobs: list[KungfuResolveJob]) -> dict[int, dict[str, Any]]:
+        """
+        批量判定一批角色的心法缓存：返回命中角色 {job.index: 缓存数据}，其余即为需要联网查询的角色。
+        """
+        hits, _misses = self._cache().partition_kungfu_cache((job.server, job.name) for job in jobs)
+        return {
+            job.index: hits[(str(job.server), str(job.name))]
+            for job in jobs
+            if (str(job.server), str(job.name)) in hits
+        }
+
+    def _carry_forward_from_snapshot(
+        self,
+        jobs: list[KungfuResolveJob],
+        data_list: list[dict[str, Any]],
+        snapshot: RankingSnapshot,
+    ) -> dict[int, dict[str, Any]]:
+        """
+        按角色身份与上次统计快照比对：未过期的老玩家直接沿用上次解析出的心法/武器/队友。
+        """
+        now = time.time()
+        carried: dict[int, dict[str, Any]] = {}
+        stale_count = 0
+        for job in jobs:
+            person_info = (data_list[job.index] or {}).get("personInfo", {}) or {}
+            member = snapshot.find(job.server, job.name, person_info.get("gameRoleId"))
+            if member is None:
+                continue
+            resolved_at = float(member.get("resolved_at") or snapshot.generated_at)
+            if now - resolved_at >= self.jjc_ranking_incremental_max_age:
+                stale_count += 1
+                continue
+            carried[job.index] = {
+                "server": job.server,
+                "name": job.name,
+                "kungfu": member.get("kungfu"),
+                "found": True,
+                "kungfu_id": member.get("kungfu_id"),
+                "role_id": member.get("role_id"),
+                "global_role_id": member.get("global_role_id"),
+                "zone": member.get("zone"),
+                "teammates": member.get("teammates"),
+                "weapon_icon": member.get("weapon_icon"),
+                "weapon_quality": member.get("weapon_quality"),
+                "cache_time": resolved_at,
+                "carried_forward": True,
+            }
+        logger.info(
+            f"增量统计比对快照: snapshot={snapshot.timestamp} total={len(jobs)} carried={len(carried)} "
+            f"stale={stale_count} changed={len(jobs) - len(carried) - stale_count}"
+        )
+        return carried
 
-    async def get_ranking_kungfu_data(self, ranking_data: dict[str, Any]) -> dict[str, Any]:
+    async def get_ranking_kungfu_data(
+        self,
+        ranking_data: dict[str, Any],
+        progress_callback: Optional[ProgressCallback] = None,
+        incremental: Optional[bool] = None,
+    ) -> dict[str, Any]:
+        """
+        统计排行榜心法分布。incremental 为 None 时按 jjc_ranking_incremental_max_age 是否大于 0 决定：
+        开启后先沿用上次统计快照中未过期的角色，只对新上榜/已过期的角色查缓存或联网解析。
+        """
+        if incremental is None:
+            incremental = self.jjc_ranking_incremental_max_age > 0
         try:
             data_list = ranking_data.get("data", [])
             if not data_list:
@@ -480,21 +700,47 @@ class JjcRankingService:
             total_players = len(data_list)
             logger.info(f"竞技场排行榜总人数: {total_players}")
 
+            ranking_index = self.ranking_index(ranking_data)
+            jobs: list[KungfuResolveJob] = []
             for i, player in enumerate(data_list):
                 person_info = player.get("personInfo", {})
-                server = person_info.get("server", "未知")
                 name = person_info.get("roleName", "未知")
-                score = self._extract_score(player, person_info)
-
                 if name and "·" in name:
                     name = name.split("·")[0]
-
-                kungfu_info = await self.get_user_kungfu(
-                    server,
-                    name,
+                jobs.append(KungfuResolveJob(index=i, server=person_info.get("server", "未知"), name=name))
+
+            snapshot: Optional[RankingSnapshot] = None
+            if incremental:
+                snapshot = await asyncio.to_thread(load_latest_ranking_snapshot, self.jjc_ranking_stats_dir)
+
+            def load_cached(batch: list[KungfuResolveJob]) -> dict[int, dict[str, Any]]:
+                cached: dict[int, dict[str, Any]] = {}
+                if snapshot is not None:
+                    cached = self._carry_forward_from_snapshot(batch, data_list, snapshot)
+                remaining = [job for job in batch if job.index not in cached]
+                cached.update(self.partition_kungfu_cache(remaining))
+                return cached
+
+            kungfu_infos = await resolve_kungfu_concurrently(
+                jobs,
+                load_cached=load_cached,
+                fetch=lambda job: self._fetch_user_kungfu(
+                    job.server,
+                    job.name,
                     ranking_data=ranking_data,
-                    rank=i + 1,
-                )
+                    rank=job.rank,
+                    ranking_index=ranking_index,
+                ),
+                concurrency=self.kungfu_resolve_concurrency,
+                progress_callback=progress_callback,
+            )
+
+            for i, player in enumerate(data_list):
+                person_info = player.get("personInfo", {})
+                server = jobs[i].server
+                name = jobs[i].name
+                score = self._extract_score(player, person_info)
+                kungfu_info = kungfu_infos[i]
                 indicator_kungfu = kungfu_info.get("kungfu_indicator")
                 match_history_kungfu = kungfu_info.get("kungfu_match_history")
                 if (
@@ -536,6 +782,7 @@ class JjcRankingService:
                         "teammates": kungfu_info.get("teammates"),
                         "weapon_icon": kungfu_info.get("weapon_icon"),
                         "weapon_quality": kungfu_info.get("weapon_quality"),
+                        "resolved_at": kungfu_info.get("cache_time"),
                     }
                 )
 
@@ -551,150 +798,19 @@ class JjcRankingService:
                     )
                     missing_kungfu_lines.append(f"{i + 1}. {server} {name} - id:{role_id}")
 
-            def count_kungfu_by_rank(player_data: list[dict[str, Any]], max_rank: int) -> dict[str, Any]:
-                healer_kungfu = self.kungfu_healer_list
-                dps_kungfu = self.kungfu_dps_list
-
-                healer_count: dict[str, int] = {}
-                dps_count: dict[str, int] = {}
-
-                healer_valid_count = 0
-                dps_valid_count = 0
-                invalid_count = 0
-                invalid_details: list[str] = []
-
-                healer_first_rank: dict[str, int] = {}
-                dps_first_rank: dict[str, int] = {}
-                healer_members: dict[str, list[dict[str, Any]]] = {}
-                dps_members: dict[str, list[dict[str, Any]]] = {}
-
-                overall_min_score = None
-
-                for kungfu in healer_kungfu:
-                    healer_count[kungfu] = 0
-                    healer_members[kungfu] = []
-                for kungfu in dps_kungfu:
-                    dps_count[kungfu] = 0
-                    dps_members[kungfu] = []
-
-                for player_item in player_data[:max_rank]:
-                    score = self._coerce_score(player_item.get("score"))
-                    if score is not None and (overall_min_score is None or score < overall_min_score):
-                        overall_min_score = score
-                if overall_min_score is None:
-                    logger.warning(f"前{max_rank}名范围内未找到可用分数字段，最低分将无法展示")
-
-                for i, player_item in enumerate(player_data[:max_rank]):
-                    if player_item.get("found") and player_item.get("kungfu"):
-                        kungfu = player_item["kungfu"]
-                        score = self._coerce_score(player_item.get("score"))
-
-                        if kungfu in healer_kungfu:
-                            healer_count[kungfu] = healer_count.get(kungfu, 0) + 1
-                            healer_valid_count += 1
-                            if kungfu not in healer_first_rank:
-                                healer_first_rank[kungfu] = i + 1
-                            healer_members[kungfu].append(
-                                {
-                                    "rank": i + 1,
-                                    "server": player_item.get("server", "未知"),
-                                    "name": player_item.get("name", "未知"),
-                                    "score": score,
-                                    "kungfu_id": player_item.get("kungfu_id"),
-                                    "game_role_id": player_item.get("game_role_id"),
-                                    "global_role_id": player_item.get("global_role_id"),
-                                    "role_id": player_item.get("role_id"),
-                                    "zone": player_item.get("zone"),
-                                    "teammates": player_item.get("teammates"),
-                                    "weapon_icon": player_item.get("weapon_icon"),
-                                    "weapon_quality": player_item.get("weapon_quality"),
-                                }
-                            )
-                        elif kungfu in dps_kungfu:
-                            dps_count[kungfu] = dps_count.get(kungfu, 0) + 1
-                            dps_valid_count += 1
-                            if kungfu not in dps_first_rank:
-                                dps_first_rank[kungfu] = i + 1
-                            dps_members[kungfu].append(
-                                {
-                                    "rank": i + 1,
-                                    "server": player_item.get("server", "未知"),
-                                    "name": player_item.get("name", "未知"),
-                                    "score": score,
-                                    "kungfu_id": player_item.get("kungfu_id"),
-                                    "game_role_id": player_item.get("game_role_id"),
-                                    "global_role_id": player_item.get("global_role_id"),
-                                    "role_id": player_item.get("role_id"),
-                                    "zone": player_item.get("zone"),
-                                    "teammates": player_item.get("teammates"),
-                                    "weapon_icon": player_item.get("weapon_icon"),
-                                    "weapon_quality": player_item.get("weapon_quality"),
-                                }
-                            )
-                        else:
-                            logger.info(
-                                f"⚠️ 发现未分类心法：第{i+1}名 {player_item.get('server', '未知')} "
-                                f"{player_item.get('name', '未知')} - {kungfu}"
-                            )
-                    else:
-                        invalid_count += 1
-                        invalid_details.append(
-                            f"第{i+1}名：{player_item.get('server', '未知')} {player_item.get('name', '未知')}"
-                        )
-
-                for i, kungfu in enumerate(healer_kungfu):
-                    if kungfu not in healer_first_rank:
-                        healer_first_rank[kungfu] = 9999 + i
-                for i, kungfu in enumerate(dps_kungfu):
-                    if kungfu not in dps_first_rank:
-                        dps_first_rank[kungfu] = 9999 + i
-
-                sorted_healer = sorted(
-                    healer_count.items(),
-                    key=lambda x: (x[1], -healer_first_rank[x[0]]),
-                    reverse=True,
-                )
-                sorted_dps = sorted(
-                    dps_count.items(),
-                    key=lambda x: (x[1], -dps_first_rank[x[0]]),
-                    reverse=True,
-                )
-
-                if invalid_details:
-                    logger.info(f"前{max_rank}名中无效数据角色（共{len(invalid_details)}个）")
-                    for detail in invalid_details:
-                        logger.info(f"invalid: {detail}")
-
-                return {
-                    "total_players": max_rank,
-                    "healer": {
-                        "valid_count": healer_valid_count,
-                        "distribution": dict(sorted_healer),
-                        "list": sorted_healer,
-                        "min_score": overall_min_score,
-                        "members": healer_members,
-                    },
-                    "dps": {
-                        "valid_count": dps_valid_count,
-                        "distribution": dict(sorted_dps),
-                        "list": sorted_dps,
-                        "min_score": overall_min_score,
-                        "members": dps_members,
-                    },
-                    "total_valid_count": healer_valid_count + dps_valid_count,
-                    "invalid_count": invalid_count,
-                    "invalid_details": invalid_details,
-                    "unclassified_count": max_rank - (healer_valid_count + dps_valid_count + invalid_count),
-                }
-
             logger.info("正在统计kungfu分布")
-            kungfu_stats: dict[str, Any] = {}
-            if total_players >= 1000:
-                logger.info("检测到排行榜包含1000条数据，开始统计前1000心法分布")
-                kungfu_stats["top_1000"] = count_kungfu_by_rank(kungfu_results, 1000)
-            kungfu_stats["top_200"] = count_kungfu_by_rank(kungfu_results, 200)
-            kungfu_stats["top_100"] = count_kungfu_by_rank(kungfu_results, 100)
-            kungfu_stats["top_50"] = count_kungfu_by_rank(kungfu_results, 50)
+            # 200 及以内的范围是渲染模板固定需要的，榜单不足时照常输出；更大的范围仅在榜单够长时统计
+            cutoffs = sorted(
+                {cutoff for cutoff in self.kungfu_stat_cutoffs if cutoff <= total_players or cutoff <= 200},
+                reverse=True,
+            )
+            kungfu_stats: dict[str, Any] = aggregate_kungfu_by_ranges(
+                kungfu_results,
+                cutoffs,
+                healer_kungfu=self.kungfu_healer_list,
+                dps_kungfu=self.kungfu_dps_list,
+                coerce_score=self._coerce_score,
+            )
 
             result: dict[str, Any] = {
                 "kungfu_statistics": kungfu_stats,
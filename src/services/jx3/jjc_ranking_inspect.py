@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import asyncio
+import inspect
 import threading
 import time
 from dataclasses import asdict, dataclass, field
@@ -121,8 +122,9 @@ class JjcRankingInspectService:
     match_history_client: MatchHistoryClient
     match_detail_client: MatchDetailClient
     cache_repo: JjcRankingInspectCacheRepo
+    # 同步函数会放到线程池执行；注入 atuilan_request / aget_role_indicator 时直接在事件循环上 await
     tuilan_request: Callable[[str, dict[str, Any]], Any]
-    role_indicator_fetcher: Callable[..., Optional[dict[str, Any]]]
+    role_indicator_fetcher: Callable[..., Any]
     kungfu_pinyin_to_chinese: dict[str, str]
     role_recent_ttl_seconds: int = 600
     max_recent_matches: int = 20
@@ -156,6 +158,8 @@ class JjcRankingInspectService:
         async with self._get_tuilan_query_lock():
             logger.info("获取推栏查询锁: label={}", label)
             try:
+                if inspect.iscoroutinefunction(func):
+                    return await func(*args, **kwargs)
                 return await asyncio.to_thread(func, *args, **kwargs)
             finally:
                 logger.info("释放推栏查询锁: label={}", label)
@@ -280,17 +284,11 @@ class JjcRankingInspectService:
             finally:
                 logger.info("释放推栏查询锁: label=live_ranking:{}:{}", server, name)
         if not ranking_result.get("error") and ranking_result.get("code") == 0:
-            for player in ranking_result.get("data", []):
-                if not isinstance(player, dict):
-                    continue
-                person_info = player.get("personInfo", {}) or {}
-                player_server = _pick_str(person_info.get("server"))
-                player_name = _normalize_name(_pick_str(person_info.get("roleName")))
-                if player_server != server or player_name != normalized_name:
-                    continue
-                ranking_global_role_id = _pick_str(person_info.get("globalRoleId"))
-                ranking_game_role_id = _pick_str(person_info.get("gameRoleId"))
-                ranking_zone = _pick_str(person_info.get("zone"))
+            entry = self.ranking_service.ranking_index(ranking_result).find(server, normalized_name)
+            if entry is not None:
+                ranking_global_role_id = entry.global_role_id
+                ranking_game_role_id = entry.game_role_id
+                ranking_zone = entry.zone
                 if ranking_global_role_id:
                     logger.info("JJC 角色标识解析: 使用实时榜单 global_role_id server={} name={}", server, name)
                     return {
@@ -375,7 +373,7 @@ class JjcRankingInspectService:
 
         raw = await self._run_serialized_tuilan_query(
             f"match_history:{server}:{name}",
-            self.match_history_client.get_mine_match_history,
+            self.match_history_client.aget_mine_match_history,
             global_role_id=global_role_id,
             size=self.max_recent_matches,
             cursor=cursor,
@@ -531,7 +529,7 @@ class JjcRankingInspectService:
         logger.info("加载 JJC 对局详情: match_id={}", normalized_match_id)
         detail = await self._run_serialized_tuilan_query(
             f"match_detail:{normalized_match_id}",
-            self.match_detail_client.get_match_detail_obj,
+            self.match_detail_client.aget_match_detail_obj,
             match_id=normalized_match_id,
         )
         if not isinstance(detail, MatchDetailResponse):
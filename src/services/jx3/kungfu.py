@@ -2,7 +2,9 @@ from __future__ import annotations
 
 import json
 from collections import Counter
-from typing import Any, Callable
+from typing import Any, Awaitable, Callable
+
+from src.infra.single_flight import SingleFlight, make_flight_key
 
 try:
     from nonebot import logger  # type: ignore
@@ -14,6 +16,35 @@ except Exception:  # pragma: no cover
         logging.basicConfig(level=logging.INFO)
 
 
+ROLE_INDICATOR_URL = "https://m.pvp.xoyo.com/role/indicator"
+MATCH_HISTORY_URL = "https://m.pvp.xoyo.com/3c/mine/match/history"
+
+# 同一角色的 indicator 并发查询（排名统计 / 角色详情 / 定时推送撞车）只打一次推栏
+role_indicator_single_flight = SingleFlight("role_indicator")
+
+
+def _check_role_indicator_result(
+    result: Any,
+    *,
+    server: str,
+    rank: int | None,
+    name: str | None,
+) -> dict[str, Any] | None:
+    if result is None:
+        logger.warning("获取角色信息失败: 返回None")
+        return None
+
+    if "error" in result:
+        logger.warning("获取角色信息失败: %s", result.get("error"))
+        return None
+
+    rank_text = f"#{rank}" if rank is not None else "#-"
+    name_text = name or "未知"
+    server_text = server or "未知"
+    logger.info("角色信息获取成功: {} {} {}", rank_text, server_text, name_text)
+    return result
+
+
 def get_role_indicator(
     role_id: str,
     zone: str,
@@ -26,7 +57,7 @@ def get_role_indicator(
     """
     获取角色详细信息
     """
-    url = "https://m.pvp.xoyo.com/role/indicator"
+    url = ROLE_INDICATOR_URL
     params = {"role_id": role_id, "zone": zone, "server": server}
 
     logger.info(
@@ -37,19 +68,39 @@ def get_role_indicator(
 
     try:
         result = tuilan_request(url, params)
-        if result is None:
-            logger.warning("获取角色信息失败: 返回None")
-            return None
-
-        if "error" in result:
-            logger.warning("获取角色信息失败: %s", result.get("error"))
-            return None
-
-        rank_text = f"#{rank}" if rank is not None else "#-"
-        name_text = name or "未知"
-        server_text = server or "未知"
-        logger.info("角色信息获取成功: {} {} {}", rank_text, server_text, name_text)
-        return result
+        return _check_role_indicator_result(result, server=server, rank=rank, name=name)
+    except Exception as exc:
+        logger.exception("获取角色信息异常: %s", exc)
+        return None
+
+
+async def aget_role_indicator(
+    role_id: str,
+    zone: str,
+    server: str,
+    *,
+    tuilan_request: Callable[[str, dict[str, Any]], Awaitable[Any]],
+    rank: int | None = None,
+    name: str | None = None,
+) -> dict[str, Any] | None:
+    """
+    获取角色详细信息（asyncio 版本，tuilan_request 需为 atuilan_request 这类协程函数）
+    """
+    url = ROLE_INDICATOR_URL
+    params = {"role_id": role_id, "zone": zone, "server": server}
+
+    logger.info(
+        "正在获取角色信息: url={} params={}",
+        url,
+        json.dumps(params, ensure_ascii=False),
+    )
+
+    try:
+        result = await role_indicator_single_flight.do(
+            make_flight_key(url, params),
+            lambda: tuilan_request(url, params),
+        )
+        return _check_role_indicator_result(result, server=server, rank=rank, name=name)
     except Exception as exc:
         logger.exception("获取角色信息异常: %s", exc)
         return None
@@ -86,7 +137,7 @@ def get_match_history(
     """
     推栏：分页请求 3c 战局历史
     """
-    url = "https://m.pvp.xoyo.com/3c/mine/match/history"
+    url = MATCH_HISTORY_URL
     params = {"global_role_id": global_role_id, "size": int(size), "cursor": int(cursor)}
     try:
         return tuilan_request(url, params)
@@ -98,6 +149,25 @@ def get_match_history(
         return None
 
 
+async def aget_match_history(
+    global_role_id: str,
+    *,
+    size: int,
+    cursor: int,
+    tuilan_request: Callable[[str, dict[str, Any]], Awaitable[Any]],
+) -> dict[str, Any] | None:
+    """
+    推栏：分页请求 3c 战局历史（asyncio 版本）
+    """
+    url = MATCH_HISTORY_URL
+    params = {"global_role_id": global_role_id, "size": int(size), "cursor": int(cursor)}
+    try:
+        return await tuilan_request(url, params)
+    except Exception as exc:
+        logger.exception("获取战局历史时发生异常: %s", exc)
+        return None
+
+
 def _extract_match_id(match: dict[str, Any]) -> int | None:
     for key in ("match_id", "matchId", "matchID", "id"):
         value = match.get(key)
@@ -204,37 +274,17 @@ def _match_player_and_teammates(
     return weapon_info, target_kungfu_id, teammates
 
 
-def get_kungfu_detail_by_role_info(
+def _parse_indicator_kungfu(
+    role_detail: dict[str, Any],
+    *,
     game_role_id: str,
     zone: str,
     server: str,
-    *,
-    tuilan_request: Callable[[str, dict[str, Any]], Any],
     kungfu_pinyin_to_chinese: dict[str, str],
-    match_detail_url: str | None = None,
-    role_name: str | None = None,
-    rank: int | None = None,
-) -> dict[str, Any] | None:
+) -> dict[str, Any]:
     """
-    心法判定（用于缓存落盘）：
-    1) indicator 接口选取胜场最高的心法（仅 items 非空的 metrics 参与）
-    2) indicator 获取 global_role_id 后请求 match_history 最近40条，从中取10场胜场心法做多数投票
-    3) 若对战(10胜场)心法与 indicator 心法不同，则以对战心法为准；若不足10胜场则以 indicator 为准
+    indicator 接口选取胜场最高的心法（仅 items 非空的 metrics 参与），并提取角色标识
     """
-    if game_role_id == "未知" or server == "未知" or zone == "未知":
-        return None
-
-    role_detail = get_role_indicator(
-        game_role_id,
-        zone,
-        server,
-        tuilan_request=tuilan_request,
-        rank=rank,
-        name=role_name,
-    )
-    if not role_detail or "data" not in role_detail or not role_detail["data"]:
-        return None
-
     data = role_detail.get("data") or {}
     role_info = data.get("role_info") or {}
     role_id = role_info.get("role_id") or role_info.get("roleId") or game_role_id
@@ -296,6 +346,43 @@ def get_kungfu_detail_by_role_info(
                         )
                 break
 
+    return {
+        "role_id": role_id,
+        "global_role_id": global_role_id,
+        "kungfu_pinyin": indicator_kungfu_pinyin,
+        "kungfu_name": indicator_kungfu_name,
+    }
+
+
+def _extract_history_matches(resp: Any) -> list[dict[str, Any]]:
+    matches: list[dict[str, Any]] = []
+    if resp and isinstance(resp, dict) and resp.get("code") == 0 and resp.get("msg") == "success":
+        page_data = resp.get("data") or []
+        if isinstance(page_data, list):
+            matches.extend([m for m in page_data if isinstance(m, dict)])
+    return matches
+
+
+def _build_kungfu_detail(
+    indicator: dict[str, Any],
+    *,
+    matches: list[dict[str, Any]],
+    detail_resp: Any,
+    match_detail_url: str | None,
+    role_name: str | None,
+    server: str,
+    kungfu_pinyin_to_chinese: dict[str, str],
+) -> dict[str, Any]:
+    """
+    汇总 indicator / match_history / match_detail 三路结果：
+    match_history 最近40条中取10场胜场心法做多数投票，若与 indicator 心法不同则以对战心法为准；
+    不足10胜场时以 indicator 为准
+    """
+    role_id = indicator["role_id"]
+    global_role_id = indicator["global_role_id"]
+    indicator_kungfu_pinyin = indicator["kungfu_pinyin"]
+    indicator_kungfu_name = indicator["kungfu_name"]
+
     match_history_kungfu_pinyin = None
     match_history_kungfu_name = None
     match_history_win_kungfu_samples: list[str] = []
@@ -307,18 +394,6 @@ def get_kungfu_detail_by_role_info(
     weapon_checked = False
 
     if global_role_id:
-        matches: list[dict[str, Any]] = []
-        resp = get_match_history(
-            global_role_id,
-            size=40,
-            cursor=0,
-            tuilan_request=tuilan_request,
-        )
-        if resp and isinstance(resp, dict) and resp.get("code") == 0 and resp.get("msg") == "success":
-            page_data = resp.get("data") or []
-            if isinstance(page_data, list):
-                matches.extend([m for m in page_data if isinstance(m, dict)])
-
         match_history_checked = min(40, len(matches))
         won_kungfus: list[str] = []
         for match in matches[:40]:
@@ -327,22 +402,19 @@ def get_kungfu_detail_by_role_info(
                 if len(won_kungfus) >= 10:
                     break
 
-        latest_win_match_id = _find_latest_win_match_id(matches)
         if match_detail_url:
             weapon_checked = True
-        if latest_win_match_id and match_detail_url:
+        if isinstance(detail_resp, dict) and detail_resp.get("code") == 0:
             try:
-                detail_resp = tuilan_request(match_detail_url, {"match_id": latest_win_match_id})
-                if isinstance(detail_resp, dict) and detail_resp.get("code") == 0:
-                    weapon_info, kungfu_id, teammates = _match_player_and_teammates(
-                        detail_resp,
-                        role_id=role_id,
-                        global_role_id=global_role_id,
-                        role_name=role_name,
-                        server=server,
-                    )
+                weapon_info, kungfu_id, teammates = _match_player_and_teammates(
+                    detail_resp,
+                    role_id=role_id,
+                    global_role_id=global_role_id,
+                    role_name=role_name,
+                    server=server,
+                )
             except Exception as exc:
-                logger.exception("获取战局详情失败: %s", exc)
+                logger.exception("解析战局详情失败: %s", exc)
 
         if len(won_kungfus) >= 10:
             sample = won_kungfus[:10]
@@ -400,6 +472,137 @@ def get_kungfu_detail_by_role_info(
     return result
 
 
+def get_kungfu_detail_by_role_info(
+    game_role_id: str,
+    zone: str,
+    server: str,
+    *,
+    tuilan_request: Callable[[str, dict[str, Any]], Any],
+    kungfu_pinyin_to_chinese: dict[str, str],
+    match_detail_url: str | None = None,
+    role_name: str | None = None,
+    rank: int | None = None,
+) -> dict[str, Any] | None:
+    """
+    心法判定（用于缓存落盘）：
+    1) indicator 接口选取胜场最高的心法（仅 items 非空的 metrics 参与）
+    2) indicator 获取 global_role_id 后请求 match_history 最近40条，从中取10场胜场心法做多数投票
+    3) 若对战(10胜场)心法与 indicator 心法不同，则以对战心法为准；若不足10胜场则以 indicator 为准
+    """
+    if game_role_id == "未知" or server == "未知" or zone == "未知":
+        return None
+
+    role_detail = get_role_indicator(
+        game_role_id,
+        zone,
+        server,
+        tuilan_request=tuilan_request,
+        rank=rank,
+        name=role_name,
+    )
+    if not role_detail or "data" not in role_detail or not role_detail["data"]:
+        return None
+
+    indicator = _parse_indicator_kungfu(
+        role_detail,
+        game_role_id=game_role_id,
+        zone=zone,
+        server=server,
+        kungfu_pinyin_to_chinese=kungfu_pinyin_to_chinese,
+    )
+
+    matches: list[dict[str, Any]] = []
+    detail_resp: Any = None
+    if indicator["global_role_id"]:
+        resp = get_match_history(
+            indicator["global_role_id"],
+            size=40,
+            cursor=0,
+            tuilan_request=tuilan_request,
+        )
+        matches = _extract_history_matches(resp)
+        latest_win_match_id = _find_latest_win_match_id(matches)
+        if latest_win_match_id and match_detail_url:
+            try:
+                detail_resp = tuilan_request(match_detail_url, {"match_id": latest_win_match_id})
+            except Exception as exc:
+                logger.exception("获取战局详情失败: %s", exc)
+
+    return _build_kungfu_detail(
+        indicator,
+        matches=matches,
+        detail_resp=detail_resp,
+        match_detail_url=match_detail_url,
+        role_name=role_name,
+        server=server,
+        kungfu_pinyin_to_chinese=kungfu_pinyin_to_chinese,
+    )
+
+
+async def aget_kungfu_detail_by_role_info(
+    game_role_id: str,
+    zone: str,
+    server: str,
+    *,
+    tuilan_request: Callable[[str, dict[str, Any]], Awaitable[Any]],
+    kungfu_pinyin_to_chinese: dict[str, str],
+    match_detail_url: str | None = None,
+    role_name: str | None = None,
+    rank: int | None = None,
+) -> dict[str, Any] | None:
+    """
+    get_kungfu_detail_by_role_info 的 asyncio 版本，判定规则完全一致
+    """
+    if game_role_id == "未知" or server == "未知" or zone == "未知":
+        return None
+
+    role_detail = await aget_role_indicator(
+        game_role_id,
+        zone,
+        server,
+        tuilan_request=tuilan_request,
+        rank=rank,
+        name=role_name,
+    )
+    if not role_detail or "data" not in role_detail or not role_detail["data"]:
+        return None
+
+    indicator = _parse_indicator_kungfu(
+        role_detail,
+        game_role_id=game_role_id,
+        zone=zone,
+        server=server,
+        kungfu_pinyin_to_chinese=kungfu_pinyin_to_chinese,
+    )
+
+    matches: list[dict[str, Any]] = []
+    detail_resp: Any = None
+    if indicator["global_role_id"]:
+        resp = await aget_match_history(
+            indicator["global_role_id"],
+            size=40,
+            cursor=0,
+            tuilan_request=tuilan_request,
+        )
+        matches = _extract_history_matches(resp)
+        latest_win_match_id = _find_latest_win_match_id(matches)
+        if latest_win_match_id and match_detail_url:
+            try:
+                detail_resp = await tuilan_request(match_detail_url, {"match_id": latest_win_match_id})
+            except Exception as exc:
+                logger.exception("获取战局详情失败: %s", exc)
+
+    return _build_kungfu_detail(
+        indicator,
+        matches=matches,
+        detail_resp=detail_resp,
+        match_detail_url=match_detail_url,
+        role_name=role_name,
+        server=server,
+        kungfu_pinyin_to_chinese=kungfu_pinyin_to_chinese,
+    )
+
+
 def get_kungfu_by_role_info(
     game_role_id: str,
     zone: str,
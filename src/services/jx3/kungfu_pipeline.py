@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import asyncio
+import inspect
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+
+from nonebot import logger
+
+
+@dataclass(frozen=True)
+class KungfuResolveJob:
+    index: int
+    server: str
+    name: str
+
+    @property
+    def rank(self) -> int:
+        return self.index + 1
+
+
+@dataclass(frozen=True)
+class KungfuResolveProgress:
+    total: int
+    done: int
+    cache_hits: int
+    fetched: int
+    failed: int
+    elapsed: float
+
+
+ProgressCallback = Callable[[KungfuResolveProgress], Any]
+
+
+async def resolve_kungfu_concurrently(
+    jobs: list[KungfuResolveJob],
+    *,
+    load_cached: Callable[[list[KungfuResolveJob]], dict[int, dict[str, Any]]],
+    fetch: Callable[[KungfuResolveJob], Awaitable[dict[str, Any]]],
+    concurrency: int,
+    progress_callback: Optional[ProgressCallback] = None,
+    progress_interval: int = 50,
+) -> list[dict[str, Any]]:
+    """
+    并发解析一批角色的心法信息，返回结果顺序与 jobs 一致。
+
+    - load_cached 一次性批量判定整批角色的缓存，返回 {job.index: 缓存数据}；命中立即落位，不进入队列（同步读 SQLite，在线程中执行）
+    - 缓存未命中的角色按名次从高到低放入队列，由 concurrency 个 worker 拉取
+    - 推栏请求的节流由全局令牌桶负责，这里只控制同时在途的角色数
+    """
+    started_at = time.monotonic()
+    total = len(jobs)
+    results: list[Optional[dict[str, Any]]] = [None] * total
+    counters = {"done": 0, "cache_hits": 0, "fetched": 0, "failed": 0}
+
+    async def report(force: bool = False) -> None:
+        done = counters["done"]
+        if not force and (progress_interval <= 0 or done % progress_interval != 0):
+            return
+        progress = KungfuResolveProgress(
+            total=total,
+            done=done,
+            cache_hits=counters["cache_hits"],
+            fetched=counters["fetched"],
+            failed=counters["failed"],
+            elapsed=time.monotonic() - started_at,
+        )
+        logger.info(
+            "心法解析进度: {}/{} cache_hits={} fetched={} failed={} elapsed={:.1f}s",
+            progress.done,
+            progress.total,
+            progress.cache_hits,
+            progress.fetched,
+            progress.failed,
+            progress.elapsed,
+        )
+        if progress_callback is not None:
+            try:
+                outcome = progress_callback(progress)
+                if inspect.isawaitable(outcome):
+                    await outcome
+            except Exception as exc:
+                logger.warning("心法解析进度回调失败: {}", exc)
+
+    cached_by_index = await asyncio.to_thread(load_cached, jobs) if jobs else {}
+    queue: asyncio.Queue[KungfuResolveJob] = asyncio.Queue()
+    for job in sorted(jobs, key=lambda item: item.rank):
+        cached = cached_by_index.get(job.index)
+        if cached:
+            results[job.index] = cached
+            counters["cache_hits"] += 1
+            counters["done"] += 1
+            continue
+        queue.put_nowait(job)
+
+    miss_count = queue.qsize()
+    logger.info(
+        "心法解析调度: total={} cache_hits={} misses={} concurrency={}",
+        total,
+        counters["cache_hits"],
+        miss_count,
+        concurrency,
+    )
+
+    async def worker() -> None:
+        while True:
+            try:
+                job = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                results[job.index] = await fetch(job)
+                counters["fetched"] += 1
+            except Exception as exc:
+                logger.warning(
+                    "心法解析失败: rank={} server={} name={} error={}", job.rank, job.server, job.name, exc
+                )
+                results[job.index] = {
+                    "error": True,
+                    "message": f"心法查询异常: {exc}",
+                    "server": job.server,
+                    "name": job.name,
+                }
+                counters["failed"] += 1
+            finally:
+                counters["done"] += 1
+                queue.task_done()
+            await report()
+
+    if miss_count:
+        worker_count = max(1, min(int(concurrency), miss_count))
+        await asyncio.gather(*(worker() for _ in range(worker_count)))
+
+    await report(force=True)
+    return [item or {} for item in results]
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Iterable, Optional
+
+try:
+    from nonebot import logger  # type: ignore
+except Exception:  # pragma: no cover
+    import logging
+
+    logger = logging.getLogger(__name__)
+
+
+def _member(rank: int, player_item: dict[str, Any], score: Optional[int]) -> dict[str, Any]:
+    return {
+        "rank": rank,
+        "server": player_item.get("server", "未知"),
+        "name": player_item.get("name", "未知"),
+        "score": score,
+        "kungfu_id": player_item.get("kungfu_id"),
+        "game_role_id": player_item.get("game_role_id"),
+        "global_role_id": player_item.get("global_role_id"),
+        "role_id": player_item.get("role_id"),
+        "zone": player_item.get("zone"),
+        "teammates": player_item.get("teammates"),
+        "weapon_icon": player_item.get("weapon_icon"),
+        "weapon_quality": player_item.get("weapon_quality"),
+        "resolved_at": player_item.get("resolved_at"),
+    }
+
+
+class _LaneAccumulator:
+    def __init__(self, kungfu_list: list[str]) -> None:
+        self.kungfu_list = list(kungfu_list)
+        self.kungfu_set = set(kungfu_list)
+        self.members: dict[str, list[dict[str, Any]]] = {kungfu: [] for kungfu in self.kungfu_list}
+        self.first_rank: dict[str, int] = {}
+        self.valid_count = 0
+
+    def add(self, kungfu: str, rank: int, member: dict[str, Any]) -> None:
+        self.members.setdefault(kungfu, []).append(member)
+        self.first_rank.setdefault(kungfu, rank)
+        self.valid_count += 1
+
+    def checkpoint(self) -> tuple[int, dict[str, int]]:
+        return self.valid_count, {kungfu: len(items) for kungfu, items in self.members.items()}
+
+    def build(self, checkpoint: tuple[int, dict[str, int]], cutoff: int, min_score: Optional[int]) -> dict[str, Any]:
+        valid_count, lengths = checkpoint
+        counts = {kungfu: lengths.get(kungfu, 0) for kungfu in self.members}
+        fallback_rank = {kungfu: 9999 + i for i, kungfu in enumerate(self.kungfu_list)}
+
+        def first_rank(kungfu: str) -> int:
+            rank = self.first_rank.get(kungfu)
+            if rank is not None and rank <= cutoff:
+                return rank
+            return fallback_rank.get(kungfu, 9999 + len(fallback_rank))
+
+        ordered = sorted(counts.items(), key=lambda x: (x[1], -first_rank(x[0])), reverse=True)
+        return {
+            "valid_count": valid_count,
+            "distribution": dict(ordered),
+            "list": ordered,
+            "min_score": min_score,
+            "members": {kungfu: items[: lengths.get(kungfu, 0)] for kungfu, items in self.members.items()},
+        }
+
+
+def aggregate_kungfu_by_ranges(
+    player_data: list[dict[str, Any]],
+    cutoffs: Iterable[int],
+    *,
+    healer_kungfu: list[str],
+    dps_kungfu: list[str],
+    coerce_score: Callable[[Any], Optional[int]],
+) -> dict[str, dict[str, Any]]:
+    """
+    单次遍历排行榜，按前缀累计输出多个排名范围（top_N）的心法分布。
+
+    输出结构与原 count_kungfu_by_rank 逐项一致；各范围的成员列表是同一份累计列表的前缀切片，
+    因此增加范围几乎不增加成本。返回字典按传入 cutoffs 的顺序排列。
+    """
+    ordered_cutoffs = [int(cutoff) for cutoff in cutoffs if int(cutoff) > 0]
+    if not ordered_cutoffs:
+        return {}
+    max_cutoff = max(ordered_cutoffs)
+    checkpoints_at = set(ordered_cutoffs)
+
+    healer = _LaneAccumulator(healer_kungfu)
+    dps = _LaneAccumulator(dps_kungfu)
+    invalid_details: list[str] = []
+    unclassified: list[str] = []
+    min_score: Optional[int] = None
+    snapshots: dict[int, dict[str, Any]] = {}
+
+    def take_snapshot(cutoff: int) -> None:
+        snapshots[cutoff] = {
+            "healer": healer.checkpoint(),
+            "dps": dps.checkpoint(),
+            "invalid_count": len(invalid_details),
+            "min_score": min_score,
+        }
+
+    scanned = 0
+    for i, player_item in enumerate(player_data[:max_cutoff]):
+        rank = i + 1
+        scanned = rank
+        score = coerce_score(player_item.get("score"))
+        if score is not None and (min_score is None or score < min_score):
+            min_score = score
+
+        kungfu = player_item.get("kungfu")
+        if player_item.get("found") and kungfu:
+            if kungfu in healer.kungfu_set:
+                healer.add(kungfu, rank, _member(rank, player_item, score))
+            elif kungfu in dps.kungfu_set:
+                dps.add(kungfu, rank, _member(rank, player_item, score))
+            else:
+                unclassified.append(
+                    f"第{rank}名 {player_item.get('server', '未知')} {player_item.get('name', '未知')} - {kungfu}"
+                )
+        else:
+            invalid_details.append(f"第{rank}名：{player_item.get('server', '未知')} {player_item.get('name', '未知')}")
+
+        if rank in checkpoints_at:
+            take_snapshot(rank)
+
+    # 榜单不足 cutoff 人时，以全部已扫描数据作为该范围的结果（total_players 仍记为 cutoff）
+    for cutoff in ordered_cutoffs:
+        if cutoff not in snapshots and cutoff > scanned:
+            take_snapshot(cutoff)
+
+    for detail in unclassified:
+        logger.info(f"⚠️ 发现未分类心法：{detail}")
+
+    result: dict[str, dict[str, Any]] = {}
+    for cutoff in ordered_cutoffs:
+        snap = snapshots[cutoff]
+        if snap["min_score"] is None:
+            logger.warning(f"前{cutoff}名范围内未找到可用分数字段，最低分将无法展示")
+        healer_stats = healer.build(snap["healer"], cutoff, snap["min_score"])
+        dps_stats = dps.build(snap["dps"], cutoff, snap["min_score"])
+        range_invalid = invalid_details[: snap["invalid_count"]]
+        if range_invalid:
+            logger.info(f"前{cutoff}名中无效数据角色（共{len(range_invalid)}个）")
+        valid_count = healer_stats["valid_count"] + dps_stats["valid_count"]
+        result[f"top_{cutoff}"] = {
+            "total_players": cutoff,
+            "healer": healer_stats,
+            "dps": dps_stats,
+            "total_valid_count": valid_count,
+            "invalid_count": len(range_invalid),
+            "invalid_details": range_invalid,
+            "unclassified_count": cutoff - (valid_count + len(range_invalid)),
+        }
+
+    if invalid_details:
+        for detail in invalid_details:
+            logger.info(f"invalid: {detail}")
+    return result
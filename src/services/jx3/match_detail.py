@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+import asyncio
 import json
 from dataclasses import dataclass
-from typing import Any, Callable
+from typing import Any, Awaitable, Callable, Optional
 
 try:
     from nonebot import logger  # type: ignore
@@ -280,6 +281,20 @@ class MatchDetailClient:
 
     match_detail_url: str
     tuilan_request: Callable[[str, dict[str, Any]], Any]
+    async_tuilan_request: Optional[Callable[[str, dict[str, Any]], Awaitable[Any]]] = None
+
+    @staticmethod
+    def _check_result(result: Any) -> dict[str, Any]:
+        if result is None:
+            logger.warning("推栏战局详情请求失败: 返回None")
+            return {"error": "请求返回None"}
+
+        if isinstance(result, dict) and "error" in result:
+            logger.warning("推栏战局详情请求失败: %s", result.get("error"))
+            return result
+
+        logger.info("推栏战局详情请求成功")
+        return result
 
     def get_match_detail(self, *, match_id: int | str) -> dict[str, Any]:
         url = self.match_detail_url
@@ -288,18 +303,26 @@ class MatchDetailClient:
         logger.info(f"推栏战局详情请求: url={url} params={json.dumps(params, ensure_ascii=False)}")
 
         try:
-            result = self.tuilan_request(url, params)
+            return self._check_result(self.tuilan_request(url, params))
+        except Exception as exc:
+            logger.exception("推栏战局详情请求异常: %s", exc)
+            return {"error": f"请求异常: {exc}"}
 
-            if result is None:
-                logger.warning("推栏战局详情请求失败: 返回None")
-                return {"error": "请求返回None"}
+    async def aget_match_detail(self, *, match_id: int | str) -> dict[str, Any]:
+        """
+        get_match_detail 的 asyncio 版本；未注入 async_tuilan_request 时退回线程池执行同步请求。
+        """
+        url = self.match_detail_url
+        params = {"match_id": int(match_id)}
 
-            if isinstance(result, dict) and "error" in result:
-                logger.warning("推栏战局详情请求失败: %s", result.get("error"))
-                return result
+        logger.info(f"推栏战局详情请求: url={url} params={json.dumps(params, ensure_ascii=False)}")
 
-            logger.info("推栏战局详情请求成功")
-            return result
+        try:
+            if self.async_tuilan_request is None:
+                result = await asyncio.to_thread(self.tuilan_request, url, params)
+            else:
+                result = await self.async_tuilan_request(url, params)
+            return self._check_result(result)
         except Exception as exc:
             logger.exception("推栏战局详情请求异常: %s", exc)
             return {"error": f"请求异常: {exc}"}
@@ -309,3 +332,9 @@ class MatchDetailClient:
         if not isinstance(raw, dict):
             return MatchDetailResponse(code=None, msg="invalid_response", data=None)
         return parse_match_detail_response(raw)
+
+    async def aget_match_detail_obj(self, *, match_id: int | str) -> MatchDetailResponse:
+        raw = await self.aget_match_detail(match_id=match_id)
+        if not isinstance(raw, dict):
+            return MatchDetailResponse(code=None, msg="invalid_response", data=None)
+        return parse_match_detail_response(raw)
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+import asyncio
 import json
 from dataclasses import dataclass
-from typing import Any, Callable, Iterable
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Optional
 
 try:
     from nonebot import logger  # type: ignore
@@ -23,6 +24,20 @@ class MatchHistoryClient:
 
     match_history_url: str
     tuilan_request: Callable[[str, dict[str, Any]], Any]
+    async_tuilan_request: Optional[Callable[[str, dict[str, Any]], Awaitable[Any]]] = None
+
+    @staticmethod
+    def _check_result(result: Any) -> dict[str, Any]:
+        if result is None:
+            logger.warning("推栏战局历史请求失败: 返回None")
+            return {"error": "请求返回None"}
+
+        if isinstance(result, dict) and "error" in result:
+            logger.warning("推栏战局历史请求失败: %s", result.get("error"))
+            return result
+
+        logger.info("推栏战局历史请求成功")
+        return result
 
     def get_mine_match_history(
         self,
@@ -37,18 +52,32 @@ class MatchHistoryClient:
         logger.info(f"推栏战局历史请求: url={url} params={json.dumps(params, ensure_ascii=False)}")
 
         try:
-            result = self.tuilan_request(url, params)
+            return self._check_result(self.tuilan_request(url, params))
+        except Exception as exc:
+            logger.exception("推栏战局历史请求异常: %s", exc)
+            return {"error": f"请求异常: {exc}"}
 
-            if result is None:
-                logger.warning("推栏战局历史请求失败: 返回None")
-                return {"error": "请求返回None"}
+    async def aget_mine_match_history(
+        self,
+        *,
+        global_role_id: str,
+        size: int = 20,
+        cursor: int = 0,
+    ) -> dict[str, Any]:
+        """
+        get_mine_match_history 的 asyncio 版本；未注入 async_tuilan_request 时退回线程池执行同步请求。
+        """
+        url = self.match_history_url
+        params = {"global_role_id": global_role_id, "size": int(size), "cursor": int(cursor)}
 
-            if isinstance(result, dict) and "error" in result:
-                logger.warning("推栏战局历史请求失败: %s", result.get("error"))
-                return result
+        logger.info(f"推栏战局历史请求: url={url} params={json.dumps(params, ensure_ascii=False)}")
 
-            logger.info("推栏战局历史请求成功")
-            return result
+        try:
+            if self.async_tuilan_request is None:
+                result = await asyncio.to_thread(self.tuilan_request, url, params)
+            else:
+                result = await self.async_tuilan_request(url, params)
+            return self._check_result(result)
         except Exception as exc:
             logger.exception("推栏战局历史请求异常: %s", exc)
             return {"error": f"请求异常: {exc}"}
@@ -90,3 +119,39 @@ class MatchHistoryClient:
                 break
 
             current_cursor += page_size
+
+    async def aiter_mine_match_history(
+        self,
+        *,
+        global_role_id: str,
+        size: int = 20,
+        cursor: int = 0,
+        max_pages: int = 10,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        iter_mine_match_history 的 asyncio 版本，分页规则一致。
+        """
+        if max_pages <= 0:
+            return
+
+        current_cursor = int(cursor)
+        page_size = int(size)
+        for _ in range(int(max_pages)):
+            payload = await self.aget_mine_match_history(
+                global_role_id=global_role_id,
+                size=page_size,
+                cursor=current_cursor,
+            )
+            yield payload
+
+            if not isinstance(payload, dict):
+                break
+
+            data = payload.get("data")
+            if not isinstance(data, list) or not data:
+                break
+
+            if len(data) < page_size:
+                break
+
+            current_cursor += page_size
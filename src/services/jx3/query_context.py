@@ -3,6 +3,8 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Any, Callable
 
+from src.infra.image_encoding import ImageEncoding
+
 
 @dataclass(frozen=True)
 class RenderSpec:
@@ -13,6 +15,8 @@ class RenderSpec:
     filters: dict[str, Callable[..., Any]] | None = None
     prefix: str | None = "   查询结果"
     at_user: bool = True
+    # None 表示按模板取 config.RENDER_ENCODING_BY_TEMPLATE / RENDER_ENCODING_DEFAULT
+    encoding: ImageEncoding | None = None
 
 
 def build_yanhua_spec(
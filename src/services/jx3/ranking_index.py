@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+
+def normalize_role_name(name: Optional[str]) -> str:
+    """
+    排行榜 roleName 可能带 “·区服” 后缀，统一截取前半段作为角色名。
+    """
+    if not name:
+        return ""
+    text = str(name).strip()
+    if "·" in text:
+        return text.split("·")[0]
+    return text
+
+
+def _id_text(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    text = str(value).strip()
+    return text or None
+
+
+@dataclass(frozen=True)
+class RankingEntry:
+    rank: int
+    server: str
+    name: str
+    game_role_id: Optional[str]
+    global_role_id: Optional[str]
+    zone: Optional[str]
+    player: dict[str, Any]
+
+    @property
+    def person_info(self) -> dict[str, Any]:
+        return self.player.get("personInfo", {}) or {}
+
+    @property
+    def complete(self) -> bool:
+        """是否带有心法查询所需的 gameRoleId 与 zone"""
+        return bool(self.game_role_id and self.zone)
+
+
+@dataclass(frozen=True)
+class RankingIndex:
+    """
+    单份排行榜数据的角色索引：(server, 规范化角色名) / gameRoleId / globalRoleId -> 条目与名次。
+
+    同一 key 出现多次时保留名次最靠前的条目；按角色名索引时优先保留带 gameRoleId / zone 的条目
+    （原先线性扫描会跳过缺少这两项的条目继续查找）。
+    """
+
+    entries: list[RankingEntry] = field(default_factory=list)
+    by_name: dict[tuple[str, str], RankingEntry] = field(default_factory=dict)
+    by_game_role_id: dict[str, RankingEntry] = field(default_factory=dict)
+    by_global_role_id: dict[str, RankingEntry] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, ranking_result: Optional[dict[str, Any]]) -> "RankingIndex":
+        index = cls()
+        data_list = (ranking_result or {}).get("data") or []
+        if not isinstance(data_list, list):
+            return index
+
+        for i, player in enumerate(data_list):
+            if not isinstance(player, dict):
+                continue
+            person_info = player.get("personInfo", {}) or {}
+            entry = RankingEntry(
+                rank=i + 1,
+                server=str(person_info.get("server") or "").strip(),
+                name=normalize_role_name(person_info.get("roleName")),
+                game_role_id=_id_text(person_info.get("gameRoleId")),
+                global_role_id=_id_text(person_info.get("globalRoleId")),
+                zone=_id_text(person_info.get("zone")),
+                player=player,
+            )
+            index.entries.append(entry)
+            name_key = (entry.server, entry.name)
+            existing = index.by_name.get(name_key)
+            if existing is None or (entry.complete and not existing.complete):
+                index.by_name[name_key] = entry
+            if entry.game_role_id:
+                index.by_game_role_id.setdefault(entry.game_role_id, entry)
+            if entry.global_role_id:
+                index.by_global_role_id.setdefault(entry.global_role_id, entry)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def find(self, server: Optional[str], name: Optional[str]) -> Optional[RankingEntry]:
+        return self.by_name.get((str(server or "").strip(), normalize_role_name(name)))
+
+    def find_by_role_id(
+        self,
+        *,
+        game_role_id: Any = None,
+        global_role_id: Any = None,
+    ) -> Optional[RankingEntry]:
+        global_text = _id_text(global_role_id)
+        if global_text and global_text in self.by_global_role_id:
+            return self.by_global_role_id[global_text]
+        game_text = _id_text(game_role_id)
+        if game_text:
+            return self.by_game_role_id.get(game_text)
+        return None
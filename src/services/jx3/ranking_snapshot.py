@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import glob
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+try:
+    from nonebot import logger  # type: ignore
+except Exception:  # pragma: no cover
+    import logging
+
+    logger = logging.getLogger(__name__)
+
+from src.services.jx3.ranking_index import normalize_role_name
+
+
+def role_identity_keys(server: Any, name: Any, game_role_id: Any = None) -> list[tuple[str, str, str]]:
+    """
+    角色身份键：优先 (server, gameRoleId)，其次 (server, 规范化角色名)；改名后仍可按 id 对上。
+    """
+    server_text = str(server or "").strip()
+    keys: list[tuple[str, str, str]] = []
+    role_id_text = str(game_role_id).strip() if game_role_id not in (None, "") else ""
+    if role_id_text:
+        keys.append(("id", server_text, role_id_text))
+    name_text = normalize_role_name(name)
+    if name_text:
+        keys.append(("name", server_text, name_text))
+    return keys
+
+
+@dataclass(frozen=True)
+class RankingSnapshot:
+    """
+    上一次落盘的竞技排名统计（data/jjc_ranking_stats/<timestamp>/）中已解析出心法的角色。
+    """
+
+    timestamp: int
+    generated_at: float
+    range_key: str
+    members: dict[tuple[str, str, str], dict[str, Any]] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len({id(member) for member in self.members.values()})
+
+    def find(self, server: Any, name: Any, game_role_id: Any = None) -> Optional[dict[str, Any]]:
+        for key in role_identity_keys(server, name, game_role_id):
+            member = self.members.get(key)
+            if member is not None:
+                return member
+        return None
+
+
+def _load_json(file_path: str) -> Any:
+    try:
+        with open(file_path, "r", encoding="utf-8") as file_handle:
+            return json.load(file_handle)
+    except Exception:
+        return None
+
+
+def _widest_range(kungfu_statistics: dict[str, Any]) -> Optional[str]:
+    best_key = None
+    best_total = -1
+    for range_key, range_stats in (kungfu_statistics or {}).items():
+        if not isinstance(range_stats, dict):
+            continue
+        total = int(range_stats.get("total_players") or 0)
+        if total > best_total:
+            best_key, best_total = range_key, total
+    return best_key
+
+
+def load_latest_ranking_snapshot(stats_dir: str) -> Optional[RankingSnapshot]:
+    """
+    读取最近一次统计快照（新结构 summary.json + details/，兼容旧的 <timestamp>.json），
+    取人数最多的排名范围，按角色身份索引成员。
+    """
+    if not os.path.isdir(stats_dir):
+        return None
+
+    timestamps: set[int] = set()
+    for entry in os.listdir(stats_dir):
+        stem = entry[:-5] if entry.endswith(".json") else entry
+        if stem.isdigit():
+            timestamps.add(int(stem))
+
+    for timestamp in sorted(timestamps, reverse=True):
+        entry_dir = os.path.join(stats_dir, str(timestamp))
+        summary = _load_json(os.path.join(entry_dir, "summary.json"))
+        members_by_kungfu: list[tuple[str, list[dict[str, Any]]]] = []
+        range_key: Optional[str] = None
+        if isinstance(summary, dict):
+            range_key = _widest_range(summary.get("kungfu_statistics") or {})
+            if range_key:
+                for detail_path in glob.glob(os.path.join(entry_dir, "details", range_key, "*", "*.json")):
+                    detail = _load_json(detail_path)
+                    if isinstance(detail, dict) and isinstance(detail.get("members"), list):
+                        members_by_kungfu.append((str(detail.get("kungfu") or ""), detail["members"]))
+        else:
+            summary = _load_json(os.path.join(stats_dir, f"{timestamp}.json"))
+            if not isinstance(summary, dict):
+                continue
+            kungfu_statistics = summary.get("kungfu_statistics") or {}
+            range_key = _widest_range(kungfu_statistics)
+            if range_key:
+                for lane_name in ("healer", "dps"):
+                    lane = (kungfu_statistics.get(range_key) or {}).get(lane_name) or {}
+                    for kungfu, members in (lane.get("members") or {}).items():
+                        if isinstance(members, list):
+                            members_by_kungfu.append((str(kungfu), members))
+
+        if not range_key:
+            continue
+
+        generated_at = float(summary.get("generated_at") or timestamp)
+        snapshot = RankingSnapshot(timestamp=timestamp, generated_at=generated_at, range_key=range_key)
+        for kungfu, members in members_by_kungfu:
+            if not kungfu:
+                continue
+            for member in members:
+                if not isinstance(member, dict):
+                    continue
+                member = {**member, "kungfu": kungfu}
+                for key in role_identity_keys(member.get("server"), member.get("name"), member.get("game_role_id")):
+                    snapshot.members.setdefault(key, member)
+        logger.info(
+            f"加载竞技排名统计快照: timestamp={timestamp} range={range_key} members={len(snapshot)}"
+        )
+        return snapshot
+    return None
@@ -1,20 +1,21 @@
 from __future__ import annotations
 
 import config as cfg
-from jinja2 import Environment, FileSystemLoader
 
 from src.infra.jx3api_get import get
+from src.infra.rate_limiter import TokenBucket
+from src.infra.template_env import create_template_env
 from src.services.jx3.group_config_repo import GroupConfigRepo
 from src.services.jx3.jjc_ranking_inspect import JjcRankingInspectService
 from src.services.jx3.jjc_ranking import JjcRankingService
 from src.services.jx3.jjc_cache_repo import JjcCacheRepo
-from src.services.jx3.kungfu import get_role_indicator
+from src.services.jx3.kungfu import aget_role_indicator
 from src.services.jx3.match_history import MatchHistoryClient
 from src.services.jx3.match_detail import MatchDetailClient
 from src.storage.jjc_ranking_inspect_cache import JjcRankingInspectCacheRepo
-from src.utils.tuilan_request import tuilan_request
+from src.utils.tuilan_request import atuilan_request, tuilan_request
 
-env = Environment(loader=FileSystemLoader("templates"))
+env = create_template_env("templates")
 group_config_repo = GroupConfigRepo(path="groups.json")
 
 KUNGFU_PINYIN_TO_CHINESE = {key: value["name"] for key, value in cfg.KUNGFU_META.items()}
@@ -25,7 +26,15 @@ KUNGFU_DPS_LIST = [value["name"] for value in cfg.KUNGFU_META.values() if value.
 
 JJC_RANKING_CACHE_DURATION = 7200  # 缓存时间2小时（秒）
 JJC_RANKING_CACHE_FILE = "data/cache/jjc_ranking_cache.json"
+JJC_RANKING_CACHE_STALE_SECONDS = int(getattr(cfg, "JJC_RANKING_CACHE_STALE_SECONDS", 6 * 60 * 60) or 0)
 KUNGFU_CACHE_DURATION = 7 * 24 * 60 * 60  # 心法缓存有效期一周（秒）
+JJC_RANKING_INCREMENTAL_MAX_AGE = int(getattr(cfg, "JJC_RANKING_INCREMENTAL_MAX_AGE", 24 * 60 * 60) or 0)
+JJC_RANKING_STAT_CUTOFFS = tuple(
+    int(cutoff) for cutoff in (getattr(cfg, "JJC_RANKING_STAT_CUTOFFS", None) or (1000, 200, 100, 50))
+)
+JJC_KUNGFU_RESOLVE_CONCURRENCY = int(getattr(cfg, "JJC_KUNGFU_RESOLVE_CONCURRENCY", 4) or 1)
+JX3API_FALLBACK_RATE_LIMIT_QPS = float(getattr(cfg, "JX3API_FALLBACK_RATE_LIMIT_QPS", 0.25) or 0)
+JX3API_FALLBACK_RATE_LIMIT_BURST = int(getattr(cfg, "JX3API_FALLBACK_RATE_LIMIT_BURST", 1) or 1)
 
 jjc_ranking_service = JjcRankingService(
     token=cfg.TOKEN,
@@ -36,6 +45,9 @@ jjc_ranking_service = JjcRankingService(
     match_detail_url=cfg.API_URLS["竞技场战局详情"],
     jjc_ranking_cache_file=JJC_RANKING_CACHE_FILE,
     jjc_ranking_cache_duration=JJC_RANKING_CACHE_DURATION,
+    jjc_ranking_stale_duration=JJC_RANKING_CACHE_STALE_SECONDS,
+    jjc_ranking_incremental_max_age=JJC_RANKING_INCREMENTAL_MAX_AGE,
+    kungfu_stat_cutoffs=JJC_RANKING_STAT_CUTOFFS,
     kungfu_cache_duration=KUNGFU_CACHE_DURATION,
     current_season=cfg.CURRENT_SEASON,
     current_season_start=cfg.CURRENT_SEASON_START,
@@ -44,16 +56,21 @@ jjc_ranking_service = JjcRankingService(
     kungfu_pinyin_to_chinese=KUNGFU_PINYIN_TO_CHINESE,
     tuilan_request=tuilan_request,
     defget_get=get,
+    kungfu_resolve_concurrency=JJC_KUNGFU_RESOLVE_CONCURRENCY,
+    async_tuilan_request=atuilan_request,
+    jx3api_rate_limiter=TokenBucket(rate=JX3API_FALLBACK_RATE_LIMIT_QPS, burst=JX3API_FALLBACK_RATE_LIMIT_BURST),
 )
 
 match_detail_client = MatchDetailClient(
     match_detail_url=cfg.API_URLS["竞技场战局详情"],
     tuilan_request=tuilan_request,
+    async_tuilan_request=atuilan_request,
 )
 
 match_history_client = MatchHistoryClient(
     match_history_url=cfg.API_URLS["竞技场战局历史"],
     tuilan_request=tuilan_request,
+    async_tuilan_request=atuilan_request,
 )
 
 jjc_ranking_inspect_service = JjcRankingInspectService(
@@ -66,8 +83,8 @@ jjc_ranking_inspect_service = JjcRankingInspectService(
     match_history_client=match_history_client,
     match_detail_client=match_detail_client,
     cache_repo=JjcRankingInspectCacheRepo(base_dir="data/cache/jjc_ranking_inspect"),
-    tuilan_request=tuilan_request,
-    role_indicator_fetcher=get_role_indicator,
+    tuilan_request=atuilan_request,
+    role_indicator_fetcher=aget_role_indicator,
     kungfu_pinyin_to_chinese=KUNGFU_PINYIN_TO_CHINESE,
     role_recent_ttl_seconds=600,
 )
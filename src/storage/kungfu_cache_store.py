@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import glob
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Iterable, Optional
+
+try:
+    from nonebot import logger  # type: ignore
+except Exception:  # pragma: no cover
+    import logging
+
+    logger = logging.getLogger(__name__)
+
+
+RoleKey = tuple[str, str]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS kungfu_cache (
+    server TEXT NOT NULL,
+    name TEXT NOT NULL,
+    cache_time REAL NOT NULL DEFAULT 0,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (server, name)
+);
+CREATE INDEX IF NOT EXISTS idx_kungfu_cache_time ON kungfu_cache (cache_time);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# SQLite 单条语句的绑定参数上限较保守（旧版本 999），批量查询按此分片
+_BATCH_SIZE = 400
+
+
+class KungfuCacheStore:
+    """
+    心法缓存存储：单个 SQLite（WAL）库替代 data/cache/kungfu/{server}_{name}.json 散文件。
+
+    - 主键 (server, name)，payload 为紧凑 JSON，cache_time 单独成列便于按 TTL 查询
+    - 首次打开时若存在旧目录，会一次性导入旧文件（同角色保留 cache_time 较新的一条），旧文件保留不删
+    - 连接跨线程共享，读写都在锁内执行
+    """
+
+    def __init__(self, db_path: str, *, legacy_dir: Optional[str] = None) -> None:
+        self.db_path = db_path
+        self.legacy_dir = legacy_dir
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        if legacy_dir:
+            self.migrate_legacy_dir(legacy_dir)
+
+    @staticmethod
+    def _decode(payload: str) -> Optional[dict[str, Any]]:
+        try:
+            data = json.loads(payload)
+        except Exception:
+            return None
+        return data if isinstance(data, dict) else None
+
+    def get(self, server: str, name: str) -> Optional[dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM kungfu_cache WHERE server = ? AND name = ?",
+                (server, name),
+            ).fetchone()
+        return self._decode(row[0]) if row else None
+
+    def get_many(self, keys: Iterable[RoleKey]) -> dict[RoleKey, dict[str, Any]]:
+        names_by_server: dict[str, list[str]] = {}
+        for server, name in dict.fromkeys((str(server), str(name)) for server, name in keys):
+            names_by_server.setdefault(server, []).append(name)
+
+        result: dict[RoleKey, dict[str, Any]] = {}
+        with self._lock:
+            for server, names in names_by_server.items():
+                for start in range(0, len(names), _BATCH_SIZE):
+                    chunk = names[start : start + _BATCH_SIZE]
+                    placeholders = ",".join("?" * len(chunk))
+                    rows = self._conn.execute(
+                        f"SELECT name, payload FROM kungfu_cache WHERE server = ? AND name IN ({placeholders})",
+                        [server, *chunk],
+                    ).fetchall()
+                    for name, payload in rows:
+                        data = self._decode(payload)
+                        if data is not None:
+                            result[(server, name)] = data
+        return result
+
+    def get_since(self, min_cache_time: float) -> dict[RoleKey, dict[str, Any]]:
+        """
+        按 TTL 查询：返回 cache_time >= min_cache_time 的全部条目。
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT server, name, payload FROM kungfu_cache WHERE cache_time >= ?",
+                (float(min_cache_time),),
+            ).fetchall()
+        result: dict[RoleKey, dict[str, Any]] = {}
+        for server, name, payload in rows:
+            data = self._decode(payload)
+            if data is not None:
+                result[(server, name)] = data
+        return result
+
+    @staticmethod
+    def _row(server: str, name: str, payload: dict[str, Any]) -> tuple[str, str, float, str]:
+        try:
+            cache_time = float(payload.get("cache_time") or 0)
+        except (TypeError, ValueError):
+            cache_time = 0.0
+        return (str(server), str(name), cache_time, json.dumps(payload, ensure_ascii=False, separators=(",", ":")))
+
+    def put(self, server: str, name: str, payload: dict[str, Any]) -> None:
+        self.put_many([(server, name, payload)])
+
+    def put_many(self, items: Iterable[tuple[str, str, dict[str, Any]]]) -> int:
+        rows = [self._row(server, name, payload) for server, name, payload in items]
+        if not rows:
+            return 0
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO kungfu_cache (server, name, cache_time, payload) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def delete_before(self, min_cache_time: float) -> int:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM kungfu_cache WHERE cache_time < ?", (float(min_cache_time),))
+        return cursor.rowcount
+
+    def count(self) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT COUNT(*) FROM kungfu_cache").fetchone()[0])
+
+    def migrate_legacy_dir(self, legacy_dir: str) -> int:
+        with self._lock:
+            migrated = self._conn.execute("SELECT value FROM meta WHERE key = 'legacy_migrated_at'").fetchone()
+        if migrated or not os.path.isdir(legacy_dir):
+            return 0
+
+        started_at = time.monotonic()
+        rows: list[tuple[str, str, float, str]] = []
+        failed = 0
+        for file_path in glob.glob(os.path.join(legacy_dir, "*.json")):
+            try:
+                with open(file_path, "r", encoding="utf-8") as file_handle:
+                    payload = json.load(file_handle)
+            except Exception:
+                failed += 1
+                continue
+            if not isinstance(payload, dict):
+                failed += 1
+                continue
+            server = payload.get("server")
+            name = payload.get("name")
+            if not server or not name:
+                stem = os.path.splitext(os.path.basename(file_path))[0]
+                if "_" not in stem:
+                    failed += 1
+                    continue
+                server, name = stem.split("_", 1)
+            rows.append(self._row(server, name, payload))
+
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                # 同一角色保留较新的 cache_time，避免覆盖迁移前已写入库中的新数据
+                self._conn.executemany(
+                    """
+                    INSERT INTO kungfu_cache (server, name, cache_time, payload) VALUES (?, ?, ?, ?)
+                    ON CONFLICT (server, name) DO UPDATE SET
+                        cache_time = excluded.cache_time,
+                        payload = excluded.payload
+                    WHERE excluded.cache_time > kungfu_cache.cache_time
+                    """,
+                    rows,
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('legacy_migrated_at', ?)",
+                    (str(time.time()),),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        logger.info(
+            f"心法缓存旧文件迁移完成: dir={legacy_dir} imported={len(rows)} failed={failed} "
+            f"elapsed={time.monotonic() - started_at:.2f}s db={self.db_path}"
+        )
+        return len(rows)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_stores: dict[str, KungfuCacheStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_kungfu_cache_store(db_path: str, *, legacy_dir: Optional[str] = None) -> KungfuCacheStore:
+    """
+    同一路径在进程内只打开一次连接；JjcCacheRepo 每次构造都会复用这里的实例。
+    """
+    key = os.path.abspath(db_path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = KungfuCacheStore(db_path, legacy_dir=legacy_dir)
+            _stores[key] = store
+        return store
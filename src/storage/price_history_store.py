@@ -0,0 +1,394 @@
+from __future__ import annotations
+
+import math
+import os
+import sqlite3
+import statistics
+import threading
+import time
+from array import array
+from typing import Any, Iterable, Optional
+
+try:
+    from nonebot import logger  # type: ignore
+except Exception:  # pragma: no cover
+    import logging
+
+    logger = logging.getLogger(__name__)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS price_series (
+    item TEXT NOT NULL,
+    tier TEXT NOT NULL,
+    ts BLOB NOT NULL,
+    low BLOB NOT NULL,
+    median BLOB NOT NULL,
+    listings BLOB NOT NULL,
+    PRIMARY KEY (item, tier)
+);
+"""
+
+TIERS = ("raw", "hourly", "daily")
+HOUR = 3600
+DAY = 86400
+# 按本地时区对齐“天”的边界（服务器在东八区时，日线从 0 点开始）
+_LOCAL_OFFSET = -time.timezone
+
+PricePoint = tuple[float, float, float, float]  # (时间戳, 最低价, 中位价, 在售数量)；缺失值为 NaN
+
+
+def _bucket_start(ts: float, bucket_seconds: int) -> float:
+    return math.floor((ts + _LOCAL_OFFSET) / bucket_seconds) * bucket_seconds - _LOCAL_OFFSET
+
+
+def _nan_min(values: Iterable[float]) -> float:
+    present = [value for value in values if not math.isnan(value)]
+    return min(present) if present else math.nan
+
+
+def _nan_median(values: Iterable[float]) -> float:
+    present = [value for value in values if not math.isnan(value)]
+    return float(statistics.median(present)) if present else math.nan
+
+
+class PriceSeries:
+    """
+    单个物品单个精度层的时间序列，按列存放在 array('d') 中（每个点 32 字节），时间戳升序。
+    """
+
+    __slots__ = ("ts", "low", "median", "listings")
+
+    def __init__(self) -> None:
+        self.ts = array("d")
+        self.low = array("d")
+        self.median = array("d")
+        self.listings = array("d")
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def append(self, ts: float, low: float, median: float, listings: float) -> None:
+        self.ts.append(ts)
+        self.low.append(low)
+        self.median.append(median)
+        self.listings.append(listings)
+
+    def points(self, since: float = 0.0) -> list[PricePoint]:
+        start = 0
+        if since > 0:
+            # 时间戳升序，二分定位起点
+            lo, hi = 0, len(self.ts)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if self.ts[mid] < since:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            start = lo
+        return list(zip(self.ts[start:], self.low[start:], self.median[start:], self.listings[start:]))
+
+    def split_before(self, cutoff: float) -> "PriceSeries":
+        """
+        移出并返回 cutoff 之前的点。
+        """
+        count = 0
+        while count < len(self.ts) and self.ts[count] < cutoff:
+            count += 1
+        older = PriceSeries()
+        if count:
+            for name in self.__slots__:
+                column = getattr(self, name)
+                getattr(older, name).extend(column[:count])
+                del column[:count]
+        return older
+
+    def downsample(self, bucket_seconds: int) -> "PriceSeries":
+        """
+        按桶聚合：最低价取最小值，中位价取各点中位价的中位数，在售数量取桶内最后一个点。
+        """
+        result = PriceSeries()
+        current: Optional[float] = None
+        lows: list[float] = []
+        medians: list[float] = []
+        listings = math.nan
+        for ts, low, median, count in zip(self.ts, self.low, self.median, self.listings):
+            bucket = _bucket_start(ts, bucket_seconds)
+            if current is not None and bucket != current:
+                result.append(current, _nan_min(lows), _nan_median(medians), listings)
+                lows, medians = [], []
+            current = bucket
+            lows.append(low)
+            medians.append(median)
+            listings = count
+        if current is not None:
+            result.append(current, _nan_min(lows), _nan_median(medians), listings)
+        return result
+
+    def extend(self, other: "PriceSeries") -> None:
+        for name in self.__slots__:
+            getattr(self, name).extend(getattr(other, name))
+
+    def to_blobs(self) -> tuple[bytes, bytes, bytes, bytes]:
+        return self.ts.tobytes(), self.low.tobytes(), self.median.tobytes(), self.listings.tobytes()
+
+    @classmethod
+    def from_blobs(cls, ts: bytes, low: bytes, median: bytes, listings: bytes) -> "PriceSeries":
+        series = cls()
+        series.ts.frombytes(ts)
+        series.low.frombytes(low)
+        series.median.frombytes(median)
+        series.listings.frombytes(listings)
+        return series
+
+
+class PriceHistoryStore:
+    """
+    万宝楼物品价格时间序列：每次观测记录 最低价 / 中位价 / 在售数量。
+
+    - 三层精度：raw（原始观测）超过 raw_retention 后按小时聚合进 hourly，
+      hourly 超过 hourly_retention 后按天聚合进 daily，daily 超过 daily_retention 删除（0 表示永久保留）
+    - 内存中按列存放（array），查询不访问磁盘；SQLite 只做持久化，每个 (物品, 精度层) 一行，各列为数组的二进制
+    - record() 只改内存并标记物品为脏，flush() 把脏物品整行写回；读写都在锁内，可在线程中调用 flush()
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        *,
+        raw_retention_seconds: float = 48 * HOUR,
+        hourly_retention_seconds: float = 30 * DAY,
+        daily_retention_seconds: float = 730 * DAY,
+    ) -> None:
+        self.db_path = db_path
+        self.raw_retention_seconds = float(raw_retention_seconds)
+        self.hourly_retention_seconds = max(float(hourly_retention_seconds), self.raw_retention_seconds)
+        daily = float(daily_retention_seconds)
+        self.daily_retention_seconds = max(daily, self.hourly_retention_seconds) if daily > 0 else 0.0
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._series: dict[str, dict[str, PriceSeries]] = {}
+        self._dirty: set[str] = set()
+        self._load()
+
+    def _load(self) -> None:
+        started_at = time.monotonic()
+        with self._db_lock:
+            rows = self._conn.execute("SELECT item, tier, ts, low, median, listings FROM price_series").fetchall()
+        for item, tier, ts, low, median, listings in rows:
+            if tier in TIERS:
+                self._series.setdefault(item, {})[tier] = PriceSeries.from_blobs(ts, low, median, listings)
+        if rows:
+            logger.info(
+                f"价格历史已加载: items={len(self._series)} points={self.count()} "
+                f"elapsed={time.monotonic() - started_at:.2f}s db={self.db_path}"
+            )
+
+    def _tiers(self, item: str) -> dict[str, PriceSeries]:
+        tiers = self._series.get(item)
+        if tiers is None:
+            tiers = {tier: PriceSeries() for tier in TIERS}
+            self._series[item] = tiers
+        for tier in TIERS:
+            tiers.setdefault(tier, PriceSeries())
+        return tiers
+
+    def _compact(self, item: str, now: float) -> bool:
+        tiers = self._tiers(item)
+        changed = False
+        # 截止点对齐到整小时 / 整天，已聚合的桶不会再收到新的点
+        raw_cutoff = _bucket_start(now - self.raw_retention_seconds, HOUR)
+        older_raw = tiers["raw"].split_before(raw_cutoff)
+        if len(older_raw):
+            tiers["hourly"].extend(older_raw.downsample(HOUR))
+            changed = True
+        hourly_cutoff = _bucket_start(now - self.hourly_retention_seconds, DAY)
+        older_hourly = tiers["hourly"].split_before(hourly_cutoff)
+        if len(older_hourly):
+            tiers["daily"].extend(older_hourly.downsample(DAY))
+            changed = True
+        if self.daily_retention_seconds > 0:
+            if len(tiers["daily"].split_before(now - self.daily_retention_seconds)):
+                changed = True
+        return changed
+
+    # ---- 写入 -----------------------------------------------------------
+
+    def record(
+        self,
+        item: str,
+        low: Optional[float],
+        *,
+        median: Optional[float] = None,
+        listings: Optional[float] = None,
+        ts: Optional[float] = None,
+    ) -> bool:
+        """
+        记录一次观测，返回是否写入；low 为 None 表示当前没有在售（仍记录在售数量）。
+
+        ts 应为实际请求上游的时间：同一份响应（如命中接口缓存）重复记录时时间戳相同，会被丢弃。
+        """
+        if not item:
+            return False
+        now = time.time() if ts is None else float(ts)
+        with self._lock:
+            tiers = self._tiers(item)
+            raw = tiers["raw"]
+            if len(raw) and now <= raw.ts[-1]:
+                # 只接受时间严格递增的观测，重复或乱序的点直接丢弃
+                return False
+            raw.append(
+                now,
+                math.nan if low is None else float(low),
+                math.nan if median is None else float(median),
+                math.nan if listings is None else float(listings),
+            )
+            if raw.ts[0] < now - self.raw_retention_seconds - HOUR:
+                self._compact(item, now)
+            self._dirty.add(item)
+        return True
+
+    def compact(self, now: Optional[float] = None) -> int:
+        """
+        对所有物品执行降采样与过期删除，返回发生变化的物品数。
+        """
+        now = time.time() if now is None else float(now)
+        changed = 0
+        with self._lock:
+            for item in list(self._series):
+                if self._compact(item, now):
+                    self._dirty.add(item)
+                    changed += 1
+        return changed
+
+    def flush(self) -> int:
+        """
+        把脏物品写回 SQLite。生成快照与提交都在 _db_lock 内完成：
+        定时任务与关闭时的 flush 在不同线程中重叠时依次执行，较旧的快照不会晚于较新的快照提交。
+        """
+        with self._db_lock:
+            with self._lock:
+                rows = [
+                    (item, tier, *series.to_blobs())
+                    for item in self._dirty
+                    for tier, series in self._tiers(item).items()
+                ]
+                self._dirty.clear()
+            if not rows:
+                return 0
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO price_series (item, tier, ts, low, median, listings) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                with self._lock:
+                    self._dirty.update(row[0] for row in rows)
+                raise
+        return len(rows)
+
+    # ---- 查询 -----------------------------------------------------------
+
+    def points(self, item: str, since: float = 0.0) -> list[PricePoint]:
+        """
+        合并三层精度后的时间序列（越早的数据精度越低），时间戳升序。
+        """
+        with self._lock:
+            tiers = self._series.get(item)
+            if not tiers:
+                return []
+            result: list[PricePoint] = []
+            for tier in ("daily", "hourly", "raw"):
+                series = tiers.get(tier)
+                if series is not None:
+                    result.extend(series.points(since))
+        return result
+
+    def buckets(self, item: str, bucket_seconds: int, since: float = 0.0) -> list[PricePoint]:
+        """
+        按任意粒度重新聚合（如走势图按天 / 按小时取点）。
+        """
+        series = PriceSeries()
+        for point in self.points(item, since):
+            series.append(*point)
+        return series.downsample(bucket_seconds).points()
+
+    def historical_low(self, item: str, since: float = 0.0) -> Optional[tuple[float, float]]:
+        """
+        返回 (最低价, 出现时间)；没有记录时返回 None。
+        """
+        best: Optional[tuple[float, float]] = None
+        for ts, low, _median, _listings in self.points(item, since):
+            if not math.isnan(low) and (best is None or low < best[0]):
+                best = (low, ts)
+        return best
+
+    def trend(self, item: str, *, days: float = 7) -> Optional[dict[str, Any]]:
+        """
+        最近 days 天的最低价走势：起止价格、区间最高 / 最低与涨跌幅。
+        """
+        since = time.time() - days * DAY
+        observed = [(ts, low) for ts, low, _m, _l in self.points(item, since) if not math.isnan(low)]
+        if not observed:
+            return None
+        first_ts, first = observed[0]
+        last_ts, last = observed[-1]
+        lows = [low for _ts, low in observed]
+        return {
+            "item": item,
+            "since": since,
+            "points": len(observed),
+            "first": first,
+            "first_at": first_ts,
+            "last": last,
+            "last_at": last_ts,
+            "min": min(lows),
+            "max": max(lows),
+            "change": last - first,
+            "change_pct": round((last - first) / first * 100, 2) if first else None,
+        }
+
+    def count(self) -> int:
+        return sum(len(series) for tiers in self._series.values() for series in tiers.values())
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            per_tier = {
+                tier: sum(len(tiers[tier]) for tiers in self._series.values() if tier in tiers) for tier in TIERS
+            }
+            return {"items": len(self._series), "dirty": len(self._dirty), **per_tier}
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            with self._db_lock:
+                self._conn.close()
+
+
+_stores: dict[str, PriceHistoryStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_price_history_store(db_path: str, **kwargs: Any) -> PriceHistoryStore:
+    """
+    同一路径在进程内只打开一次。
+    """
+    key = os.path.abspath(db_path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = PriceHistoryStore(db_path, **kwargs)
+            _stores[key] = store
+        return store
@@ -73,10 +73,12 @@ async def get_image(server, role_name,free=None):
     except Exception as e:
         print(f"获取名片图片时出错: {str(e)}")
         return None
+_http_client = HttpClient(timeout=30.0, retries=2, backoff_seconds=0.5, verify=False)
+
+
 #交易行get
 async def fetch_json(url: str) -> dict:
-    http_client = HttpClient(timeout=30.0, retries=2, backoff_seconds=0.5, verify=False)
-    return await http_client.arequest_json("GET", url, verify=False)
+    return await _http_client.arequest_json("GET", url, verify=False)
 
 
 async def jiaoyiget(url: str) -> dict:
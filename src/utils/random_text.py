@@ -1,11 +1,22 @@
 from __future__ import annotations
 
 import time
+import zlib
 
+import config as cfg
 from config import texts
 
+ROTATE_SECONDS = int(getattr(cfg, "RANDOM_TEXT_ROTATE_SECONDS", 600))
 
-def suijitext() -> str:
-    microseconds = int(time.time() * 1000000) % len(texts)
-    return texts[microseconds]
 
+def suijitext(seed: str | None = None) -> str:
+    """
+    底部随机文案：同一时间窗口内（RANDOM_TEXT_ROTATE_SECONDS）返回同一句，
+    相同查询的渲染上下文保持一致，可直接命中截图缓存；seed 不同时取到的文案也不同。
+    窗口配置为 0 时退回每次随机。
+    """
+    if ROTATE_SECONDS <= 0:
+        microseconds = int(time.time() * 1000000) % len(texts)
+        return texts[microseconds]
+    bucket = int(time.time() // ROTATE_SECONDS)
+    return texts[zlib.crc32(f"{bucket}:{seed or ''}".encode("utf-8")) % len(texts)]
@@ -37,6 +37,10 @@ def time_ago_fenzhong(timestamp: int) -> str:
     return "".join(relative_time) + "前"
 
 
+# 输出随当前时间变化：截图缓存按该粒度（秒）分桶，过了这个时长就不再复用（见 src/infra/template_env.py）
+time_ago_fenzhong.render_cache_bucket_seconds = 60
+
+
 def time_ago_filter(timestamp: int) -> str:
     now = datetime.now()
     then = datetime.fromtimestamp(timestamp)
@@ -58,3 +62,5 @@ def time_ago_filter(timestamp: int) -> str:
         relative_time.append(f"{hours}小时")
     return "".join(relative_time) + "前"
 
+
+time_ago_filter.render_cache_bucket_seconds = 3600
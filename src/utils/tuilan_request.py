@@ -7,6 +7,7 @@ from collections import OrderedDict
 import config as cfg
 
 from src.infra.http_client import HttpClient
+from src.infra.rate_limiter import TokenBucket
 
 # 忽略SSL警告
 warnings.filterwarnings('ignore', message='Unverified HTTPS request')
@@ -18,14 +19,23 @@ except Exception:  # pragma: no cover
 
     logger = logging.getLogger(__name__)
 
+# 推栏全局限速：所有 tuilan_request 调用共享同一个令牌桶（QPS <= 0 表示不限速）
+tuilan_rate_limiter = TokenBucket(
+    rate=float(getattr(cfg, "TUILAN_RATE_LIMIT_QPS", 2.0) or 0),
+    burst=int(getattr(cfg, "TUILAN_RATE_LIMIT_BURST", 4) or 1),
+)
+
+# 共享 HttpClient：底层连接由 src.infra.http_pool 按 host 复用
+_http_client = HttpClient(timeout=30.0, retries=2, backoff_seconds=0.5, verify=False)
+
 
 def calculate_xsk(data):
-    """
-    计算X-Sk签名
-
-    Args:
-        data (dict): 请求参数字典
-
+    """
+    计算X-Sk签名
+
+    Args:
+        data (dict): 请求参数字典
+
     Returns:
         tuple: (签名, JSON字符串)
     """
@@ -37,7 +47,7 @@ def calculate_xsk(data):
     ordered_data = OrderedDict()
     for key in sorted(data.keys()):
         ordered_data[key] = data[key]
-
+
     # 确保JSON字符串正确编码
     try:
         json_str = json.dumps(ordered_data, separators=(',', ':'), ensure_ascii=False)
@@ -45,46 +55,42 @@ def calculate_xsk(data):
         logger.warning(f"tuilan_request JSON 编码错误: {e}")
         # 如果包含无法编码的字符，使用ensure_ascii=True
         json_str = json.dumps(ordered_data, separators=(',', ':'), ensure_ascii=True)
-    
-    # 推栏签名算法：JSON字符串 + 固定后缀
-    input_data = f"{json_str}@#?.#@"
-
-    # 使用HMAC-SHA256计算签名
-    signature = hmac.new(
-        secret_key.encode('utf-8'),
-        input_data.encode('utf-8'),
-        hashlib.sha256
-    ).hexdigest()
-
-    return signature, json_str
-
-
-def tuilan_request(url, params=None):
-    """
-    推栏API请求方法
-
-    Args:
-        url (str): 请求地址
-        params (dict, optional): 请求参数，不包含ts
-
-    Returns:
-        dict: 响应结果
-    """
-    # 构造请求数据
-    data = OrderedDict()
-
-    # 添加用户传入的参数
-    if params:
-        for key, value in params.items():
-            data[key] = value
-
-    # 自动添加时间戳 - 推栏API要求的时间戳格式
-    # 格式：年月日时分秒毫秒（17位数字）
-    data["ts"] = datetime.datetime.now().strftime("%Y%m%d%H%M%S%f")[:17]
-
-    # 计算X-Sk签名
-    x_sk, raw_json = calculate_xsk(data)
-    
+    
+    # 推栏签名算法：JSON字符串 + 固定后缀
+    input_data = f"{json_str}@#?.#@"
+
+    # 使用HMAC-SHA256计算签名
+    signature = hmac.new(
+        secret_key.encode('utf-8'),
+        input_data.encode('utf-8'),
+        hashlib.sha256
+    ).hexdigest()
+
+    return signature, json_str
+
+
+def _build_tuilan_request(url, params=None):
+    """
+    构造推栏请求：补充时间戳、计算 X-Sk 签名并生成标准请求头
+
+    Returns:
+        tuple: (请求头, 请求体字节串)
+    """
+    # 构造请求数据
+    data = OrderedDict()
+
+    # 添加用户传入的参数
+    if params:
+        for key, value in params.items():
+            data[key] = value
+
+    # 自动添加时间戳 - 推栏API要求的时间戳格式
+    # 格式：年月日时分秒毫秒（17位数字）
+    data["ts"] = datetime.datetime.now().strftime("%Y%m%d%H%M%S%f")[:17]
+
+    # 计算X-Sk签名
+    x_sk, raw_json = calculate_xsk(data)
+
     # 构造请求头 - 推栏API标准请求头
     tuilan_cookie = getattr(cfg, "TUILAN_COOKIE", "") or ""
     tuilan_device_id = getattr(cfg, "TUILAN_DEVICE_ID", "") or "lWrrIG5QpALPiSZ7txB//A=="
@@ -111,29 +117,72 @@ def tuilan_request(url, params=None):
     if tuilan_cookie:
         headers["Cookie"] = tuilan_cookie
 
-    # 发送请求
-    http_client = HttpClient(timeout=30.0, retries=2, backoff_seconds=0.5, verify=False)
+    # 确保数据是UTF-8编码的字节串
+    if not isinstance(raw_json, str):
+        return headers, raw_json
     try:
-        # 确保数据是UTF-8编码的字节串
-        if isinstance(raw_json, str):
-            data_bytes = raw_json.encode('utf-8')
-        else:
-            data_bytes = raw_json
-
-        return http_client.request_json("POST", url, headers=headers, content=data_bytes, verify=False)
+        return headers, raw_json.encode('utf-8')
     except UnicodeEncodeError as e:
         logger.warning(f"tuilan_request 编码错误: {e}")
         # 尝试使用不同的编码方式
-        try:
-            data_bytes = raw_json.encode('utf-8', errors='ignore')
-            return http_client.request_json("POST", url, headers=headers, content=data_bytes, verify=False)
-        except Exception as e2:
-            logger.warning(f"tuilan_request 备用编码也失败: {e2}")
-            return {"error": f"编码错误: {e}"}
-
-
-# 导出组件
-tuilan_request_module = {
-    "calculate_xsk": calculate_xsk,
-    "tuilan_request": tuilan_request,
+        return headers, raw_json.encode('utf-8', errors='ignore')
+
+
+def tuilan_request(url, params=None):
+    """
+    推栏API请求方法（同步，供线程池内调用）
+
+    Args:
+        url (str): 请求地址
+        params (dict, optional): 请求参数，不包含ts
+
+    Returns:
+        dict: 响应结果
+    """
+    # 先占用全局限速令牌，再生成时间戳与签名：排队等待不会让请求带着过期的 ts 发出
+    waited = tuilan_rate_limiter.acquire_sync()
+    if waited > 0:
+        logger.debug(f"tuilan_request 限速等待 {waited:.2f} 秒: url={url}")
+    try:
+        headers, data_bytes = _build_tuilan_request(url, params)
+    except UnicodeEncodeError as e:
+        logger.warning(f"tuilan_request 备用编码也失败: {e}")
+        return {"error": f"编码错误: {e}"}
+
+    return _http_client.request_json("POST", url, headers=headers, content=data_bytes, verify=False)
+
+
+async def atuilan_request(url, params=None):
+    """
+    推栏API请求方法（原生 asyncio 版本）
+
+    签名、时间戳、重试与 tuilan_request 一致，但不占用线程：
+    大量在途请求共享同一个事件循环和连接池，限速令牌也与同步版本共用。
+
+    Args:
+        url (str): 请求地址
+        params (dict, optional): 请求参数，不包含ts
+
+    Returns:
+        dict: 响应结果
+    """
+    # 与同步版本相同：拿到令牌后再签名
+    waited = await tuilan_rate_limiter.acquire()
+    if waited > 0:
+        logger.debug(f"atuilan_request 限速等待 {waited:.2f} 秒: url={url}")
+    try:
+        headers, data_bytes = _build_tuilan_request(url, params)
+    except UnicodeEncodeError as e:
+        logger.warning(f"tuilan_request 备用编码也失败: {e}")
+        return {"error": f"编码错误: {e}"}
+
+    return await _http_client.arequest_json("POST", url, headers=headers, content=data_bytes, verify=False)
+
+
+# 导出组件
+tuilan_request_module = {
+    "calculate_xsk": calculate_xsk,
+    "tuilan_request": tuilan_request,
+    "atuilan_request": atuilan_request,
+    "tuilan_rate_limiter": tuilan_rate_limiter,
 }